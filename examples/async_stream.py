@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+asyncio 帧流示例
+在事件循环中用 async for 消费相机帧, 耗时的图像处理放到线程池中执行, 不阻塞事件循环
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import argparse
+import asyncio
+import time
+import cv2
+from src.camera import create_camera, LatencyHistogram
+
+
+def process(color_image):
+    """示例处理: 检测棋盘格"""
+    gray = cv2.cvtColor(color_image, cv2.COLOR_BGR2GRAY)
+    found, _ = cv2.findChessboardCorners(gray, (12, 8), flags=cv2.CALIB_CB_FAST_CHECK)
+    return found
+
+
+async def consume(camera, frames_limit, backpressure):
+    """消费帧流，统计处理帧率和延迟"""
+    loop = asyncio.get_running_loop()
+    latency = LatencyHistogram()
+    count = 0
+    t_start = time.perf_counter()
+
+    async with camera.stream(maxsize=4, backpressure=backpressure) as frames:
+        async for frame in frames:
+            frame.mark('deliver')
+            await loop.run_in_executor(None, process, frame.color)
+            frame.mark('process')
+            latency.add(frame)
+            camera.release_frame(frame)
+            count += 1
+            if frames_limit and count >= frames_limit:
+                break
+        stats = frames.get_stats()
+
+    elapsed = time.perf_counter() - t_start
+    print(f"处理 {count} 帧, {count / elapsed:.1f} FPS, 队列丢弃 {stats['dropped']} 帧")
+    print(latency.format_report())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='asyncio 帧流示例')
+    parser.add_argument('--playback', type=str,
+                       help='回放录制目录代替相机（见 scripts/record_stream.py）')
+    parser.add_argument('--playback-speed', type=float, default=1.0,
+                       help='回放速度倍率，0 表示尽可能快，默认: 1.0')
+    parser.add_argument('--backpressure', choices=['drop_oldest', 'block'], default='drop_oldest',
+                       help='处理跟不上时丢弃最旧的帧或阻塞读取，默认: drop_oldest')
+    parser.add_argument('--frames', type=int, default=150,
+                       help='处理帧数，0 表示直到数据流结束，默认: 150')
+    args = parser.parse_args()
+
+    with create_camera(playback=args.playback, playback_speed=args.playback_speed) as camera:
+        asyncio.run(consume(camera, args.frames, args.backpressure))
+
+
+if __name__ == '__main__':
+    main()
@@ -9,34 +9,67 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 import cv2
 import numpy as np
-from src.camera import FemtoBoltCamera
-from src.calibration import ExtrinsicCalibration
+from src.camera import create_camera, DepthToColorRegistration
+from src.calibration import ExtrinsicCalibration, BearingTable, PreviewUndistorter, DepthToVehicleCloud
 from src.utils import load_calibration
 
+# 配置目录按脚本位置解析，与当前工作目录无关
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'config')
+CACHE_DIR = os.path.join(CONFIG_DIR, 'cache')
+
 
 class CalibratedCamera:
     """带标定参数的相机类"""
     
-    def __init__(self, intrinsic_file, extrinsic_file):
+    def __init__(self, intrinsic_file, extrinsic_file, display_scale=1.0, playback=None):
         """
         初始化
         
         Args:
             intrinsic_file: 内参文件路径
             extrinsic_file: 外参文件路径
+            display_scale: 去畸变显示图像的缩放比例
+            playback: 可选的录制目录，指定时回放录制数据代替相机
         """
         # 加载内参
         intrinsic_data = load_calibration(intrinsic_file)
+        self.intrinsic_data = intrinsic_data
+        self.display_scale = display_scale
         self.camera_matrix = np.array(intrinsic_data['camera_matrix'])
         self.dist_coeffs = np.array(intrinsic_data['distortion_coeffs'])
         
+        # 逐像素视线向量查找表（含畸变，缓存到磁盘）
+        self.bearing_table = BearingTable.from_intrinsic_dict(
+            intrinsic_data, cache_dir=CACHE_DIR
+        )
+        
+        # 显示分辨率去畸变预览器及其输出缓冲区，首帧时按图像尺寸创建
+        self.undistorter = None
+        self._undistorted = None
+        
         # 加载外参
         extrinsic_data = load_calibration(extrinsic_file)
         self.extrinsic = ExtrinsicCalibration()
         self.extrinsic.load_from_dict(extrinsic_data)
         
-        # 初始化相机
-        self.camera = FemtoBoltCamera()
+        # 初始化相机（或录制回放）
+        self.camera = create_camera(playback=playback)
+        
+        # 整帧深度图到车辆坐标系点云的流水线，首帧时创建
+        self.cloud_pipeline = None
+        
+        # 深度图到彩色图的配准，相机启动后由SDK内外参创建
+        self.registration = None
+        
+        # 地面网格（车辆坐标系, z=0）: 前方0~20米, 左右各5米, 网格线按0.1米采样
+        lines = []
+        for x in np.arange(0.0, 20.01, 1.0):
+            ys = np.arange(-5.0, 5.01, 0.1)
+            lines.append(np.stack([np.full_like(ys, x), ys, np.zeros_like(ys)], axis=1))
+        for y in np.arange(-5.0, 5.01, 1.0):
+            xs = np.arange(0.0, 20.01, 0.1)
+            lines.append(np.stack([xs, np.full_like(xs, y), np.zeros_like(xs)], axis=1))
+        self.ground_grid = np.concatenate(lines)
         
         print("标定相机已初始化")
         print(f"内参: {intrinsic_file}")
@@ -44,7 +77,14 @@ class CalibratedCamera:
     
     def start(self):
         """启动相机"""
-        return self.camera.start()
+        if not self.camera.start():
+            return False
+        
+        try:
+            self.registration = DepthToColorRegistration.from_camera(self.camera, cache_dir=CACHE_DIR)
+        except ValueError as e:
+            print(f"警告: {e}，深度图将不做配准")
+        return True
     
     def stop(self):
         """停止相机"""
@@ -56,21 +96,57 @@ class CalibratedCamera:
     
     def undistort(self, image):
         """
-        去畸变
+        去畸变（直接输出显示分辨率，复用输出缓冲区）
         
         Args:
             image: 输入图像
             
         Returns:
-            去畸变后的图像
+            去畸变后的图像，下一次调用时会被覆盖
         """
         h, w = image.shape[:2]
-        new_camera_matrix, roi = cv2.getOptimalNewCameraMatrix(
-            self.camera_matrix, self.dist_coeffs, (w, h), 1, (w, h)
+        if self.undistorter is None or self.undistorter.image_size != (w, h):
+            display_size = (max(1, int(w * self.display_scale)),
+                            max(1, int(h * self.display_scale)))
+            self.undistorter = PreviewUndistorter.from_intrinsic_dict(
+                self.intrinsic_data, image_size=(w, h), display_size=display_size
+            )
+            self._undistorted = None
+        
+        self._undistorted = self.undistorter.undistort(image, dst=self._undistorted)
+        return self._undistorted
+    
+    def display_pixel_to_image(self, u, v):
+        """
+        去畸变显示图像中的像素坐标转原始图像像素坐标
+        
+        Args:
+            u, v: 显示图像中的像素坐标
+            
+        Returns:
+            (u, v) 原始图像中的像素坐标
+        """
+        if self.undistorter is None:
+            return u, v
+        return self.undistorter.source_pixel(u, v)
+    
+    def draw_ground_grid(self, display):
+        """
+        在去畸变显示图像上绘制车辆坐标系地面网格
+        
+        去畸变图像对应无畸变的针孔模型，直接用预览相机矩阵投影
+        
+        Args:
+            display: undistort() 返回的显示图像（原地绘制）
+        """
+        if self.undistorter is None:
+            return
+        pixels, visible = self.extrinsic.project_vehicle_points(
+            self.ground_grid, self.undistorter.new_camera_matrix, np.zeros(5),
+            self.undistorter.display_size, use_fisheye=False
         )
-        undistorted = cv2.undistort(image, self.camera_matrix, 
-                                    self.dist_coeffs, None, new_camera_matrix)
-        return undistorted
+        for u, v in pixels[visible].astype(np.int32):
+            display[v, u] = (0, 255, 255)
     
     def pixel_to_camera(self, u, v, depth):
         """
@@ -78,15 +154,12 @@ class CalibratedCamera:
         
         Args:
             u, v: 像素坐标
-            depth: 深度值（米）
+            depth: 深度值（米，沿光轴的z深度）
             
         Returns:
             相机坐标系中的3D点
         """
-        x = (u - self.camera_matrix[0, 2]) * depth / self.camera_matrix[0, 0]
-        y = (v - self.camera_matrix[1, 2]) * depth / self.camera_matrix[1, 1]
-        z = depth
-        return np.array([x, y, z])
+        return self.bearing_table.pixels_to_points(u, v, depth)
     
     def pixel_to_vehicle(self, u, v, depth):
         """
@@ -102,6 +175,30 @@ class CalibratedCamera:
         point_camera = self.pixel_to_camera(u, v, depth)
         return self.extrinsic.transform_point_to_vehicle(point_camera)
     
+    def depth_to_vehicle_cloud(self, depth_image):
+        """
+        整帧深度图转车辆坐标系点云（先配准到彩色相机视角）
+        
+        Args:
+            depth_image: 原始深度图 (z16)
+            
+        Returns:
+            (points_vehicle, valid_mask)，尺寸与查找表不一致时返回 (None, None)
+        """
+        if depth_image is not None and self.registration is not None:
+            depth_image = self.registration.register(depth_image)
+        
+        width, height = self.bearing_table.image_size
+        if depth_image is None or depth_image.shape != (height, width):
+            return None, None
+        
+        if self.cloud_pipeline is None:
+            depth_scale = self.camera.get_depth_scale() or 0.001
+            self.cloud_pipeline = DepthToVehicleCloud(
+                self.bearing_table, self.extrinsic, depth_scale=depth_scale
+            )
+        return self.cloud_pipeline.process(depth_image)
+    
     def camera_to_vehicle(self, point_camera):
         """
         相机坐标转车辆坐标
@@ -122,18 +219,18 @@ def main():
     print("="*60 + "\n")
     
     # 检查标定文件
-    intrinsic_file = 'config/intrinsic.yaml'
-    extrinsic_file = 'config/extrinsic.yaml'
+    intrinsic_file = os.path.join(CONFIG_DIR, 'intrinsic.yaml')
+    extrinsic_file = os.path.join(CONFIG_DIR, 'extrinsic.yaml')
     
     if not os.path.exists(intrinsic_file):
         print(f"内参文件不存在: {intrinsic_file}")
         print("使用示例文件...")
-        intrinsic_file = 'config/intrinsic_example.yaml'
+        intrinsic_file = os.path.join(CONFIG_DIR, 'intrinsic_example.yaml')
     
     if not os.path.exists(extrinsic_file):
         print(f"外参文件不存在: {extrinsic_file}")
         print("使用示例文件...")
-        extrinsic_file = 'config/extrinsic_example.yaml'
+        extrinsic_file = os.path.join(CONFIG_DIR, 'extrinsic_example.yaml')
     
     # 初始化标定相机
     cam = CalibratedCamera(intrinsic_file, extrinsic_file)
@@ -145,6 +242,7 @@ def main():
     print("  - 点击图像选择一个点")
     print("  - 按 'q' 退出")
     print("  - 按 's' 保存当前帧")
+    print("  - 按 'g' 显示/隐藏地面网格")
     print()
     
     # 鼠标回调
@@ -159,6 +257,7 @@ def main():
     cv2.setMouseCallback('标定相机', mouse_callback)
     
     frame_count = 0
+    show_grid = False
     
     try:
         while True:
@@ -168,11 +267,14 @@ def main():
             if color_image is None:
                 break
             
-            # 去畸变
-            undistorted = cam.undistort(color_image)
+            # 整帧深度图转车辆坐标系点云
+            cloud, valid = cam.depth_to_vehicle_cloud(depth_image)
+            
+            # 去畸变（输出缓冲区每帧重新生成，可直接在其上绘制）
+            display = cam.undistort(color_image)
             
-            # 显示信息
-            display = undistorted.copy()
+            if show_grid:
+                cam.draw_ground_grid(display)
             
             # 如果选择了点，显示坐标转换
             if selected_point is not None:
@@ -182,16 +284,28 @@ def main():
                 cv2.circle(display, (u, v), 5, (0, 255, 0), -1)
                 cv2.circle(display, (u, v), 10, (0, 255, 0), 2)
                 
-                # 假设深度为2米（实际应从深度图获取）
-                depth = 2.0
+                # 坐标转换（点击位置在去畸变图像上，先映射回原始图像像素）
+                u_src, v_src = cam.display_pixel_to_image(u, v)
+                col, row = int(round(float(u_src))), int(round(float(v_src)))
+                # 鱼眼或 balance>0 的预览边缘像素可能映射到原始图像之外
+                in_image = 0 <= row < color_image.shape[0] and 0 <= col < color_image.shape[1]
                 
-                # 坐标转换
-                point_camera = cam.pixel_to_camera(u, v, depth)
-                point_vehicle = cam.pixel_to_vehicle(u, v, depth)
+                if (cloud is not None and 0 <= row < valid.shape[0] and 0 <= col < valid.shape[1]
+                        and valid[row, col]):
+                    # 从点云中直接读取该像素的深度和车辆坐标
+                    depth = float(cam.cloud_pipeline.depth_m[row, col])
+                    depth_label = f"{depth:.2f}m"
+                    point_vehicle = cloud[row, col]
+                else:
+                    # 无有效深度时假设深度为2米
+                    depth = 2.0
+                    depth_label = "2.00m (assumed)" if in_image else "2.00m (assumed, outside image)"
+                    point_vehicle = cam.pixel_to_vehicle(u_src, v_src, depth)
+                point_camera = cam.pixel_to_camera(u_src, v_src, depth)
                 
                 # 显示坐标信息
                 info_y = 30
-                cv2.putText(display, f"Pixel: ({u}, {v})", 
+                cv2.putText(display, f"Pixel: ({u}, {v})  Depth: {depth_label}", 
                            (10, info_y), cv2.FONT_HERSHEY_SIMPLEX, 
                            0.6, (255, 255, 255), 2)
                 info_y += 25
@@ -222,6 +336,8 @@ def main():
                 filename = f"frame_{frame_count:04d}.png"
                 cv2.imwrite(filename, display)
                 print(f"已保存: {filename}")
+            elif key == ord('g'):
+                show_grid = not show_grid
             
             frame_count += 1
     
@@ -11,6 +11,11 @@ import argparse
 import cv2
 import numpy as np
 import glob
+import hashlib
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import matplotlib.pyplot as plt
 from matplotlib.patches import Rectangle
@@ -20,6 +25,13 @@ matplotlib.rcParams['font.sans-serif'] = ['DejaVu Sans']  # Use default font
 matplotlib.rcParams['axes.unicode_minus'] = False  # Fix minus sign display issue
 
 
+# Bump when find_corners changes so cached detections are recomputed
+DETECTION_VERSION = 1
+
+# Coverage state file kept in the image folder (see CalibrationCoverageAnalyzer.save_state)
+STATE_FILE = '.coverage_state.npz'
+
+
 class CalibrationCoverageAnalyzer:
     """Calibration image coverage analyzer"""
     
@@ -69,12 +81,174 @@ class CalibrationCoverageAnalyzer:
         
         return None
     
-    def analyze_folder(self, folder_path: str):
+    def _cache_path(self, cache_dir: str, img_path: str) -> str:
+        """
+        Cache file for one image's detection result
+        
+        The key covers the file name, size and modification time, the checkerboard
+        size and the detector version, so edited or replaced images are detected again.
+        """
+        stat = os.stat(img_path)
+        digest = hashlib.sha1()
+        digest.update(os.path.basename(img_path).encode())
+        digest.update(f"{stat.st_size}:{stat.st_mtime_ns}:{tuple(self.checkerboard_size)}:"
+                      f"{DETECTION_VERSION}".encode())
+        return os.path.join(cache_dir, f"{digest.hexdigest()[:16]}.npz")
+    
+    def _process_image(self, img_path: str, cache_dir: str = None):
+        """
+        Detect corners in one image, using the on-disk cache when available
+        
+        Args:
+            img_path: Image path
+            cache_dir: Cache directory, or None to disable caching
+            
+        Returns:
+            (image_size, corners, cached): image_size is None if the image cannot be read,
+            corners is an (N, 2) array or None if no checkerboard was detected
+        """
+        cache_path = None
+        if cache_dir is not None:
+            cache_path = self._cache_path(cache_dir, img_path)
+            if os.path.exists(cache_path):
+                try:
+                    with np.load(cache_path) as data:
+                        corners = data['corners'] if data['found'] else None
+                        return tuple(data['image_size'].tolist()), corners, True
+                except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+                    pass  # Corrupt cache entry, detect again
+        
+        img = cv2.imread(img_path)
+        if img is None:
+            return None, None, False
+        image_size = (img.shape[1], img.shape[0])  # (width, height)
+        corners = self.find_corners(img)
+        if corners is not None:
+            corners = corners.reshape(-1, 2)
+        
+        if cache_path is not None:
+            # Write to a temporary file first so concurrent runs never read a partial entry
+            tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, 'wb') as f:
+                    np.savez(f, found=corners is not None, image_size=np.array(image_size),
+                             corners=corners if corners is not None else np.empty((0, 2), np.float32))
+                os.replace(tmp_path, cache_path)
+            except OSError:
+                # Cache not writable (read-only or full disk): keep the result, skip caching
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        
+        return image_size, corners, False
+    
+    def _prune_cache(self, cache_dir: str, image_paths: list):
+        """
+        Remove cache entries that no longer belong to an image in the folder
+        (deleted or modified images, other checkerboard sizes, leftover temporary files)
+        
+        Args:
+            cache_dir: Cache directory
+            image_paths: Images currently in the folder
+        """
+        keep = {os.path.basename(self._cache_path(cache_dir, path)) for path in image_paths}
+        try:
+            names = os.listdir(cache_dir)
+        except OSError:
+            return
+        for name in names:
+            if (name.endswith('.npz') or name.endswith('.tmp')) and name not in keep:
+                try:
+                    os.remove(os.path.join(cache_dir, name))
+                except OSError:
+                    pass
+    
+    def load_state(self, state_file: str) -> dict:
+        """
+        Load a coverage state file written by save_state
+        
+        Args:
+            state_file: State file path
+            
+        Returns:
+            {image_name: entry} with file_size, mtime_ns, image_size (None if the image
+            could not be read) and corners (None if no checkerboard was detected);
+            empty if the file is missing,
+            unreadable or was written for another checkerboard or detector version
+        """
+        if not os.path.exists(state_file):
+            return {}
+        try:
+            with np.load(state_file) as data:
+                if (int(data['version']) != DETECTION_VERSION or
+                        tuple(data['checkerboard_size'].tolist()) != tuple(self.checkerboard_size)):
+                    print(f"Coverage state {state_file} was written with other detection settings, ignored")
+                    return {}
+                names = data['names'].tolist()
+                file_sizes = data['file_sizes'].tolist()
+                mtimes = data['mtimes_ns'].tolist()
+                image_sizes = data['image_sizes'].tolist()
+                counts = data['corner_counts']
+                # Corners of all images are stored stacked; split them back per image
+                corners = np.split(data['corners'], np.cumsum(counts)[:-1]) if len(counts) else []
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            print(f"Coverage state {state_file} is unreadable, ignored")
+            return {}
+        
+        return {name: {'file_size': file_size, 'mtime_ns': mtime_ns,
+                       'image_size': tuple(image_size) if image_size[0] >= 0 else None,
+                       'corners': image_corners if len(image_corners) else None}
+                for name, file_size, mtime_ns, image_size, image_corners
+                in zip(names, file_sizes, mtimes, image_sizes, corners)}
+    
+    def save_state(self, state_file: str, entries: dict):
+        """
+        Save per-image detection results as a single coverage state file
+        
+        Args:
+            state_file: State file path
+            entries: {image_name: entry}, see load_state
+        """
+        names = sorted(entries)
+        corners = [entries[name]['corners'] for name in names]
+        counts = np.array([0 if c is None else len(c) for c in corners], dtype=np.int64)
+        stacked = [c for c in corners if c is not None]
+        
+        # Write to a temporary file first so concurrent runs never read a partial state
+        tmp_path = f"{state_file}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f,
+                     version=DETECTION_VERSION,
+                     checkerboard_size=np.array(self.checkerboard_size),
+                     names=np.array(names, dtype=str),
+                     file_sizes=np.array([entries[name]['file_size'] for name in names], dtype=np.int64),
+                     mtimes_ns=np.array([entries[name]['mtime_ns'] for name in names], dtype=np.int64),
+                     image_sizes=np.array([entries[name]['image_size'] or (-1, -1) for name in names],
+                                          dtype=np.int64).reshape(-1, 2),
+                     corner_counts=counts,
+                     corners=np.concatenate(stacked).astype(np.float32) if stacked
+                     else np.empty((0, 2), np.float32))
+        os.replace(tmp_path, state_file)
+    
+    def analyze_folder(self, folder_path: str, max_workers: int = None, use_cache: bool = True,
+                       cache_dir: str = None, state_file: str = None, use_state: bool = True):
         """
         Analyze all calibration images in folder
         
+        By default results are kept in a coverage state file in the folder and
+        updated incrementally: images whose size and modification time are unchanged
+        are taken from the state without being read, new or modified images are
+        detected and deleted images are dropped. Without a state file, per-image
+        results are cached as separate files in a cache directory instead.
+        Detection runs in a thread pool (OpenCV releases the GIL during detection).
+        
         Args:
             folder_path: Path to calibration images folder
+            max_workers: Number of detection threads, default chosen by the thread pool
+            use_cache: Whether to reuse earlier results (state file or per-image cache)
+            cache_dir: Per-image cache directory used when use_state is False,
+                       default: <folder_path>/.coverage_cache
+            state_file: Coverage state file, default: <folder_path>/.coverage_state.npz
+            use_state: Keep results in the state file rather than the per-image cache
         """
         # Supported image formats
         image_extensions = ['*.jpg', '*.jpeg', '*.png', '*.bmp', '*.tiff', '*.JPG', '*.PNG']
@@ -82,85 +256,145 @@ class CalibrationCoverageAnalyzer:
         
         for ext in image_extensions:
             image_paths.extend(glob.glob(os.path.join(folder_path, ext)))
+        image_paths = sorted(set(image_paths))
         
         if not image_paths:
             print(f"No image files found in {folder_path}")
             return
         
-        print(f"\nFound {len(image_paths)} images")
-        print("Processing images...")
-        print("-" * 60)
+        # The state file already holds every image's result and is invalidated by the
+        # same settings as the per-image cache, so only one of them is used
+        if use_cache and use_state:
+            cache_dir = None
+            state_file = state_file or os.path.join(folder_path, STATE_FILE)
+        elif use_cache:
+            state_file = None
+            cache_dir = cache_dir or os.path.join(folder_path, '.coverage_cache')
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+            except OSError as e:
+                print(f"Warning: cannot create cache directory {cache_dir} ({e}), cache disabled")
+                cache_dir = None
+        else:
+            cache_dir = None
+            state_file = None
+        
+        t_start = time.perf_counter()
+        previous = self.load_state(state_file) if state_file else {}
         
-        for i, img_path in enumerate(image_paths):
+        # Reuse state entries of unchanged images, detect the rest
+        entries = {}
+        pending = []
+        for img_path in image_paths:
             img_name = os.path.basename(img_path)
-            img = cv2.imread(img_path)
-            
-            if img is None:
-                print(f"[{i+1}/{len(image_paths)}] ✗ {img_name} - Cannot read")
+            stat = os.stat(img_path)
+            entry = previous.get(img_name)
+            if (entry is not None and entry['file_size'] == stat.st_size
+                    and entry['mtime_ns'] == stat.st_mtime_ns):
+                entries[img_name] = entry
+            else:
+                pending.append((img_path, stat))
+        removed = len(set(previous) - {os.path.basename(path) for path in image_paths})
+        
+        if state_file:
+            print(f"\nFound {len(image_paths)} images: {len(entries)} unchanged, "
+                  f"{len(pending)} new or modified, {removed} removed since last analysis")
+        else:
+            print(f"\nFound {len(image_paths)} images")
+        
+        cached_count = 0
+        if pending:
+            print("Processing images...")
+            print("-" * 60)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = executor.map(lambda item: self._process_image(item[0], cache_dir), pending)
+                for i, ((img_path, stat), (image_size, corners, cached)) in enumerate(zip(pending, results)):
+                    img_name = os.path.basename(img_path)
+                    cached_count += cached
+                    print(f"\r  {i + 1}/{len(pending)} images processed", end='', flush=True)
+                    entries[img_name] = {'file_size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                                         'image_size': image_size, 'corners': corners}
+            print()
+            print("-" * 60)
+        
+        if cache_dir is not None and (pending or removed):
+            self._prune_cache(cache_dir, image_paths)
+        
+        if state_file and (pending or removed):
+            try:
+                self.save_state(state_file, entries)
+            except OSError as e:
+                print(f"Warning: cannot write coverage state {state_file} ({e})")
+        
+        # Results in folder order
+        for img_path in image_paths:
+            img_name = os.path.basename(img_path)
+            entry = entries[img_name]
+            if entry['image_size'] is None:
                 self.failed_images.append(img_name)
                 continue
             
             # Record image size
             if self.image_size is None:
-                self.image_size = (img.shape[1], img.shape[0])  # (width, height)
-            
-            # Find corners
-            corners = self.find_corners(img)
+                self.image_size = entry['image_size']
             
-            if corners is not None:
-                self.all_corners.append(corners.reshape(-1, 2))
+            if entry['corners'] is not None:
+                self.all_corners.append(entry['corners'])
                 self.successful_images.append(img_name)
-                print(f"[{i+1}/{len(image_paths)}] ✓ {img_name} - Detected {len(corners)} corners")
             else:
                 self.failed_images.append(img_name)
-                print(f"[{i+1}/{len(image_paths)}] ✗ {img_name} - No checkerboard detected")
+        elapsed = time.perf_counter() - t_start
         
-        print("-" * 60)
-        print(f"\nProcessing completed:")
+        reused = len(image_paths) - len(pending) + cached_count
+        print(f"\nProcessing completed in {elapsed:.2f} s "
+              f"({reused} from {'state' if state_file else 'cache'}, {len(image_paths) - reused} detected):")
         print(f"  Successful: {len(self.successful_images)} images")
         print(f"  Failed: {len(self.failed_images)} images")
         
         if self.failed_images:
-            print(f"\nFailed images:")
+            print(f"\nFailed images (unreadable or no checkerboard detected):")
             for img_name in self.failed_images:
                 print(f"    - {img_name}")
     
-    def compute_coverage_heatmap(self) -> np.ndarray:
+    def compute_coverage_heatmap(self, weights=None, grid_size=None) -> np.ndarray:
         """
         Compute coverage heatmap
         
+        All corners are stacked and binned at once with np.bincount over their
+        flattened (row-major) cell indices.
+        
+        Args:
+            weights: Optional per-image weights, one per entry in all_corners;
+                     each corner contributes the weight of its image instead of 1
+            grid_size: Grid size (cols, rows), defaults to self.grid_size
+            
         Returns:
-            Heatmap array (grid_rows, grid_cols)
+            Heatmap array (grid_rows, grid_cols): int32 corner counts,
+            or float64 weighted sums when weights are given
         """
         if not self.all_corners or self.image_size is None:
             return None
         
         width, height = self.image_size
-        grid_cols, grid_rows = self.grid_size
-        
-        # Create heatmap matrix
-        heatmap = np.zeros((grid_rows, grid_cols), dtype=np.int32)
-        
-        # Calculate cell size
-        cell_width = width / grid_cols
-        cell_height = height / grid_rows
-        
-        # Count corners in each grid cell
-        for corners in self.all_corners:
-            for x, y in corners:
-                # Calculate grid index for corner
-                col_idx = int(x / cell_width)
-                row_idx = int(y / cell_height)
-                
-                # Boundary check
-                col_idx = min(col_idx, grid_cols - 1)
-                row_idx = min(row_idx, grid_rows - 1)
-                col_idx = max(col_idx, 0)
-                row_idx = max(row_idx, 0)
-                
-                heatmap[row_idx, col_idx] += 1
-        
-        return heatmap
+        grid_cols, grid_rows = self.grid_size if grid_size is None else grid_size
+        corners = np.concatenate(self.all_corners).reshape(-1, 2)
+        
+        # Grid index of every corner, clipped to the grid boundary
+        col_idx = np.clip((corners[:, 0] / (width / grid_cols)).astype(np.intp), 0, grid_cols - 1)
+        row_idx = np.clip((corners[:, 1] / (height / grid_rows)).astype(np.intp), 0, grid_rows - 1)
+        cell_idx = row_idx * grid_cols + col_idx
+        
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64)
+            if weights.shape != (len(self.all_corners),):
+                raise ValueError(f"Expected {len(self.all_corners)} image weights, got {weights.shape}")
+            corners_per_image = [len(c) for c in self.all_corners]
+            weights = np.repeat(weights, corners_per_image)
+        
+        heatmap = np.bincount(cell_idx, weights=weights, minlength=grid_rows * grid_cols)
+        if weights is None:
+            heatmap = heatmap.astype(np.int32)
+        return heatmap.reshape(grid_rows, grid_cols)
     
     def visualize_coverage(self, save_path: str = None):
         """
@@ -357,7 +591,7 @@ Regions needing more images (row, col, current corners):
             return
         
         heatmap = self.compute_coverage_heatmap()
-        grid_rows, grid_cols = self.grid_size
+        grid_cols, grid_rows = self.grid_size
         
         report = []
         report.append("\n" + "="*70)
@@ -436,6 +670,17 @@ Examples:
                        help='Visualization output path (PNG format)')
     parser.add_argument('--report', type=str, default=None,
                        help='Detailed report output path (TXT format)')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Number of detection threads, default chosen by the thread pool')
+    parser.add_argument('--cache-dir', type=str, default=None,
+                       help='Per-image detection cache directory used with --no-state, '
+                            'default: <input>/.coverage_cache')
+    parser.add_argument('--state', type=str, default=None,
+                       help='Coverage state file updated incrementally, default: <input>/.coverage_state.npz')
+    parser.add_argument('--no-state', action='store_true',
+                       help='Cache detections as per-image files instead of the coverage state file')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Detect every image again without reading or writing the state or cache')
     
     args = parser.parse_args()
     
@@ -459,7 +704,9 @@ Examples:
     )
     
     # Analyze images
-    analyzer.analyze_folder(args.input)
+    analyzer.analyze_folder(args.input, max_workers=args.workers,
+                            use_cache=not args.no_cache, cache_dir=args.cache_dir,
+                            state_file=args.state, use_state=not args.no_state)
     
     if len(analyzer.all_corners) == 0:
         print("\nError: No checkerboard detected, please check:")
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+标定精度/速度基准测试
+在 generate_calibration_dataset.py 生成的合成数据集上运行完整的 检测 -> 内参标定 -> 验证 -> 外参标定 流程,
+报告各阶段耗时、峰值内存以及相对真值的参数误差, 结果输出为 JSON, 便于比较代码修改前后的表现
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import platform
+import resource
+import time
+import tracemalloc
+import cv2
+import numpy as np
+from src.calibration import IntrinsicCalibration, ExtrinsicCalibration
+from src.utils import load_calibration
+
+
+def load_images(directory):
+    """按文件名顺序读取目录中的 PNG 图像（不修改目录内容）"""
+    files = sorted(glob.glob(os.path.join(directory, '*.png')))
+    return [cv2.imread(f) for f in files]
+
+
+def distortion_map_error(truth, camera_matrix, dist_coeffs, use_fisheye, step=8):
+    """
+    畸变模型误差: 用真值模型把像素网格反投影为射线，再用估计模型投影，统计像素偏差
+
+    比较畸变系数本身没有意义（系数之间高度相关），该指标直接反映标定结果在整幅图像上的几何误差
+
+    Returns:
+        (rms, max) 像素
+    """
+    width, height = truth['image_width'], truth['image_height']
+    K_true = np.array(truth['camera_matrix'])
+    D_true = np.array(truth['distortion_coeffs'])
+    u, v = np.meshgrid(np.arange(0, width, step, dtype=np.float64),
+                       np.arange(0, height, step, dtype=np.float64))
+    pixels = np.stack([u, v], axis=-1).reshape(-1, 1, 2)
+    zeros = np.zeros(3)
+    if use_fisheye:
+        normalized = cv2.fisheye.undistortPoints(pixels, K_true, D_true[:4])
+        points = cv2.convertPointsToHomogeneous(normalized).astype(np.float64)
+        projected, _ = cv2.fisheye.projectPoints(points, zeros, zeros, camera_matrix, dist_coeffs)
+    else:
+        normalized = cv2.undistortPoints(pixels, K_true, D_true)
+        points = cv2.convertPointsToHomogeneous(normalized).astype(np.float64)
+        projected, _ = cv2.projectPoints(points, zeros, zeros, camera_matrix, dist_coeffs)
+    error = np.linalg.norm(projected.reshape(-1, 2) - pixels.reshape(-1, 2), axis=1)
+    return float(np.sqrt(np.mean(error ** 2))), float(error.max())
+
+
+def run_stage(func):
+    """运行一个阶段，返回 (结果, 耗时秒, Python 峰值分配MB)；标定代码的打印输出被屏蔽"""
+    tracemalloc.start()
+    t_start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = func()
+    elapsed = time.perf_counter() - t_start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 1e6
+
+
+def benchmark_dataset(path):
+    """
+    在一个数据集上运行完整流程
+
+    Returns:
+        结果字典
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        truth = load_calibration(os.path.join(path, 'ground_truth.yaml'))
+    use_fisheye = truth['camera_model'] == 'fisheye'
+    checkerboard_size = tuple(truth['checkerboard_size'])
+    square_size = truth['square_size']
+    image_size = (truth['image_width'], truth['image_height'])
+    result = {'dataset': os.path.basename(os.path.normpath(path)),
+              'camera_model': truth['camera_model'],
+              'resolution': f"{image_size[0]}x{image_size[1]}",
+              'noise_sigma': truth['noise_sigma']}
+    timings, memory = {}, {}
+
+    # 检测
+    images = load_images(os.path.join(path, 'intrinsic'))
+    calibrator = IntrinsicCalibration(checkerboard_size, square_size, use_fisheye)
+    detected, timings['detect_s'], memory['detect_mb'] = run_stage(
+        lambda: sum(calibrator.add_image(image) for image in images))
+    result['views'] = len(images)
+    result['views_detected'] = int(detected)
+
+    # 内参标定
+    try:
+        intrinsic, timings['calibrate_s'], memory['calibrate_mb'] = run_stage(
+            lambda: calibrator.calibrate(image_size))
+    except (ValueError, cv2.error) as e:
+        result['error'] = f"内参标定失败: {e}"
+        result['timings'] = timings
+        result['peak_memory_mb'] = memory
+        return result
+
+    # 验证: 重投影误差和相对真值的参数误差
+    reprojection, timings['verify_s'], memory['verify_mb'] = run_stage(
+        calibrator.calculate_reprojection_error)
+    K, K_true = np.asarray(intrinsic['camera_matrix']), np.array(truth['camera_matrix'])
+    D = np.asarray(intrinsic['distortion_coeffs'])
+    map_rms, map_max = distortion_map_error(truth, K, D, use_fisheye)
+    result['intrinsic'] = {
+        'rms_error_px': float(intrinsic['rms_error']),
+        'mean_reprojection_error_px': float(reprojection),
+        'fx_error_px': float(K[0, 0] - K_true[0, 0]),
+        'fy_error_px': float(K[1, 1] - K_true[1, 1]),
+        'cx_error_px': float(K[0, 2] - K_true[0, 2]),
+        'cy_error_px': float(K[1, 2] - K_true[1, 2]),
+        'distortion_map_rms_px': map_rms,
+        'distortion_map_max_px': map_max,
+    }
+
+    # 外参标定（使用上一步估计的内参）
+    frames = load_images(os.path.join(path, 'extrinsic'))
+    extrinsic = ExtrinsicCalibration()
+    try:
+        _, timings['extrinsic_s'], memory['extrinsic_mb'] = run_stage(
+            lambda: extrinsic.from_checkerboard_frames(frames, K, D, checkerboard_size, square_size,
+                                                       truth['board_to_vehicle_pose'], use_fisheye))
+        T_true = np.array(truth['camera_to_vehicle'])
+        T = extrinsic.transformation_matrix
+        rotation_error = np.rad2deg(np.linalg.norm(cv2.Rodrigues(T[:3, :3] @ T_true[:3, :3].T)[0]))
+        result['extrinsic'] = {
+            'frames': len(frames),
+            'translation_error_mm': float(np.linalg.norm(T[:3, 3] - T_true[:3, 3]) * 1000),
+            'rotation_error_deg': float(rotation_error),
+        }
+    except (ValueError, cv2.error) as e:
+        result['extrinsic'] = {'error': str(e)}
+
+    timings['total_s'] = sum(timings.values())
+    result['timings'] = timings
+    result['peak_memory_mb'] = memory
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='标定精度/速度基准测试（合成数据集）')
+    parser.add_argument('--datasets', type=str, default='data/synthetic',
+                       help='数据集目录（含多个数据集的目录或单个数据集），默认: data/synthetic')
+    parser.add_argument('--json', type=str, default=None,
+                       help='结果输出为JSON文件，默认输出到终端')
+    args = parser.parse_args()
+
+    if os.path.exists(os.path.join(args.datasets, 'ground_truth.yaml')):
+        paths = [args.datasets]
+    else:
+        paths = sorted(os.path.dirname(p) for p in glob.glob(os.path.join(args.datasets, '*', 'ground_truth.yaml')))
+    if not paths:
+        parser.error(f"未找到数据集: {args.datasets}（先运行 generate_calibration_dataset.py）")
+
+    results = []
+    for path in paths:
+        result = benchmark_dataset(path)
+        results.append(result)
+        summary = result.get('error')
+        if summary is None:
+            intrinsic = result['intrinsic']
+            summary = (f"fx误差 {intrinsic['fx_error_px']:+.2f}px, 畸变图 RMS {intrinsic['distortion_map_rms_px']:.3f}px, "
+                       f"耗时 {result['timings']['total_s']:.2f}s")
+        print(f"{result['dataset']}: {summary}", file=sys.stderr)
+
+    report = {
+        'environment': {
+            'python': platform.python_version(),
+            'opencv': cv2.__version__,
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+        },
+        'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'results': results,
+    }
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"结果已保存到: {args.json}", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
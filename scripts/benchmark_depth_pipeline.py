@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+深度图到车辆坐标系点云基准测试
+比较逐像素循环、逐帧分配的向量化实现与预分配流水线的帧率和内存分配
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import argparse
+import time
+import tracemalloc
+import numpy as np
+from src.calibration import ExtrinsicCalibration, BearingTable, DepthToVehicleCloud
+
+
+def naive_vectorized(bearing_table, calibrator, depth_image, depth_scale, min_depth, max_depth):
+    """逐帧分配的向量化实现: 每一步生成新的中间数组"""
+    depth_m = depth_image.astype(np.float64) * depth_scale
+    valid = (depth_m >= min_depth) & (depth_m <= max_depth)
+    points_camera = bearing_table.z_rays * depth_m[..., None]
+    points_vehicle = calibrator.transform_point_to_vehicle(points_camera.reshape(-1, 3))
+    return points_vehicle.reshape(points_camera.shape), valid
+
+
+def per_pixel_loop(bearing_table, calibrator, depth_image, depth_scale, rows):
+    """逐像素循环实现（只处理前 rows 行，按比例换算整帧耗时）"""
+    T = calibrator.transformation_matrix
+    z_rays = bearing_table.z_rays
+    for v in range(rows):
+        for u in range(depth_image.shape[1]):
+            depth = depth_image[v, u] * depth_scale
+            point = np.append(z_rays[v, u] * depth, 1.0)
+            _ = (T @ point)[:3]
+
+
+def measure(func, repeats):
+    """
+    测量耗时中位数(毫秒)和单次调用的峰值额外内存(MB)
+    """
+    func()  # 预热
+    times = []
+    for _ in range(repeats):
+        t_start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - t_start) * 1000)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return float(np.median(times)), peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='深度图到车辆坐标系点云基准测试')
+    parser.add_argument('--width', type=int, default=640,
+                       help='深度图宽度，默认: 640')
+    parser.add_argument('--height', type=int, default=576,
+                       help='深度图高度，默认: 576')
+    parser.add_argument('--repeats', type=int, default=50,
+                       help='重复次数，默认: 50')
+    parser.add_argument('--loop-rows', type=int, default=4,
+                       help='逐像素循环实现测量的行数，默认: 4')
+    args = parser.parse_args()
+
+    width, height = args.width, args.height
+    K = np.array([[width * 0.8, 0, width / 2], [0, width * 0.8, height / 2], [0, 0, 1]])
+    D = np.array([0.05, -0.01, 0.002, -0.0005])
+    bearing_table = BearingTable(K, D, (width, height), use_fisheye=True)
+
+    calibrator = ExtrinsicCalibration()
+    calibrator.from_manual_measurement((1.5, 0.0, 1.8), (0.0, -10.0, 0.0))
+
+    # 合成深度图: 0.3~8米, 约10%无效像素
+    rng = np.random.default_rng(0)
+    depth_image = rng.integers(300, 8000, size=(height, width), dtype=np.uint16)
+    depth_image[rng.random((height, width)) < 0.1] = 0
+
+    pipeline = DepthToVehicleCloud(bearing_table, calibrator, depth_scale=0.001)
+
+    # 正确性检查
+    points, valid = pipeline.process(depth_image)
+    reference, reference_valid = naive_vectorized(bearing_table, calibrator, depth_image, 0.001, 0.1, 10.0)
+    assert np.array_equal(valid, reference_valid)
+    assert np.allclose(points[valid], reference[valid], atol=1e-4)
+
+    # 逐像素循环按行数外推整帧耗时
+    t_start = time.perf_counter()
+    per_pixel_loop(bearing_table, calibrator, depth_image, 0.001, args.loop_rows)
+    loop_ms = (time.perf_counter() - t_start) * 1000 * height / args.loop_rows
+
+    cases = [
+        ('naive vectorized (float64, per-frame alloc)',
+         lambda: naive_vectorized(bearing_table, calibrator, depth_image, 0.001, 0.1, 10.0)),
+        ('DepthToVehicleCloud.process', lambda: pipeline.process(depth_image)),
+    ]
+
+    print("\n" + "="*80)
+    print(f"深度点云基准测试: {width}x{height}, 重复 {args.repeats} 次")
+    print("="*80)
+    print(f"{'实现':<46} {'耗时(ms)':>9} {'帧率(FPS)':>10} {'峰值分配(MB)':>12}")
+    print("-"*80)
+    print(f"{'per-pixel loop (extrapolated)':<46} {loop_ms:>9.1f} {1000 / loop_ms:>10.1f} {'-':>12}")
+    for name, func in cases:
+        elapsed, peak = measure(func, args.repeats)
+        print(f"{name:<46} {elapsed:>9.2f} {1000 / elapsed:>10.1f} {peak:>12.2f}")
+    print("="*80)
+
+
+if __name__ == '__main__':
+    main()
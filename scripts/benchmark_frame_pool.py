@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+帧缓冲池基准测试（离线, 模拟SDK帧）
+模拟后台采集: 生产者每次从SDK缓冲区复制一帧写入环形缓冲区, 消费者以一半的速度取最新帧,
+比较逐帧 .copy() 与帧缓冲池的每帧内存分配和耗时
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import argparse
+import time
+import tracemalloc
+import numpy as np
+from src.camera import FrameRingBuffer, FrameRecord, FramePool
+
+
+def make_copy_stream(sdk_color, sdk_depth, buffer_size):
+    """逐帧复制: 每帧分配新的彩色/深度数组"""
+    ring = FrameRingBuffer(buffer_size)
+    state = {'sequence': 0}
+
+    def produce():
+        ring.push(FrameRecord(sdk_color.copy(), sdk_depth.copy(),
+                                   time.perf_counter(), state['sequence']))
+        state['sequence'] += 1
+
+    def consume():
+        return ring.get('latest', timeout=0)
+
+    return produce, consume, None
+
+
+def make_pool_stream(sdk_color, sdk_depth, buffer_size):
+    """帧缓冲池: 复制到回收的缓冲区，跳过/丢弃的帧自动归还"""
+    pool = FramePool(sdk_color.shape, sdk_depth.shape, buffer_size + 2)
+    ring = FrameRingBuffer(buffer_size, on_discard=lambda frame: frame.buffer.release())
+    state = {'sequence': 0, 'held': None}
+
+    def produce():
+        buffer = pool.fill(sdk_color, sdk_depth)
+        ring.push(FrameRecord(buffer.color, buffer.depth,
+                                   time.perf_counter(), state['sequence'], buffer))
+        state['sequence'] += 1
+
+    def consume():
+        # 消费者持有上一帧直到取下一帧
+        frame = ring.get('latest', timeout=0)
+        if frame is not None:
+            if state['held'] is not None:
+                state['held'].buffer.release()
+            state['held'] = frame
+        return frame
+
+    return produce, consume, pool
+
+
+def run(produce, consume, frames, threshold):
+    """
+    运行模拟流并逐帧统计内存分配
+
+    Returns:
+        (每帧耗时中位数ms, 每帧峰值分配中位数KB, 分配超过阈值的帧数)
+    """
+    # 预热: 填满环形缓冲区和缓冲池
+    for _ in range(8):
+        produce()
+        consume()
+
+    times, peaks = [], []
+    tracemalloc.start()
+    for i in range(frames):
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        t_start = time.perf_counter()
+        produce()
+        if i % 2:
+            consume()
+        times.append((time.perf_counter() - t_start) * 1000)
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - base)
+    tracemalloc.stop()
+
+    peaks = np.array(peaks)
+    return float(np.median(times)), float(np.median(peaks)) / 1024, int((peaks > threshold).sum())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='帧缓冲池基准测试')
+    parser.add_argument('--width', type=int, default=1280,
+                       help='图像宽度，默认: 1280')
+    parser.add_argument('--height', type=int, default=720,
+                       help='图像高度，默认: 720')
+    parser.add_argument('--frames', type=int, default=300,
+                       help='模拟帧数，默认: 300')
+    parser.add_argument('--buffer-size', type=int, default=4,
+                       help='环形缓冲区容量，默认: 4')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    sdk_color = rng.integers(0, 255, size=(args.height, args.width, 3), dtype=np.uint8)
+    sdk_depth = rng.integers(300, 8000, size=(args.height, args.width), dtype=np.uint16)
+    threshold = 64 * 1024
+
+    print("\n" + "="*80)
+    print(f"帧缓冲池基准测试: {args.width}x{args.height}, {args.frames} 帧, 环形缓冲区 {args.buffer_size}")
+    print("="*80)
+    print(f"{'实现':<28} {'耗时(ms/帧)':>12} {'峰值分配(KB/帧)':>16} {'分配>64KB的帧':>14}")
+    print("-"*80)
+    for name, factory in (('per-frame .copy()', make_copy_stream),
+                          ('FramePool', make_pool_stream)):
+        produce, consume, pool = factory(sdk_color, sdk_depth, args.buffer_size)
+        elapsed, peak_kb, heavy = run(produce, consume, args.frames, threshold)
+        print(f"{name:<28} {elapsed:>12.3f} {peak_kb:>16.1f} {heavy:>14d}")
+        if pool is not None:
+            stats = pool.get_stats()
+            print(f"{'':<28} 缓冲池: 分配 {stats['allocated']} 帧, 取用 {stats['acquired']} 次, "
+                  f"扩容 {stats['grown']} 次")
+    print("="*80)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+PnP求解器基准测试
+在合成棋盘格上比较各求解器的耗时与位姿精度（含噪声和错序/误检角点）
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import argparse
+import json
+import time
+import cv2
+import numpy as np
+from src.calibration import ExtrinsicCalibration
+from src.calibration.extrinsic_calibration import PNP_SOLVERS
+
+
+def random_board_pose(rng, distance_range=(0.8, 3.0), max_tilt_deg=40.0, max_roll_deg=20.0):
+    """
+    生成随机的标定板位姿（标定板在相机前方, 倾斜角有限）
+
+    Returns:
+        (rvec, tvec)
+    """
+    angles = rng.uniform(-1.0, 1.0, size=3) * np.array([max_tilt_deg, max_tilt_deg, max_roll_deg])
+    rvec = np.deg2rad(angles).reshape(3, 1)
+    distance = rng.uniform(*distance_range)
+    tvec = np.array([[rng.uniform(-0.3, 0.1)], [rng.uniform(-0.3, 0.1)], [distance]])
+    return rvec, tvec
+
+
+def make_trials(num_trials, checkerboard_size, square_size, camera_matrix,
+                noise_px, outlier_ratio, seed):
+    """
+    生成合成观测
+
+    Returns:
+        [(object_points, image_points, rvec_gt, tvec_gt), ...]
+    """
+    rng = np.random.default_rng(seed)
+    objp = ExtrinsicCalibration._board_object_points(checkerboard_size, square_size).astype(np.float64)
+    trials = []
+    while len(trials) < num_trials:
+        rvec, tvec = random_board_pose(rng)
+        image_points, _ = cv2.projectPoints(objp, rvec, tvec, camera_matrix, None)
+        image_points = image_points.reshape(-1, 2)
+        image_points += rng.normal(0, noise_px, image_points.shape)
+
+        # 模拟错序/误检角点: 随机交换部分角点
+        num_outliers = int(round(outlier_ratio * len(objp)))
+        if num_outliers >= 2:
+            idx = rng.choice(len(objp), size=num_outliers, replace=False)
+            image_points[idx] = image_points[np.roll(idx, 1)]
+
+        trials.append((objp, image_points.reshape(-1, 1, 2), rvec, tvec))
+    return trials
+
+
+def pose_error(rvec, tvec, rvec_gt, tvec_gt):
+    """旋转误差(度)与平移误差(毫米)"""
+    R, _ = cv2.Rodrigues(rvec)
+    R_gt, _ = cv2.Rodrigues(rvec_gt)
+    cos_angle = np.clip((np.trace(R_gt.T @ R) - 1) / 2, -1.0, 1.0)
+    return np.rad2deg(np.arccos(cos_angle)), np.linalg.norm(tvec.ravel() - tvec_gt.ravel()) * 1000
+
+
+def run_solver(trials, camera_matrix, solver, refine, ransac_threshold):
+    """运行一个求解器配置，返回统计结果"""
+    latencies, rot_errors, trans_errors = [], [], []
+    failures = 0
+    for objp, image_points, rvec_gt, tvec_gt in trials:
+        t_start = time.perf_counter()
+        try:
+            rvec, tvec, _ = ExtrinsicCalibration._solve_board_pose(
+                objp, image_points, camera_matrix, np.zeros(5), use_fisheye=False,
+                solver=solver, refine=refine, ransac_threshold=ransac_threshold
+            )
+        except (ValueError, cv2.error):
+            failures += 1
+            continue
+        latencies.append((time.perf_counter() - t_start) * 1e6)
+        rot_err, trans_err = pose_error(rvec, tvec, rvec_gt, tvec_gt)
+        rot_errors.append(rot_err)
+        trans_errors.append(trans_err)
+
+    if not latencies:
+        return {'solver': solver, 'refine': refine, 'failures': failures}
+
+    return {
+        'solver': solver,
+        'refine': refine,
+        'failures': failures,
+        'latency_us_median': float(np.median(latencies)),
+        'latency_us_p95': float(np.percentile(latencies, 95)),
+        'rotation_error_deg_median': float(np.median(rot_errors)),
+        'rotation_error_deg_p95': float(np.percentile(rot_errors, 95)),
+        'translation_error_mm_median': float(np.median(trans_errors)),
+        'translation_error_mm_p95': float(np.percentile(trans_errors, 95)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='PnP求解器基准测试（合成棋盘格）')
+    parser.add_argument('--trials', type=int, default=500,
+                       help='每种配置的试验次数，默认: 500')
+    parser.add_argument('--checkerboard', type=int, nargs=2, default=[12, 8],
+                       help='棋盘格内角点数量 (列 行)')
+    parser.add_argument('--square-size', type=float, default=0.038,
+                       help='棋盘格方格大小(米)')
+    parser.add_argument('--noise', type=float, default=0.3,
+                       help='角点高斯噪声标准差(像素)，默认: 0.3')
+    parser.add_argument('--outlier-ratio', type=float, default=0.0,
+                       help='错序/误检角点比例，默认: 0')
+    parser.add_argument('--ransac-threshold', type=float, default=2.0,
+                       help='RANSAC内点重投影阈值(像素)')
+    parser.add_argument('--seed', type=int, default=0,
+                       help='随机种子')
+    parser.add_argument('--json', type=str, default=None,
+                       help='结果输出为JSON文件')
+    args = parser.parse_args()
+
+    camera_matrix = np.array([[600.0, 0, 320.0], [0, 600.0, 240.0], [0, 0, 1]])
+    trials = make_trials(args.trials, tuple(args.checkerboard), args.square_size,
+                         camera_matrix, args.noise, args.outlier_ratio, args.seed)
+
+    print("\n" + "="*88)
+    print(f"PnP求解器基准测试: {args.trials} 次, 噪声 {args.noise}px, 错序角点比例 {args.outlier_ratio:.0%}")
+    print("="*88)
+    print(f"{'求解器':<16} {'耗时中位数(us)':>14} {'耗时P95(us)':>12} "
+          f"{'旋转误差(°)':>12} {'平移误差(mm)':>13} {'P95平移(mm)':>12} {'失败':>5}")
+    print("-"*88)
+
+    results = []
+    for solver in PNP_SOLVERS:
+        for refine in (False, True):
+            stats = run_solver(trials, camera_matrix, solver, refine, args.ransac_threshold)
+            results.append(stats)
+            name = solver + ('+LM' if refine else '')
+            if 'latency_us_median' not in stats:
+                print(f"{name:<16} {'全部失败':>14}")
+                continue
+            print(f"{name:<16} {stats['latency_us_median']:>14.1f} {stats['latency_us_p95']:>12.1f} "
+                  f"{stats['rotation_error_deg_median']:>12.4f} {stats['translation_error_mm_median']:>13.2f} "
+                  f"{stats['translation_error_mm_p95']:>12.2f} {stats['failures']:>5d}")
+
+    print("="*88)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'config': vars(args), 'results': results}, f, indent=2)
+        print(f"结果已保存到: {args.json}")
+
+
+if __name__ == '__main__':
+    main()
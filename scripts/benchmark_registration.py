@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+深度->彩色配准基准测试（离线, 合成场景）
+合成深度相机和彩色相机看到的同一场景（背景墙 + 前景遮挡板），
+比较配准结果与彩色视角真值深度的误差, 以及预计算配准表与逐帧 np.minimum.at 实现的耗时
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import argparse
+import time
+import cv2
+import numpy as np
+from src.camera import DepthToColorRegistration
+from src.calibration import compute_bearing_table
+
+
+def render_depth(rays, to_scene, wall_z, box_z, box_half):
+    """
+    光线投射渲染场景深度（场景定义在深度相机坐标系中）
+
+    Args:
+        rays: (H, W, 3) 当前相机坐标系下的射线（任意长度）
+        to_scene: 当前相机坐标系到深度相机坐标系的 4x4 变换
+        wall_z: 背景墙 z 坐标（米）
+        box_z: 前景遮挡板 z 坐标（米）
+        box_half: 遮挡板半边长（米）
+
+    Returns:
+        (H, W) 当前相机坐标系下的 Z 深度（米），未击中为 0
+    """
+    R, t = to_scene[:3, :3], to_scene[:3, 3]
+    directions = rays @ R.T
+    depth = np.zeros(rays.shape[:2])
+    hit_any = np.zeros(rays.shape[:2], dtype=bool)
+    for plane_z, half in ((box_z, box_half), (wall_z, np.inf)):
+        s = (plane_z - t[2]) / directions[..., 2]
+        hit = t[:2] + s[..., None] * directions[..., :2]
+        inside = (s > 0) & (np.abs(hit) <= half).all(axis=-1) & ~hit_any
+        depth[inside] = (s * rays[..., 2])[inside]
+        hit_any |= inside
+    return depth
+
+
+def minimum_at_register(registration, depth_image):
+    """参考实现: np.minimum.at 做 z-buffer，2x2 写入时显式写入四个像素"""
+    pixel_index, depth_raw, _ = registration.project(depth_image)
+    width, height = registration.color_size
+    grid_width = width + registration.splat - 1
+    empty = np.iinfo(np.uint16).max
+    # 四周各多一行一列，容纳落在图像外的块像素
+    zbuffer = np.full((height + 2, width + 2), empty, dtype=np.uint16)
+    u, v = pixel_index % grid_width + 1, pixel_index // grid_width + 1
+    # splat=2 时索引为 2x2 块的右下角
+    offsets = ((0, 0),) if registration.splat == 1 else ((0, 0), (1, 0), (0, 1), (1, 1))
+    for du, dv in offsets:
+        np.minimum.at(zbuffer, (v - dv, u - du), depth_raw)
+    zbuffer = zbuffer[1:height + 1, 1:width + 1]
+    zbuffer[zbuffer == empty] = 0
+    return zbuffer
+
+
+def measure(func, repeats):
+    """耗时中位数(毫秒)"""
+    func()
+    times = []
+    for _ in range(repeats):
+        t_start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - t_start) * 1000)
+    return float(np.median(times))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='深度->彩色配准基准测试（合成场景）')
+    parser.add_argument('--depth-size', type=int, nargs=2, default=[640, 576],
+                       help='深度图尺寸 (宽 高)')
+    parser.add_argument('--color-size', type=int, nargs=2, default=[1280, 720],
+                       help='彩色图尺寸 (宽 高)')
+    parser.add_argument('--repeats', type=int, default=20,
+                       help='重复次数，默认: 20')
+    args = parser.parse_args()
+
+    depth_size, color_size = tuple(args.depth_size), tuple(args.color_size)
+    K_depth = np.array([[504.0, 0, depth_size[0] / 2], [0, 504.0, depth_size[1] / 2], [0, 0, 1]])
+    D_depth = np.array([0.02, -0.01, 0.0, 0.0, 0.0])
+    K_color = np.array([[610.0, 0, color_size[0] / 2 + 3], [0, 610.0, color_size[1] / 2 - 2], [0, 0, 1]])
+    D_color = np.array([0.07, -0.06, 0.0005, -0.0003, 0.02])
+
+    depth_to_color = np.eye(4)
+    depth_to_color[:3, :3] = cv2.Rodrigues(np.deg2rad([0.3, -6.0, 0.2]))[0]
+    depth_to_color[:3, 3] = [-0.032, -0.002, 0.004]
+
+    # 场景: 3米处背景墙, 1米处 0.4x0.4 米遮挡板
+    scene = dict(wall_z=3.0, box_z=1.0, box_half=0.2)
+    depth_rays = compute_bearing_table(K_depth, D_depth, depth_size, use_fisheye=False)
+    depth_m = render_depth(depth_rays, np.eye(4), **scene)
+    depth_image = np.round(depth_m * 1000).astype(np.uint16)
+
+    color_rays = compute_bearing_table(K_color, D_color, color_size, use_fisheye=False)
+    truth_m = render_depth(color_rays, np.linalg.inv(depth_to_color), **scene)
+
+    registration = DepthToColorRegistration(K_depth, D_depth, depth_size,
+                                            K_color, D_color, color_size,
+                                            depth_to_color, depth_scale=0.001)
+    registered = registration.register(depth_image).copy()
+
+    # 精度: 只统计有配准深度的像素
+    filled = registered > 0
+    error_mm = np.abs(registered[filled] - truth_m[filled] * 1000)
+    foreground = (truth_m > 0) & (truth_m < 2.0)
+    leaked = int((registered[foreground] > 2000).sum())
+
+    # z-buffer 与 np.minimum.at 结果一致
+    reference = minimum_at_register(registration, depth_image)
+    assert np.array_equal(reference, registered)
+
+    print("\n" + "="*72)
+    print(f"深度->彩色配准: 深度 {depth_size[0]}x{depth_size[1]} -> 彩色 {color_size[0]}x{color_size[1]}")
+    print("="*72)
+    print(f"  有效配准像素: {filled.sum()} ({filled.mean():.1%})")
+    print(f"  深度误差: 中位数 {np.median(error_mm):.2f}mm, P99 {np.percentile(error_mm, 99):.2f}mm")
+    print(f"  遮挡板区域误配背景深度像素: {leaked}")
+    print("-"*72)
+    print(f"{'实现':<40} {'耗时(ms)':>10} {'帧率(FPS)':>10}")
+    print("-"*72)
+    for name, func in (('np.minimum.at z-buffer', lambda: minimum_at_register(registration, depth_image)),
+                       ('DepthToColorRegistration.register', lambda: registration.register(depth_image))):
+        elapsed = measure(func, args.repeats)
+        print(f"{name:<40} {elapsed:>10.2f} {1000 / elapsed:>10.1f}")
+    print("="*72)
+
+
+if __name__ == '__main__':
+    main()
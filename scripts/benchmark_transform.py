@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+点云坐标变换基准测试
+比较旧版齐次坐标实现与 transform_point_to_vehicle 快速路径的耗时和内存分配
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import argparse
+import time
+import tracemalloc
+import numpy as np
+from src.calibration import ExtrinsicCalibration
+
+
+def legacy_transform(transformation_matrix, point_camera):
+    """旧版实现: 构造齐次坐标后乘 4x4 矩阵"""
+    ones = np.ones((point_camera.shape[0], 1))
+    points_homo = np.hstack([point_camera, ones])
+    points_vehicle = (transformation_matrix @ points_homo.T).T
+    return points_vehicle[:, :3]
+
+
+def measure(func, repeats):
+    """
+    测量耗时中位数(毫秒)和单次调用的峰值额外内存(MB)
+    """
+    func()  # 预热
+    times = []
+    for _ in range(repeats):
+        t_start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - t_start) * 1000)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return float(np.median(times)), peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='点云坐标变换基准测试')
+    parser.add_argument('--points', type=int, default=1_000_000,
+                       help='点数，默认: 1000000')
+    parser.add_argument('--repeats', type=int, default=20,
+                       help='重复次数，默认: 20')
+    args = parser.parse_args()
+
+    calibrator = ExtrinsicCalibration()
+    calibrator.from_manual_measurement((1.5, 0.0, 1.8), (0.0, -10.0, 0.0))
+
+    rng = np.random.default_rng(0)
+    points64 = rng.uniform(-10, 10, size=(args.points, 3))
+    points32 = points64.astype(np.float32)
+    out64 = np.empty_like(points64)
+    out32 = np.empty_like(points32)
+
+    # 有序点云 (H, W, 3)，按 4:3 取近似尺寸
+    width = int(np.sqrt(args.points * 4 / 3))
+    height = args.points // width
+    organized32 = points32[:height * width].reshape(height, width, 3)
+    organized_out32 = np.empty_like(organized32)
+
+    # 正确性检查
+    reference = legacy_transform(calibrator.transformation_matrix, points64)
+    assert np.allclose(calibrator.transform_point_to_vehicle(points64), reference)
+    assert np.allclose(calibrator.transform_point_to_vehicle(points32), reference, atol=1e-4)
+
+    cases = [
+        ('legacy float64 (hstack + 4x4)', lambda: legacy_transform(calibrator.transformation_matrix, points64)),
+        ('fast float64', lambda: calibrator.transform_point_to_vehicle(points64)),
+        ('fast float64 out=', lambda: calibrator.transform_point_to_vehicle(points64, out=out64)),
+        ('fast float32', lambda: calibrator.transform_point_to_vehicle(points32)),
+        ('fast float32 out=', lambda: calibrator.transform_point_to_vehicle(points32, out=out32)),
+        (f'fast float32 ({height}, {width}, 3) out=',
+         lambda: calibrator.transform_point_to_vehicle(organized32, out=organized_out32)),
+    ]
+
+    print("\n" + "="*72)
+    print(f"点云坐标变换基准测试: {args.points} 点, 重复 {args.repeats} 次")
+    print("="*72)
+    print(f"{'实现':<40} {'耗时中位数(ms)':>14} {'峰值分配(MB)':>14}")
+    print("-"*72)
+    for name, func in cases:
+        elapsed, peak = measure(func, args.repeats)
+        print(f"{name:<40} {elapsed:>14.2f} {peak:>14.1f}")
+    print("="*72)
+
+
+if __name__ == '__main__':
+    main()
@@ -18,30 +18,92 @@ import argparse
 import cv2
 import numpy as np
 from src.calibration import ExtrinsicCalibration
+from src.calibration.extrinsic_calibration import PNP_SOLVERS
 from src.utils import save_calibration, load_calibration, visualize_calibration, plot_camera_pose_3d
 
 
+def read_video_frames(video_path, max_frames, frame_step=1):
+    """
+    从视频中读取帧
+    
+    Args:
+        video_path: 视频路径
+        max_frames: 最大帧数
+        frame_step: 抽帧间隔
+        
+    Returns:
+        图像列表
+    """
+    capture = cv2.VideoCapture(video_path)
+    if not capture.isOpened():
+        print(f"错误: 无法打开视频 {video_path}")
+        return []
+    
+    frames = []
+    index = 0
+    while len(frames) < max_frames:
+        ret, frame = capture.read()
+        if not ret:
+            break
+        if index % frame_step == 0:
+            frames.append(frame)
+        index += 1
+    capture.release()
+    return frames
+
+
 def main():
     parser = argparse.ArgumentParser(description='自动外参标定')
     parser.add_argument('--intrinsic', type=str, required=True,
                        help='内参文件路径')
-    parser.add_argument('--image', type=str, required=True,
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--image', type=str,
                        help='包含标定板的图像路径')
+    source.add_argument('--images', type=str, nargs='+',
+                       help='多帧模式: 包含标定板的多张图像路径（相机与标定板静止）')
+    source.add_argument('--video', type=str,
+                       help='多帧模式: 包含标定板的短视频（相机与标定板静止）')
     parser.add_argument('--output', type=str, default='config/extrinsic.yaml',
                        help='输出文件路径')
     parser.add_argument('--checkerboard', type=int, nargs=2, default=[12, 8],
                        help='棋盘格内角点数量 (列 行) - 对应X轴和Y轴方向')
     parser.add_argument('--square-size', type=float, default=0.038,
                        help='棋盘格方格大小(米)')
-    parser.add_argument('--board-to-vehicle', type=float, nargs=6, required=True,
+    parser.add_argument('--board-to-vehicle', type=float, nargs=6, default=None,
                        help='棋盘格左上角在车辆坐标系中的位置和姿态 (x y z roll pitch yaw) 单位:米和度')
+    parser.add_argument('--boards-config', type=str, default=None,
+                       help='多棋盘格模式: 棋盘格配置YAML（每块的尺寸、方格大小及在车辆坐标系中的位姿），仅支持 --image')
     parser.add_argument('--rear-axle-offset', type=float, nargs=3, default=[0, 0, 0],
                        help='相机安装位置相对后轴中心的粗略偏移 (x y z) 单位:米, 用于初始估计')
     parser.add_argument('--fisheye', action='store_true', default=True,
                        help='使用鱼眼相机模型 (默认: True)')
     parser.add_argument('--no-fisheye', action='store_false', dest='fisheye',
                        help='使用标准针孔相机模型')
+    parser.add_argument('--pnp-solver', type=str, default='iterative', choices=list(PNP_SOLVERS),
+                       help='PnP求解器: iterative(默认) / ippe / sqpnp / epnp (快速闭式解) / ransac (抗遮挡与错序角点)')
+    parser.add_argument('--pnp-refine', action='store_true',
+                       help='PnP求解后追加LM精化（ransac时仅使用内点）')
+    parser.add_argument('--ransac-threshold', type=float, default=2.0,
+                       help='RANSAC内点重投影阈值(像素)，默认: 2.0')
+    parser.add_argument('--max-frames', type=int, default=30,
+                       help='多帧模式: 从视频中读取的最大帧数，默认: 30')
+    parser.add_argument('--frame-step', type=int, default=1,
+                       help='多帧模式: 视频抽帧间隔，默认: 1')
+    parser.add_argument('--multi-method', type=str, default='joint', choices=['joint', 'robust'],
+                       help='多帧模式: joint=联合PnP, robust=逐帧PnP后在SO(3)上鲁棒融合，默认: joint')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='多帧模式: 并行检测线程数')
     args = parser.parse_args()
+    if args.frame_step < 1:
+        parser.error('--frame-step 必须为正整数')
+    
+    boards = None
+    if args.boards_config:
+        if args.image is None:
+            parser.error('--boards-config 仅支持单张图像 (--image)')
+        boards = load_calibration(args.boards_config)['boards']
+    elif args.board_to_vehicle is None:
+        parser.error('需要指定 --board-to-vehicle 或 --boards-config')
     
     print("\n" + "="*60)
     print("相机外参标定 - 自动标定方法")
@@ -52,9 +114,18 @@ def main():
     print(f"  相机坐标系: 光心为原点, X右 Y下 Z前")
     print(f"\n标定参数:")
     print(f"  相机模型: {'鱼眼相机' if args.fisheye else '标准针孔相机'}")
-    print(f"  棋盘格大小: {args.checkerboard[0]}x{args.checkerboard[1]} (列x行)")
-    print(f"  方格尺寸: {args.square_size} 米")
-    print(f"  棋盘格到车辆: 位置{args.board_to_vehicle[:3]}, 姿态{args.board_to_vehicle[3:]}度")
+    print(f"  PnP求解器: {args.pnp_solver}{' + LM精化' if args.pnp_refine else ''}")
+    if boards:
+        print(f"  多棋盘格模式: {len(boards)} 块")
+        for i, board in enumerate(boards):
+            size = board['checkerboard_size']
+            pose = board['board_to_vehicle_pose']
+            print(f"    {board.get('name', f'board_{i}')}: {size[0]}x{size[1]}, "
+                  f"方格 {board['square_size']} 米, 位置{pose[:3]}, 姿态{pose[3:]}度")
+    else:
+        print(f"  棋盘格大小: {args.checkerboard[0]}x{args.checkerboard[1]} (列x行)")
+        print(f"  方格尺寸: {args.square_size} 米")
+        print(f"  棋盘格到车辆: 位置{args.board_to_vehicle[:3]}, 姿态{args.board_to_vehicle[3:]}度")
     print(f"  后轴偏移估计: {args.rear_axle_offset}")
     print("="*60 + "\n")
     
@@ -66,30 +137,79 @@ def main():
     
     # 读取图像
     print("读取标定图像...")
-    image = cv2.imread(args.image)
-    if image is None:
-        print(f"错误: 无法读取图像 {args.image}")
+    if args.image:
+        images = [cv2.imread(args.image)]
+        if images[0] is None:
+            print(f"错误: 无法读取图像 {args.image}")
+            return
+    elif args.images:
+        images = []
+        for path in args.images:
+            img = cv2.imread(path)
+            if img is None:
+                print(f"警告: 无法读取图像 {path}，已跳过")
+                continue
+            images.append(img)
+    else:
+        images = read_video_frames(args.video, args.max_frames, args.frame_step)
+    
+    if not images:
+        print("错误: 没有可用的标定图像")
         return
+    image = images[0]
+    multi_frame = args.image is None
+    if multi_frame:
+        print(f"多帧模式: {len(images)} 帧, 融合方法: {args.multi_method}")
     
     # 执行标定
     print("检测标定板...")
     calibrator = ExtrinsicCalibration()
     
     try:
-        result = calibrator.from_checkerboard(
-            image=image,
-            camera_matrix=camera_matrix,
-            dist_coeffs=dist_coeffs,
-            checkerboard_size=tuple(args.checkerboard),
-            square_size=args.square_size,
-            board_to_vehicle_pose=args.board_to_vehicle,
-            rear_axle_offset=args.rear_axle_offset,
-            use_fisheye=args.fisheye
-        )
+        if boards:
+            result = calibrator.from_multi_checkerboard(
+                image=image,
+                camera_matrix=camera_matrix,
+                dist_coeffs=dist_coeffs,
+                boards=boards,
+                use_fisheye=args.fisheye,
+                solver=args.pnp_solver,
+                refine=args.pnp_refine,
+                ransac_threshold=args.ransac_threshold
+            )
+        elif multi_frame:
+            result = calibrator.from_checkerboard_frames(
+                images=images,
+                camera_matrix=camera_matrix,
+                dist_coeffs=dist_coeffs,
+                checkerboard_size=tuple(args.checkerboard),
+                square_size=args.square_size,
+                board_to_vehicle_pose=args.board_to_vehicle,
+                use_fisheye=args.fisheye,
+                method=args.multi_method,
+                max_workers=args.workers,
+                solver=args.pnp_solver,
+                refine=args.pnp_refine,
+                ransac_threshold=args.ransac_threshold
+            )
+        else:
+            result = calibrator.from_checkerboard(
+                image=image,
+                camera_matrix=camera_matrix,
+                dist_coeffs=dist_coeffs,
+                checkerboard_size=tuple(args.checkerboard),
+                square_size=args.square_size,
+                board_to_vehicle_pose=args.board_to_vehicle,
+                rear_axle_offset=args.rear_axle_offset,
+                use_fisheye=args.fisheye,
+                solver=args.pnp_solver,
+                refine=args.pnp_refine,
+                ransac_threshold=args.ransac_threshold
+            )
         
-        # 可视化检测结果
+        # 可视化检测结果（多棋盘格模式下跳过）
         gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        ret, corners = cv2.findChessboardCorners(gray, tuple(args.checkerboard), None)
+        ret, corners = (False, None) if boards else cv2.findChessboardCorners(gray, tuple(args.checkerboard), None)
         
         if ret:
             img_with_corners = image.copy()
@@ -10,7 +10,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 import argparse
 import cv2
 import numpy as np
-from src.calibration import IntrinsicCalibration
+from src.calibration import IntrinsicCalibration, PreviewUndistorter
 from src.utils import save_calibration, visualize_calibration
 
 
@@ -80,19 +80,12 @@ def main():
     
     # 测试去畸变
     print("\n测试去畸变效果...")
-    test_image = sample_image.copy()
-    undistorted = calibrator.undistort_image(test_image)
     
-    # 显示对比 - 转灰度并拼接显示
-    if len(test_image.shape) == 3:
-        test_gray = cv2.cvtColor(test_image, cv2.COLOR_BGR2GRAY)
+    # 显示对比 - 转灰度，并直接按显示分辨率去畸变（一次remap完成去畸变和缩放）
+    if len(sample_image.shape) == 3:
+        test_gray = cv2.cvtColor(sample_image, cv2.COLOR_BGR2GRAY)
     else:
-        test_gray = test_image
-        
-    if len(undistorted.shape) == 3:
-        undist_gray = cv2.cvtColor(undistorted, cv2.COLOR_BGR2GRAY)
-    else:
-        undist_gray = undistorted
+        test_gray = sample_image
 
     # 缩放图像以适应屏幕显示
     display_height = 600
@@ -100,11 +93,12 @@ def main():
     aspect_ratio = w / h
     display_width = int(display_height * aspect_ratio)
     
-    test_show = cv2.resize(test_gray, (display_width, display_height))
-    undist_show = cv2.resize(undist_gray, (display_width, display_height))
+    undistorter = PreviewUndistorter.from_intrinsic_dict(
+        result, image_size=image_size, display_size=(display_width, display_height)
+    )
     
     # 左右拼接
-    combined = np.hstack((test_show, undist_show))
+    combined = undistorter.side_by_side(test_gray)
     
     cv2.imshow('Original (Left) vs Undistorted (Right) - Gray', combined)
     print("按任意键关闭窗口...")
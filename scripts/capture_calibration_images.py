@@ -1,16 +1,46 @@
 #!/usr/bin/env python3
 """
 采集标定图像
-用于内参标定的图像采集脚本
+用于内参标定的图像采集脚本; --auto 模式下自动采集清晰、完整且与已采集视图不同的棋盘格图像,
+覆盖率达到目标后结束。预览上半透明地标出尚未被已保存图像覆盖的网格单元
 """
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 import cv2
+import numpy as np
 import argparse
 from datetime import datetime
-from src.camera import FemtoBoltCamera
+from src.camera import create_camera, ChunkedRecorder, LatencyHistogram
+from src.calibration import AutoCaptureSelector, CoverageGrid
+from src.utils import load_calibration
+
+
+def save_image(output, index, image):
+    """保存一张标定图像，返回文件名"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = os.path.join(output, f"calib_{index:03d}_{timestamp}.png")
+    cv2.imwrite(filename, image)
+    return filename
+
+
+def detect_corners(image, checkerboard_size):
+    """快速检测棋盘格角点（只用于覆盖统计，不做亚像素优化），未检测到时返回None"""
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    flags = cv2.CALIB_CB_ADAPTIVE_THRESH + cv2.CALIB_CB_NORMALIZE_IMAGE + cv2.CALIB_CB_FAST_CHECK
+    found, corners = cv2.findChessboardCorners(gray, checkerboard_size, flags)
+    return corners if found else None
+
+
+def save_selected(results, output, image_count):
+    """保存自动采集中通过筛选的帧，返回新的图像计数"""
+    for result in results:
+        if result['accepted']:
+            filename = save_image(output, image_count, result['image'])
+            image_count += 1
+            print(f"✓ 已保存: {filename} ({result['reason']}, 覆盖率 {result['coverage']:.0%})")
+    return image_count
 
 
 def main():
@@ -23,13 +53,41 @@ def main():
                        help='图像高度')
     parser.add_argument('--fps', type=int, default=30,
                        help='帧率')
+    parser.add_argument('--threaded', action='store_true',
+                       help='后台线程采集（显示/保存较慢时不阻塞采集，始终处理最新帧）')
+    parser.add_argument('--pool', action='store_true',
+                       help='使用预分配的帧缓冲池（不逐帧分配图像内存）')
+    parser.add_argument('--playback', type=str,
+                       help='回放录制目录代替相机（见 record_stream.py）')
+    parser.add_argument('--playback-speed', type=float, default=1.0,
+                       help='回放速度倍率，0 表示尽可能快，默认: 1.0')
+    parser.add_argument('--record', type=str,
+                       help='同时把完整的彩色/深度数据流后台压缩录制到该目录（可用 --playback 回放）')
+    parser.add_argument('--auto', action='store_true',
+                       help='自动采集: 只保存清晰、完整可见且位姿或覆盖区域与已采集视图不同的帧')
+    parser.add_argument('--target-coverage', type=float, default=0.9,
+                       help='--auto 的目标覆盖率（被覆盖的网格单元比例），默认: 0.9')
+    parser.add_argument('--max-views', type=int, default=60,
+                       help='--auto 最多采集的图像数，默认: 60')
+    parser.add_argument('--checkerboard', type=int, nargs=2, default=[12, 8],
+                       help='棋盘格内角点数量 (列 行)')
+    parser.add_argument('--grid', type=int, nargs=2, default=[8, 6], metavar=('COLS', 'ROWS'),
+                       help='覆盖网格大小 (列 行)，默认: 8 6')
+    parser.add_argument('--intrinsic', type=str,
+                       help='--auto 用于位姿估计的近似内参文件（可选，默认按图像宽度估计焦距）')
+    parser.add_argument('--no-display', action='store_true',
+                       help='不显示图像（配合 --auto 从录制中自动挑选标定图像）')
+    parser.add_argument('--latency', type=float, nargs='?', const=5.0, default=None, metavar='SECONDS',
+                       help='统计各处理阶段的帧延迟直方图，每隔 SECONDS 秒输出一次（默认: 5）')
     args = parser.parse_args()
     
     # 创建输出目录
     os.makedirs(args.output, exist_ok=True)
     
     # 初始化相机
-    camera = FemtoBoltCamera(width=args.width, height=args.height, fps=args.fps)
+    camera = create_camera(width=args.width, height=args.height, fps=args.fps,
+                           playback=args.playback, playback_speed=args.playback_speed,
+                           threaded=args.threaded, use_pool=args.pool)
     
     if not camera.start():
         print("无法启动相机，使用模拟模式进行演示")
@@ -40,6 +98,7 @@ def main():
     print("\n使用说明:")
     print("  - 将棋盘格标定板放置在不同位置和角度")
     print("  - 按 SPACE 键保存当前图像")
+    print("  - 按 'c' 键显示/隐藏覆盖网格（红色: 没有角点，橙色: 角点不足）")
     print("  - 按 'q' 键退出")
     print("\n建议:")
     print("  - 采集20-30张图像")
@@ -48,39 +107,107 @@ def main():
     print("  - 保持标定板完全可见且清晰")
     print("="*60 + "\n")
     
+    # 后台录制: 写盘跟不上时丢帧计数，不阻塞预览
+    recorder = None
+    if args.record:
+        recorder = ChunkedRecorder(args.record, camera.width, camera.height, camera.fps,
+                                   camera=camera, block=False)
+    
+    # 自动采集: 检测和筛选在工作线程中进行
+    selector = None
+    if args.auto:
+        intrinsic = {}
+        if args.intrinsic:
+            intrinsic_data = load_calibration(args.intrinsic)
+            intrinsic = dict(camera_matrix=intrinsic_data['camera_matrix'],
+                             dist_coeffs=intrinsic_data['distortion_coeffs'],
+                             use_fisheye=intrinsic_data.get('camera_model', 'fisheye') == 'fisheye')
+        selector = AutoCaptureSelector(tuple(args.checkerboard), (camera.width, camera.height),
+                                       grid_size=tuple(args.grid), target_coverage=args.target_coverage,
+                                       max_views=args.max_views, **intrinsic)
+        selector.start()
+        print(f"自动采集: 目标覆盖率 {args.target_coverage:.0%}，最多 {args.max_views} 张\n")
+    
+    # 覆盖网格: 只在保存图像时更新，叠加层在统计变化后才重新绘制
+    coverage = selector.coverage if selector is not None else \
+        CoverageGrid((camera.width, camera.height), tuple(args.grid))
+    show_coverage = True
+    
     image_count = 0
+    display_image = None  # 预分配的显示缓冲区，逐帧复用
+    latency = LatencyHistogram(args.latency) if args.latency is not None else None
     
     try:
         while True:
             # 获取图像
-            color_image, depth_image = camera.get_frames()
+            frame = camera.get_frame()
             
-            if color_image is None:
+            if frame is None:
                 print("无法获取图像")
                 break
+            color_image = frame.color
+            if recorder is not None:
+                recorder.write(frame.color, frame.depth, frame.timestamp,
+                               frame.device_timestamp, frame.frame_number)
             
-            # 显示图像
-            display_image = color_image.copy()
-            cv2.putText(display_image, f"已保存: {image_count} 张", 
-                       (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-            cv2.putText(display_image, "SPACE=保存 | Q=退出", 
-                       (10, display_image.shape[0] - 10), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-            
-            cv2.imshow('采集标定图像', display_image)
+            # 自动采集: 提交当前帧（工作线程忙时跳过），保存已通过筛选的帧
+            if selector is not None:
+                selector.submit(color_image)
+                image_count = save_selected(selector.poll(), args.output, image_count)
             
-            key = cv2.waitKey(1) & 0xFF
+            # 显示图像
+            key = -1
+            if not args.no_display:
+                if display_image is None or display_image.shape != color_image.shape:
+                    display_image = np.empty_like(color_image)
+                np.copyto(display_image, color_image)
+                if show_coverage:
+                    coverage.draw_overlay(display_image)
+                cv2.putText(display_image, f"已保存: {image_count} 张", 
+                           (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+                cv2.putText(display_image, f"覆盖率 {coverage.coverage():.0%}",
+                           (display_image.shape[1] - 150, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+                if selector is not None and selector.last_result is not None:
+                    status = selector.last_result
+                    cv2.putText(display_image, f"{status['reason']} | 覆盖率 {status['coverage']:.0%}",
+                               (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.6,
+                               (0, 255, 0) if status['accepted'] else (0, 200, 255), 2)
+                cv2.putText(display_image, "SPACE=保存 | C=覆盖网格 | Q=退出", 
+                           (10, display_image.shape[0] - 10), 
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+                
+                cv2.imshow('采集标定图像', display_image)
+                
+                key = cv2.waitKey(1) & 0xFF
+                frame.mark('display')
             
             # 按空格键保存图像
             if key == ord(' '):
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = os.path.join(args.output, f"calib_{image_count:03d}_{timestamp}.png")
-                cv2.imwrite(filename, color_image)
-                print(f"✓ 已保存: {filename}")
+                filename = save_image(args.output, image_count, color_image)
+                frame.mark('save')
                 image_count += 1
+                if selector is None:
+                    corners = detect_corners(color_image, tuple(args.checkerboard))
+                    if corners is not None:
+                        coverage.add(corners)
+                        print(f"✓ 已保存: {filename} (覆盖率 {coverage.coverage():.0%})")
+                    else:
+                        print(f"✓ 已保存: {filename} (未检测到棋盘格，不计入覆盖率)")
+                else:
+                    print(f"✓ 已保存: {filename}")
+            elif key == ord('c'):
+                show_coverage = not show_coverage
+            
+            if latency is not None:
+                latency.add(frame)
+                latency.maybe_report()
+            camera.release_frame(frame)
             
             # 按q键退出
-            elif key == ord('q'):
+            if key == ord('q'):
+                break
+            if selector is not None and selector.done:
+                print(f"\n✓ 自动采集完成: 覆盖率 {selector.coverage.coverage():.0%}")
                 break
     
     except KeyboardInterrupt:
@@ -88,7 +215,37 @@ def main():
     
     finally:
         camera.stop()
-        cv2.destroyAllWindows()
+        if selector is not None:
+            selector.stop()
+        if recorder is not None:
+            recorder.close()
+        if not args.no_display:
+            cv2.destroyAllWindows()
+    
+    stats = camera.get_capture_stats()
+    if stats is not None:
+        print(f"\n后台采集: {stats['pushed']} 帧 ({stats['capture_fps']:.1f} FPS), "
+              f"跳过 {stats['skipped']} 帧, 丢弃 {stats['dropped']} 帧, "
+              f"最大积压 {stats['max_queue_depth']}/{stats['capacity']}")
+    if camera.frame_pool is not None:
+        pool_stats = camera.frame_pool.get_stats()
+        print(f"帧缓冲池: 分配 {pool_stats['allocated']} 帧, 取用 {pool_stats['acquired']} 次, "
+              f"扩容 {pool_stats['grown']} 次")
+    
+    if recorder is not None:
+        record_stats = recorder.get_stats()
+        print(f"录制: {record_stats['written']} 帧写入 {args.record}, 丢弃 {record_stats['dropped']} 帧, "
+              f"压缩比 {record_stats['compression_ratio']:.2f}")
+    if latency is not None:
+        print(f"\n帧延迟（相对主机收到帧）:\n{latency.format_report()}")
+    
+    if selector is not None:
+        # 工作线程停止前完成的最后一次评估
+        image_count = save_selected(selector.poll(), args.output, image_count)
+    if coverage.views:
+        print(f"\n覆盖率: {coverage.coverage():.0%} ({coverage.views} 张含棋盘格)")
+        if coverage.missing_cells():
+            print(f"未覆盖的网格单元 (行, 列): {coverage.missing_cells()}")
     
     print(f"\n共采集 {image_count} 张图像")
     print(f"图像保存在: {args.output}")
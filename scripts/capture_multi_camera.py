@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+多相机同步采集
+每台相机在自己的线程中采集, 按时间戳配对成同步帧组; 按 SPACE 保存当前帧组（每台相机一张图像）,
+结束时打印每台相机的帧率、丢帧和延迟统计
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import argparse
+import cv2
+import numpy as np
+from src.camera import create_camera, MultiCameraCapture
+
+
+def tile_preview(frame_set, names, tile_width=480):
+    """把帧组中各相机的彩色图像缩小后拼成一张预览图"""
+    tiles = []
+    for name in names:
+        color = frame_set.frames[name].color
+        scale = tile_width / color.shape[1]
+        tile = cv2.resize(color, (tile_width, int(color.shape[0] * scale)), interpolation=cv2.INTER_AREA)
+        cv2.putText(tile, name, (10, 25), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+        tiles.append(tile)
+    height = max(tile.shape[0] for tile in tiles)
+    tiles = [cv2.copyMakeBorder(tile, 0, height - tile.shape[0], 0, 0, cv2.BORDER_CONSTANT) for tile in tiles]
+    columns = min(len(tiles), 3)
+    while len(tiles) % columns:
+        tiles.append(np.zeros_like(tiles[0]))
+    rows = [np.hstack(tiles[i:i + columns]) for i in range(0, len(tiles), columns)]
+    return np.vstack(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='多相机同步采集')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--serials', type=str, nargs='+',
+                       help='相机序列号（每台一个）')
+    source.add_argument('--playback', type=str, nargs='+',
+                       help='回放录制目录代替相机（每台一个，见 record_stream.py）')
+    source.add_argument('--mock', type=int,
+                       help='使用指定数量的模拟相机（无硬件测试）')
+    parser.add_argument('--output', type=str, default='data/multi_camera',
+                       help='帧组保存目录，默认: data/multi_camera')
+    parser.add_argument('--width', type=int, default=640,
+                       help='图像宽度')
+    parser.add_argument('--height', type=int, default=480,
+                       help='图像高度')
+    parser.add_argument('--fps', type=int, default=30,
+                       help='帧率')
+    parser.add_argument('--tolerance', type=float, default=10.0,
+                       help='同一帧组内的最大时间差（毫秒），默认: 10')
+    parser.add_argument('--frames', type=int, default=None,
+                       help='采集指定数量的帧组后退出')
+    parser.add_argument('--no-display', action='store_true',
+                       help='不显示预览（配合 --frames 测量同步性能）')
+    args = parser.parse_args()
+
+    if args.serials:
+        sources = {serial: dict(serial=serial) for serial in args.serials}
+    elif args.playback:
+        sources = {os.path.basename(os.path.normpath(path)): dict(playback=path) for path in args.playback}
+    else:
+        sources = {f'cam{i}': {} for i in range(args.mock)}
+
+    # 每台相机后台采集，'next' 顺序读取由同步线程完成
+    cameras = {name: create_camera(width=args.width, height=args.height, fps=args.fps,
+                                   threaded=True, buffer_size=8, **kwargs)
+               for name, kwargs in sources.items()}
+    capture = MultiCameraCapture(cameras, tolerance=args.tolerance / 1000)
+    names = list(cameras)
+
+    if not capture.start():
+        print("警告: 部分相机无法启动，使用模拟模式")
+    print(f"同步采集 {len(cameras)} 台相机（容差 {args.tolerance:g}ms）")
+    if not args.no_display:
+        print("按 SPACE 保存当前帧组，按 'q' 退出")
+
+    saved = 0
+    received = 0
+    try:
+        while args.frames is None or received < args.frames:
+            frame_set = capture.get_frame_set(mode='latest' if not args.no_display else 'next')
+            if frame_set is None:
+                print("采集结束")
+                break
+            received += 1
+
+            if args.no_display:
+                continue
+            preview = tile_preview(frame_set, names)
+            cv2.putText(preview, f"spread {frame_set.spread * 1000:.1f}ms  saved {saved}",
+                        (10, preview.shape[0] - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+            cv2.imshow('多相机同步采集', preview)
+
+            key = cv2.waitKey(1) & 0xFF
+            if key == ord(' '):
+                directory = os.path.join(args.output, f"set_{saved:03d}")
+                os.makedirs(directory, exist_ok=True)
+                for name, frame in frame_set.frames.items():
+                    cv2.imwrite(os.path.join(directory, f"{name}.png"), frame.color)
+                print(f"✓ 已保存: {directory} (时间差 {frame_set.spread * 1000:.1f}ms)")
+                saved += 1
+            elif key == ord('q'):
+                break
+
+    except KeyboardInterrupt:
+        print("\n用户中断")
+
+    finally:
+        capture.stop()
+        if not args.no_display:
+            cv2.destroyAllWindows()
+
+    stats = capture.get_stats()
+    print(f"\n帧组: {stats['pushed']} 组 ({stats['set_fps']:.1f} FPS), 交付 {stats['delivered']}, "
+          f"跳过 {stats['skipped']}, 丢弃 {stats['dropped']}")
+    print(f"{'相机':<16}{'采集FPS':>9}{'配对':>7}{'未配对':>8}{'缓冲丢弃':>10}{'平均延迟ms':>12}{'最大偏差ms':>12}")
+    for name, device in stats['devices'].items():
+        print(f"{name:<16}{device['capture_fps']:>9.1f}{device['matched']:>7}{device['unmatched']:>8}"
+              f"{device['buffer_dropped']:>10}{device['mean_latency_ms']:>12.2f}{device['max_offset_ms']:>12.2f}")
+    if saved:
+        print(f"\n共保存 {saved} 组，保存在: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+生成合成标定数据集
+按视图数、分辨率、镜头模型和噪声的组合, 用 SyntheticBoardCamera 渲染内参标定图像和外参标定工位图像,
+并把真值内参、每张图像的棋盘格位姿和相机到车辆的外参写入 ground_truth.yaml, 供 benchmark_calibration.py 使用
+
+数据集目录结构:
+    <output>/<name>/intrinsic/view_000.png ...   随机位姿的棋盘格
+    <output>/<name>/extrinsic/frame_000.png ...  标定工位上静止的棋盘格（多帧, 噪声独立）
+    <output>/<name>/ground_truth.yaml
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import argparse
+import itertools
+import cv2
+import numpy as np
+from src.camera import SyntheticBoardCamera
+from src.calibration import ExtrinsicCalibration
+from src.utils import save_calibration
+
+# 镜头预设: 焦距为图像宽度的倍数, 畸变系数
+LENS_PRESETS = {
+    'pinhole': {'focal_ratio': 0.9, 'dist_coeffs': [-0.12, 0.05, 0.0005, -0.0003, 0.0]},
+    'fisheye': {'focal_ratio': 0.45, 'dist_coeffs': [0.05, -0.01, 0.002, -0.0005]},
+}
+
+# 外参真值: 相机在车辆坐标系中的位置, 棋盘格左上角位姿 (x y z roll pitch yaw)
+CAMERA_POSITION = (1.5, 0.0, 1.2)
+BOARD_TO_VEHICLE_POSE = [2.3, 0.2, 1.33, 0.0, 0.0, 0.0]
+
+
+def camera_to_vehicle_matrix(yaw_deg, pitch_deg):
+    """光轴朝车辆前方、带少量偏航/俯仰的相机到车辆变换"""
+    # 相机 X(右) -> 车辆 -Y, 相机 Y(下) -> 车辆 -Z, 相机 Z(前) -> 车辆 X
+    base = np.array([[0, 0, 1], [-1, 0, 0], [0, -1, 0]], dtype=np.float64)
+    yaw = cv2.Rodrigues(np.array([0.0, 0.0, np.deg2rad(yaw_deg)]))[0]
+    pitch = cv2.Rodrigues(np.array([0.0, np.deg2rad(pitch_deg), 0.0]))[0]
+    T = np.eye(4)
+    T[:3, :3] = yaw @ pitch @ base
+    T[:3, 3] = CAMERA_POSITION
+    return T
+
+
+def render_views(camera, directory, prefix, count):
+    """渲染 count 帧并保存为 PNG，返回每帧真值位姿"""
+    os.makedirs(directory, exist_ok=True)
+    camera.start()
+    poses = []
+    for i in range(count):
+        color_image, _ = camera.get_frames()
+        truth = camera.get_ground_truth()
+        cv2.imwrite(os.path.join(directory, f"{prefix}_{i:03d}.png"), color_image)
+        poses.append({'rvec': truth['rvec'], 'tvec': truth['tvec']})
+    camera.stop()
+    return poses
+
+
+def generate_dataset(path, model, image_size, views, noise_sigma, blur_sigma,
+                     checkerboard_size, square_size, extrinsic_frames, seed):
+    """
+    生成一个数据集
+
+    Returns:
+        真值字典（同时写入 ground_truth.yaml）
+    """
+    width, height = image_size
+    preset = LENS_PRESETS[model]
+    focal = preset['focal_ratio'] * width
+    camera_matrix = np.array([[focal, 0, width / 2 + 1.5], [0, focal * 1.002, height / 2 - 2.0], [0, 0, 1]])
+    dist_coeffs = np.array(preset['dist_coeffs'])
+    use_fisheye = model == 'fisheye'
+    common = dict(image_size=image_size, use_fisheye=use_fisheye, checkerboard_size=checkerboard_size,
+                  square_size=square_size, noise_sigma=noise_sigma, blur_sigma=blur_sigma)
+
+    # 内参: 随机位姿, 距离按焦距缩放使棋盘格在各分辨率下占据相近的画面比例
+    scale = focal / 576.0
+    camera = SyntheticBoardCamera(camera_matrix, dist_coeffs, seed=seed,
+                                  distance_range=(0.35 * scale, 0.9 * scale), **common)
+    intrinsic_poses = render_views(camera, os.path.join(path, 'intrinsic'), 'view', views)
+
+    # 外参: 标定工位上静止的棋盘格, 相机带随机的小角度安装偏差
+    rng = np.random.default_rng(seed)
+    camera_to_vehicle = camera_to_vehicle_matrix(*rng.uniform(-3.0, 3.0, size=2))
+    board_to_vehicle = ExtrinsicCalibration._board_to_vehicle_matrix(BOARD_TO_VEHICLE_POSE)
+    board_to_camera = np.linalg.inv(camera_to_vehicle) @ board_to_vehicle
+    rvec = cv2.Rodrigues(board_to_camera[:3, :3])[0].ravel()
+    tvec = board_to_camera[:3, 3]
+    camera = SyntheticBoardCamera(camera_matrix, dist_coeffs, seed=seed + 1,
+                                  poses=[(rvec, tvec)] * extrinsic_frames, **common)
+    pixels = camera.project(camera.object_points, rvec, tvec)
+    if not ((pixels >= 0) & (pixels < (width, height))).all():
+        raise ValueError(f"{model} {width}x{height}: 外参标定板不完整可见")
+    render_views(camera, os.path.join(path, 'extrinsic'), 'frame', extrinsic_frames)
+
+    truth = {
+        'camera_model': model,
+        'image_width': width,
+        'image_height': height,
+        'camera_matrix': camera_matrix,
+        'distortion_coeffs': dist_coeffs,
+        'checkerboard_size': list(checkerboard_size),
+        'square_size': square_size,
+        'noise_sigma': noise_sigma,
+        'blur_sigma': blur_sigma,
+        'seed': seed,
+        'intrinsic_views': intrinsic_poses,
+        'board_to_vehicle_pose': BOARD_TO_VEHICLE_POSE,
+        'camera_to_vehicle': camera_to_vehicle,
+    }
+    save_calibration(truth, os.path.join(path, 'ground_truth.yaml'))
+    return truth
+
+
+def main():
+    parser = argparse.ArgumentParser(description='生成合成标定数据集')
+    parser.add_argument('--output', type=str, default='data/synthetic',
+                       help='输出目录，默认: data/synthetic')
+    parser.add_argument('--views', type=int, nargs='+', default=[20],
+                       help='内参标定图像数（可多个），默认: 20')
+    parser.add_argument('--resolutions', type=str, nargs='+', default=['640x480'],
+                       help='分辨率 WxH（可多个），默认: 640x480')
+    parser.add_argument('--models', type=str, nargs='+', default=['pinhole', 'fisheye'],
+                       choices=sorted(LENS_PRESETS), help='镜头模型（可多个）')
+    parser.add_argument('--noise', type=float, nargs='+', default=[1.0],
+                       help='图像高斯噪声标准差（灰度值，可多个），默认: 1.0')
+    parser.add_argument('--blur', type=float, default=0.6,
+                       help='高斯模糊标准差（像素），默认: 0.6')
+    parser.add_argument('--checkerboard', type=int, nargs=2, default=[12, 8],
+                       help='棋盘格内角点数量 (列 行)')
+    parser.add_argument('--square-size', type=float, default=0.038,
+                       help='棋盘格方格大小(米)')
+    parser.add_argument('--extrinsic-frames', type=int, default=5,
+                       help='外参标定帧数，默认: 5')
+    parser.add_argument('--seed', type=int, default=0,
+                       help='随机种子')
+    args = parser.parse_args()
+
+    combinations = list(itertools.product(args.models, args.resolutions, args.views, args.noise))
+    print(f"生成 {len(combinations)} 个数据集到 {args.output}")
+    for index, (model, resolution, views, noise) in enumerate(combinations):
+        width, height = (int(v) for v in resolution.lower().split('x'))
+        name = f"{model}_{width}x{height}_v{views}_n{noise:g}"
+        generate_dataset(os.path.join(args.output, name), model, (width, height), views, noise, args.blur,
+                         tuple(args.checkerboard), args.square_size, args.extrinsic_frames, args.seed + index)
+        print(f"✓ {name}")
+
+
+if __name__ == '__main__':
+    main()
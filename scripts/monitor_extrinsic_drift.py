@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+外参漂移实时监测
+车辆停在标定工位时持续跟踪棋盘格, 报告相机安装位姿相对已存储外参的偏差
+
+坐标系定义与 calibrate_extrinsic_auto.py 相同:
+1. 棋盘格坐标系: 左上角角点为原点, X轴水平向右, Y轴垂直向下, Z轴向外(垂直棋盘格平面)
+2. 车辆坐标系: 后轴中心为原点, X轴向前(车头方向), Y轴向左, Z轴向上
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import argparse
+import cv2
+import numpy as np
+from src.calibration import ExtrinsicDriftMonitor
+from src.utils import load_calibration
+from src.camera import create_camera, LatencyHistogram
+
+
+def main():
+    parser = argparse.ArgumentParser(description='外参漂移实时监测')
+    parser.add_argument('--intrinsic', type=str, default='config/intrinsic.yaml',
+                       help='内参文件路径')
+    parser.add_argument('--extrinsic', type=str, default='config/extrinsic.yaml',
+                       help='已存储的外参文件路径（作为参考）')
+    parser.add_argument('--checkerboard', type=int, nargs=2, default=[12, 8],
+                       help='棋盘格内角点数量 (列 行)')
+    parser.add_argument('--square-size', type=float, default=0.038,
+                       help='棋盘格方格大小(米)')
+    parser.add_argument('--board-to-vehicle', type=float, nargs=6, required=True,
+                       help='棋盘格左上角在车辆坐标系中的位置和姿态 (x y z roll pitch yaw) 单位:米和度')
+    parser.add_argument('--fisheye', action='store_true', default=True,
+                       help='使用鱼眼相机模型 (默认: True)')
+    parser.add_argument('--no-fisheye', action='store_false', dest='fisheye',
+                       help='使用标准针孔相机模型')
+    parser.add_argument('--window', type=int, default=30,
+                       help='滑动窗口帧数，默认: 30')
+    parser.add_argument('--translation-tolerance', type=float, default=0.01,
+                       help='平移漂移报警阈值(米)，默认: 0.01')
+    parser.add_argument('--rotation-tolerance', type=float, default=0.2,
+                       help='旋转漂移报警阈值(度)，默认: 0.2')
+    parser.add_argument('--width', type=int, default=640,
+                       help='图像宽度')
+    parser.add_argument('--height', type=int, default=480,
+                       help='图像高度')
+    parser.add_argument('--fps', type=int, default=30,
+                       help='帧率')
+    parser.add_argument('--threaded', action='store_true',
+                       help='后台线程采集（显示/保存较慢时不阻塞采集，始终处理最新帧）')
+    parser.add_argument('--playback', type=str,
+                       help='回放录制目录代替相机（见 record_stream.py）')
+    parser.add_argument('--playback-speed', type=float, default=1.0,
+                       help='回放速度倍率，0 表示尽可能快，默认: 1.0')
+    parser.add_argument('--no-display', action='store_true',
+                       help='不显示图像，仅在终端输出')
+    parser.add_argument('--latency', type=float, nargs='?', const=5.0, default=None, metavar='SECONDS',
+                       help='统计各处理阶段的帧延迟直方图，每隔 SECONDS 秒输出一次（默认: 5）')
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print("外参漂移实时监测")
+    print("="*60)
+    print(f"  参考外参: {args.extrinsic}")
+    print(f"  报警阈值: 平移 {args.translation_tolerance * 1000:.1f}mm, 旋转 {args.rotation_tolerance:.2f}°")
+    print(f"  滑动窗口: {args.window} 帧")
+    print("="*60 + "\n")
+
+    intrinsic_data = load_calibration(args.intrinsic)
+    extrinsic_data = load_calibration(args.extrinsic)
+
+    monitor = ExtrinsicDriftMonitor(
+        camera_matrix=np.array(intrinsic_data['camera_matrix']),
+        dist_coeffs=np.array(intrinsic_data['distortion_coeffs']),
+        checkerboard_size=tuple(args.checkerboard),
+        square_size=args.square_size,
+        board_to_vehicle_pose=args.board_to_vehicle,
+        reference=extrinsic_data,
+        use_fisheye=args.fisheye,
+        window=args.window,
+        translation_tolerance=args.translation_tolerance,
+        rotation_tolerance=args.rotation_tolerance
+    )
+
+    camera = create_camera(width=args.width, height=args.height, fps=args.fps,
+                           playback=args.playback, playback_speed=args.playback_speed,
+                           threaded=args.threaded)
+    if not camera.start():
+        print("警告: 无法启动相机，使用模拟模式")
+
+    print("按 'q' 退出, 按 'r' 重置滑动窗口\n")
+    latency = LatencyHistogram(args.latency) if args.latency is not None else None
+
+    try:
+        while True:
+            frame = camera.get_frame()
+            if frame is None:
+                break
+            color_image = frame.color
+
+            status = monitor.update(color_image)
+            frame.mark('monitor')
+
+            if status is None:
+                text = "Board not found"
+                color = (0, 0, 255)
+            else:
+                text = (f"dT={status['rolling_translation_error_m'] * 1000:.1f}mm "
+                        f"dR={status['rolling_rotation_error_deg']:.3f}deg "
+                        f"{status['mean_frame_ms']:.1f}ms [{status['mode']}]")
+                color = (0, 0, 255) if status['drift_detected'] else (0, 255, 0)
+
+            if monitor.frame_count % args.fps == 0:
+                print(text + ("  ⚠ 检测到漂移" if status and status['drift_detected'] else ""))
+
+            key = -1
+            if not args.no_display:
+                cv2.putText(color_image, text, (10, 30),
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+                cv2.imshow('外参漂移监测', color_image)
+                key = cv2.waitKey(1) & 0xFF
+                frame.mark('display')
+
+            if latency is not None:
+                latency.add(frame)
+                latency.maybe_report()
+            camera.release_frame(frame)
+
+            if key == ord('q'):
+                break
+            elif key == ord('r'):
+                monitor.reset()
+
+    except KeyboardInterrupt:
+        print("\n用户中断")
+
+    finally:
+        camera.stop()
+        cv2.destroyAllWindows()
+
+    capture_stats = camera.get_capture_stats()
+    status = monitor.get_status()
+    print("\n" + "="*60)
+    print("监测结果")
+    print("="*60)
+    print(f"  处理帧数: {status['frames']}, 丢失: {status['lost_frames']}")
+    if status['samples'] > 0:
+        print(f"  滑动平均平移偏差: {status['rolling_translation_error_m'] * 1000:.2f} mm")
+        print(f"  滑动平均旋转偏差: {status['rolling_rotation_error_deg']:.3f}°")
+        print(f"  平均单帧耗时: {status['mean_frame_ms']:.2f} ms")
+        if capture_stats is not None:
+            print(f"  后台采集: {capture_stats['capture_fps']:.1f} FPS, 跳过 {capture_stats['skipped']} 帧")
+        if latency is not None:
+            print(f"  帧延迟（相对主机收到帧）:\n{latency.format_report()}")
+        print(f"  {'⚠ 检测到外参漂移，建议重新标定' if status['drift_detected'] else '✓ 外参未发生明显漂移'}")
+
+
+if __name__ == '__main__':
+    main()
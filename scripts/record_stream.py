@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+录制彩色/深度数据流
+录制结果可用 PlaybackCamera 或各脚本的 --playback 参数回放, 便于无硬件复现和测量处理流水线。
+默认写入 chunked 格式（后台线程无损压缩, 可连续录制）, --format npy 写入预分配的未压缩数组
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import argparse
+import cv2
+from src.camera import FemtoBoltCamera, RecordingWriter, ChunkedRecorder, LatencyHistogram
+
+
+def main():
+    parser = argparse.ArgumentParser(description='录制彩色/深度数据流')
+    parser.add_argument('--output', type=str, required=True,
+                       help='录制输出目录')
+    parser.add_argument('--frames', type=int, default=300,
+                       help='录制帧数，chunked 格式下 0 表示直到按 q 或 Ctrl+C，默认: 300')
+    parser.add_argument('--format', choices=['chunked', 'npy'], default='chunked',
+                       help='录制格式: chunked 后台压缩写入，npy 预分配未压缩数组，默认: chunked')
+    parser.add_argument('--writers', type=int, default=2,
+                       help='chunked 格式的写入线程数，默认: 2')
+    parser.add_argument('--width', type=int, default=640,
+                       help='图像宽度')
+    parser.add_argument('--height', type=int, default=480,
+                       help='图像高度')
+    parser.add_argument('--fps', type=int, default=30,
+                       help='帧率')
+    parser.add_argument('--no-display', action='store_true',
+                       help='不显示图像')
+    parser.add_argument('--latency', type=float, nargs='?', const=5.0, default=None, metavar='SECONDS',
+                       help='统计各处理阶段的帧延迟直方图，每隔 SECONDS 秒输出一次（默认: 5）')
+    args = parser.parse_args()
+    if args.format == 'npy' and args.frames <= 0:
+        parser.error("npy 格式需要指定录制帧数")
+
+    # 后台采集 + 'next' 顺序读取，写盘较慢时帧先在缓冲区中排队
+    camera = FemtoBoltCamera(width=args.width, height=args.height, fps=args.fps,
+                             threaded=True, buffer_size=args.fps)
+    if not camera.start():
+        print("警告: 无法启动相机，使用模拟模式")
+
+    if args.format == 'chunked':
+        writer = ChunkedRecorder(args.output, args.width, args.height, args.fps, camera=camera,
+                                 num_workers=args.writers)
+    else:
+        writer = RecordingWriter(args.output, args.frames, args.width, args.height, args.fps, camera=camera)
+    limit = f"{args.frames} 帧" if args.frames > 0 else "数据流"
+    print(f"录制{limit}到 {args.output} ({args.format})，按 'q' 提前结束")
+    latency = LatencyHistogram(args.latency) if args.latency is not None else None
+    recorded = 0
+
+    try:
+        while args.frames <= 0 or recorded < args.frames:
+            frame = camera.get_frame(mode='next')
+            if frame is None:
+                print("无法获取图像")
+                break
+            if args.format == 'chunked':
+                # 后台采集的帧已是独立的拷贝，直接交给写入线程
+                writer.write_record(frame)
+            else:
+                writer.write(frame.color, frame.depth, frame.timestamp)
+            recorded += 1
+            frame.mark('write')
+
+            key = -1
+            if not args.no_display:
+                cv2.imshow('录制', frame.color)
+                key = cv2.waitKey(1) & 0xFF
+                frame.mark('display')
+
+            if latency is not None:
+                latency.add(frame)
+                latency.maybe_report()
+            if key == ord('q'):
+                break
+
+    except KeyboardInterrupt:
+        print("\n用户中断")
+
+    finally:
+        stats = camera.get_capture_stats()
+        camera.stop()
+        writer.close()
+        if not args.no_display:
+            cv2.destroyAllWindows()
+
+    print(f"\n已录制 {recorded} 帧, 采集 {stats['capture_fps']:.1f} FPS, 丢弃 {stats['dropped']} 帧")
+    if args.format == 'chunked':
+        write_stats = writer.get_stats()
+        print(f"写盘: {write_stats['bytes_written'] / 1e6:.1f} MB, 压缩比 {write_stats['compression_ratio']:.2f}, "
+              f"平均压缩 {write_stats['mean_encode_ms']:.1f} ms/帧, 最大写入积压 {write_stats['max_queue_depth']}")
+    if latency is not None:
+        print(f"帧延迟（相对主机收到帧）:\n{latency.format_report()}")
+    print(f"回放: python scripts/monitor_extrinsic_drift.py --playback {args.output} ...")
+
+
+if __name__ == '__main__':
+    main()
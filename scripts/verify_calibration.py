@@ -10,9 +10,9 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 import argparse
 import cv2
 import numpy as np
-from src.calibration import ExtrinsicCalibration
+from src.calibration import ExtrinsicCalibration, PreviewUndistorter
 from src.utils import load_calibration, visualize_calibration, plot_camera_pose_3d
-from src.camera import FemtoBoltCamera
+from src.camera import create_camera
 
 
 def main():
@@ -25,6 +25,10 @@ def main():
                        help='测试图像路径（可选）')
     parser.add_argument('--live', action='store_true',
                        help='使用实时相机进行测试')
+    parser.add_argument('--preview-scale', type=float, default=0.5,
+                       help='实时预览缩放比例，去畸变与缩放在一次remap中完成，默认: 0.5')
+    parser.add_argument('--playback', type=str,
+                       help='--live 时回放录制目录代替相机（见 record_stream.py）')
     args = parser.parse_args()
     
     print("\n" + "="*60)
@@ -94,10 +98,14 @@ def main():
             print("\n启动实时相机测试...")
             print("按 'q' 退出")
             
-            camera = FemtoBoltCamera()
+            camera = create_camera(playback=args.playback)
             if not camera.start():
                 print("警告: 无法启动相机，使用模拟模式")
             
+            # 预览器与并排显示缓冲区在首帧时按图像尺寸创建，之后每帧复用
+            undistorter = None
+            combined = None
+            
             try:
                 while True:
                     color_image, _ = camera.get_frames()
@@ -106,17 +114,20 @@ def main():
                         break
                     
                     h, w = color_image.shape[:2]
-                    new_camera_matrix, roi = cv2.getOptimalNewCameraMatrix(
-                        camera_matrix, dist_coeffs, (w, h), 1, (w, h)
-                    )
-                    undistorted = cv2.undistort(color_image, camera_matrix, 
-                                               dist_coeffs, None, new_camera_matrix)
+                    if undistorter is None or undistorter.image_size != (w, h):
+                        display_size = (max(1, int(w * args.preview_scale)),
+                                        max(1, int(h * args.preview_scale)))
+                        undistorter = PreviewUndistorter.from_intrinsic_dict(
+                            intrinsic_data, image_size=(w, h), display_size=display_size
+                        )
+                        combined = None
                     
-                    # 并排显示
-                    combined = np.hstack([color_image, undistorted])
+                    # 并排显示（原始 | 去畸变），直接生成显示分辨率
+                    combined = undistorter.side_by_side(color_image, out=combined)
+                    display_w = undistorter.display_size[0]
                     cv2.putText(combined, "Original", (10, 30), 
                                cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-                    cv2.putText(combined, "Undistorted", (w + 10, 30), 
+                    cv2.putText(combined, "Undistorted", (display_w + 10, 30), 
                                cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
                     
                     cv2.imshow('去畸变测试', combined)
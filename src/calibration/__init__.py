@@ -1,4 +1,13 @@
 from .intrinsic_calibration import IntrinsicCalibration
 from .extrinsic_calibration import ExtrinsicCalibration
+from .bearing_table import BearingTable, compute_bearing_table
+from .undistortion import PreviewUndistorter
+from .drift_monitor import ExtrinsicDriftMonitor
+from .depth_pipeline import DepthToVehicleCloud
+from .transform_graph import TransformGraph, invert_transform
+from .coverage import CoverageGrid
+from .auto_capture import AutoCaptureSelector
 
-__all__ = ['IntrinsicCalibration', 'ExtrinsicCalibration']
+__all__ = ['IntrinsicCalibration', 'ExtrinsicCalibration', 'BearingTable', 'compute_bearing_table',
+           'PreviewUndistorter', 'ExtrinsicDriftMonitor',
+           'DepthToVehicleCloud', 'TransformGraph', 'invert_transform', 'CoverageGrid', 'AutoCaptureSelector']
@@ -0,0 +1,262 @@
+"""
+自动采集内参标定图像
+在工作线程中检测棋盘格并快速估计位姿, 不阻塞预览。只有满足以下条件的帧才被采集:
+- 棋盘格完整可见且离图像边缘有一定距离
+- 图像清晰（cv2.estimateChessboardSharpness 的平均边缘宽度足够小）且标定板基本静止
+- 位姿与已采集视图有足够差异, 或角点落在尚未覆盖的图像区域
+覆盖率达到目标（或达到最大视图数）后采集结束
+"""
+import threading
+from collections import deque
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .coverage import CoverageGrid
+from .extrinsic_calibration import ExtrinsicCalibration
+
+
+class AutoCaptureSelector:
+    """自动采集的帧筛选器"""
+
+    def __init__(self,
+                 checkerboard_size: Tuple[int, int],
+                 image_size: Tuple[int, int],
+                 square_size: float = 0.038,
+                 camera_matrix: Optional[np.ndarray] = None,
+                 dist_coeffs: Optional[np.ndarray] = None,
+                 use_fisheye: bool = False,
+                 grid_size: Tuple[int, int] = (8, 6),
+                 max_sharpness: float = 4.0,
+                 border_margin: int = 10,
+                 max_motion: float = 2.0,
+                 min_rotation_deg: float = 10.0,
+                 min_translation_ratio: float = 0.15,
+                 min_novel_corners: float = 0.25,
+                 target_coverage: float = 0.9,
+                 min_views: int = 15,
+                 max_views: int = 60):
+        """
+        Args:
+            checkerboard_size: 棋盘格大小 (cols, rows) - 内角点数量
+            image_size: 图像尺寸 (width, height)
+            square_size: 方格尺寸（米）
+            camera_matrix: 近似内参，用于位姿估计；默认按焦距等于图像宽度估计
+            dist_coeffs: 近似畸变系数，默认忽略畸变
+            use_fisheye: 近似内参是否为鱼眼模型
+            grid_size: 覆盖网格大小 (cols, rows)
+            max_sharpness: 最大平均边缘宽度（像素），超过视为模糊
+            border_margin: 角点离图像边缘的最小距离（像素）
+            max_motion: 与上一次检测相比角点的最大位移（像素），超过视为标定板在移动
+            min_rotation_deg: 与已采集视图的最小姿态差（度）
+            min_translation_ratio: 与已采集视图的最小位置差（相对距离）
+            min_novel_corners: 落在未覆盖网格单元中的角点比例达到该值时，即使位姿相近也采集
+            target_coverage: 目标覆盖率（被覆盖的网格单元比例）
+            min_views: 达到目标覆盖率后仍至少采集的视图数
+            max_views: 最多采集的视图数
+        """
+        self.checkerboard_size = tuple(checkerboard_size)
+        self.image_size = tuple(image_size)
+        self.use_fisheye = use_fisheye
+        self.max_sharpness = max_sharpness
+        self.border_margin = border_margin
+        self.max_motion = max_motion
+        self.min_rotation_deg = min_rotation_deg
+        self.min_translation_ratio = min_translation_ratio
+        self.min_novel_corners = min_novel_corners
+        self.target_coverage = target_coverage
+        self.min_views = min_views
+        self.max_views = max_views
+
+        width, height = self.image_size
+        if camera_matrix is None:
+            camera_matrix = np.array([[width, 0, width / 2], [0, width, height / 2], [0, 0, 1]])
+            dist_coeffs = None
+            use_fisheye = False
+        self.camera_matrix = np.asarray(camera_matrix, dtype=np.float64)
+        self.dist_coeffs = None if dist_coeffs is None else np.asarray(dist_coeffs, dtype=np.float64)
+        self._undistort_fisheye = use_fisheye and self.dist_coeffs is not None
+
+        self.object_points = ExtrinsicCalibration._board_object_points(checkerboard_size, square_size)
+        self.coverage = CoverageGrid(image_size, grid_size)
+        self.saved_poses = []  # [(R, tvec), ...] 已采集视图的棋盘格位姿
+
+        self._detect_flags = cv2.CALIB_CB_ADAPTIVE_THRESH + cv2.CALIB_CB_NORMALIZE_IMAGE + cv2.CALIB_CB_FAST_CHECK
+        self._subpix_criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 10, 0.01)
+        self._prev_corners = None
+
+        # 工作线程
+        self._condition = threading.Condition()
+        self._pending = None
+        self._results = deque()
+        self._thread = None
+        self._running = False
+        self.last_result = None
+
+    def evaluate(self, image: np.ndarray) -> dict:
+        """
+        评估一帧并在通过筛选时记录为已采集视图（同步执行，工作线程中调用）
+
+        Args:
+            image: BGR 或灰度图像
+
+        Returns:
+            dict: accepted 是否采集、reason 原因、corners 角点、sharpness 边缘宽度、
+                  motion 角点位移、coverage 当前覆盖率、views 已采集视图数
+        """
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        result = {'accepted': False, 'corners': None, 'sharpness': None, 'motion': None}
+
+        found, corners = cv2.findChessboardCorners(gray, self.checkerboard_size, self._detect_flags)
+        if not found:
+            self._prev_corners = None
+            return self._finish(result, '未检测到棋盘格')
+        corners = cv2.cornerSubPix(gray, corners, (5, 5), (-1, -1), self._subpix_criteria).reshape(-1, 1, 2)
+        result['corners'] = corners
+
+        # 完整可见: 所有角点离图像边缘足够远
+        points = corners.reshape(-1, 2)
+        width, height = self.image_size
+        margin = self.border_margin
+        if (points.min(axis=0) < margin).any() or (points[:, 0].max() > width - 1 - margin
+                                                   or points[:, 1].max() > height - 1 - margin):
+            self._prev_corners = corners
+            return self._finish(result, '标定板靠近图像边缘')
+
+        # 静止: 与上一次检测比较角点位移
+        motion = np.inf
+        if self._prev_corners is not None:
+            motion = float(np.abs(corners - self._prev_corners).max())
+        self._prev_corners = corners
+        result['motion'] = motion
+        if motion > self.max_motion:
+            return self._finish(result, '标定板在移动')
+
+        sharpness = cv2.estimateChessboardSharpness(gray, self.checkerboard_size, corners)[0][0]
+        result['sharpness'] = float(sharpness)
+        if sharpness > self.max_sharpness:
+            return self._finish(result, '图像模糊')
+
+        rotation, tvec = self._estimate_pose(corners)
+        novel_corners = self.coverage.novelty(corners)
+        if not self._is_novel_pose(rotation, tvec) and novel_corners < self.min_novel_corners:
+            return self._finish(result, '与已采集视图相似')
+
+        self.saved_poses.append((rotation, tvec))
+        self.coverage.add(corners)
+        result['accepted'] = True
+        return self._finish(result, '新视图' if novel_corners < self.min_novel_corners else '新覆盖区域')
+
+    def _finish(self, result: dict, reason: str) -> dict:
+        result['reason'] = reason
+        result['coverage'] = self.coverage.coverage()
+        result['views'] = len(self.saved_poses)
+        return result
+
+    def _estimate_pose(self, corners: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """平面棋盘格的快速位姿估计 (IPPE)，返回 (R, tvec)"""
+        if self._undistort_fisheye:
+            image_points = cv2.fisheye.undistortPoints(corners, self.camera_matrix, self.dist_coeffs[:4])
+            camera_matrix, dist_coeffs = np.eye(3), None
+        else:
+            image_points = corners
+            camera_matrix, dist_coeffs = self.camera_matrix, self.dist_coeffs
+        _, rvec, tvec = cv2.solvePnP(self.object_points, image_points, camera_matrix, dist_coeffs,
+                                     flags=cv2.SOLVEPNP_IPPE)
+        return cv2.Rodrigues(rvec)[0], tvec.reshape(3)
+
+    def _is_novel_pose(self, rotation: np.ndarray, tvec: np.ndarray) -> bool:
+        """与所有已采集视图相比，姿态或位置差异足够大"""
+        for saved_rotation, saved_tvec in self.saved_poses:
+            angle = np.rad2deg(np.linalg.norm(cv2.Rodrigues(rotation @ saved_rotation.T)[0]))
+            distance = np.linalg.norm(tvec - saved_tvec) / np.linalg.norm(saved_tvec)
+            if angle < self.min_rotation_deg and distance < self.min_translation_ratio:
+                return False
+        return True
+
+    @property
+    def done(self) -> bool:
+        """是否已完成采集（覆盖率达到目标且视图数足够，或达到最大视图数）"""
+        views = len(self.saved_poses)
+        if views >= self.max_views:
+            return True
+        return views >= self.min_views and self.coverage.coverage() >= self.target_coverage
+
+    def start(self):
+        """启动工作线程"""
+        if self._thread is not None:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._worker, name='AutoCapture', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止工作线程"""
+        if self._thread is None:
+            return
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        self._thread.join(timeout=2.0)
+        self._thread = None
+
+    def submit(self, image: np.ndarray) -> bool:
+        """
+        提交一帧给工作线程（工作线程忙时跳过，预览不等待检测）
+
+        Args:
+            image: BGR 图像，被采集时保存的是提交时的拷贝
+
+        Returns:
+            是否被接收
+        """
+        with self._condition:
+            if self._pending is not None:
+                return False
+            self._pending = image.copy()
+            self._condition.notify_all()
+            return True
+
+    def poll(self) -> List[dict]:
+        """
+        取出工作线程已完成的评估结果（不等待）
+
+        Returns:
+            结果列表，被采集的结果中 'image' 为提交时的图像
+        """
+        with self._condition:
+            results = list(self._results)
+            self._results.clear()
+        return results
+
+    def _worker(self):
+        """工作线程: 逐个评估提交的帧"""
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending is not None or not self._running)
+                if not self._running:
+                    return
+                image = self._pending
+
+            try:
+                result = self.evaluate(image)
+            except Exception as e:
+                # 退化的检测结果可能使位姿估计或清晰度评估抛出 cv2.error，
+                # 记录为未采集并继续处理后续帧，否则 submit() 将永远被拒绝
+                self._prev_corners = None
+                result = self._finish({'accepted': False, 'corners': None, 'sharpness': None,
+                                       'motion': None}, f'评估失败: {e}')
+            if result['accepted']:
+                result['image'] = image
+            with self._condition:
+                self.last_result = result
+                self._results.append(result)
+                self._pending = None
+
+    def __enter__(self) -> 'AutoCaptureSelector':
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
@@ -0,0 +1,229 @@
+"""
+逐像素视线向量查找表
+为给定内参和分辨率预计算每个像素对应的单位视线向量(相机坐标系),
+并缓存到磁盘, 运行时像素/深度图到3D射线只需查表和乘法, 无需逐帧迭代去畸变
+"""
+import os
+import hashlib
+import numpy as np
+import cv2
+from typing import Tuple, Optional
+
+
+def compute_bearing_table(camera_matrix: np.ndarray,
+                          dist_coeffs: np.ndarray,
+                          image_size: Tuple[int, int],
+                          use_fisheye: bool = True) -> np.ndarray:
+    """
+    计算逐像素单位视线向量
+
+    Args:
+        camera_matrix: 相机内参矩阵
+        dist_coeffs: 畸变系数
+        image_size: 图像尺寸 (width, height)
+        use_fisheye: 是否使用鱼眼相机模型
+
+    Returns:
+        (H, W, 3) float32 单位向量, 相机坐标系 (X右, Y下, Z前)
+    """
+    width, height = image_size
+    camera_matrix = np.asarray(camera_matrix, dtype=np.float64)
+    dist_coeffs = np.asarray(dist_coeffs, dtype=np.float64)
+
+    u, v = np.meshgrid(np.arange(width, dtype=np.float64),
+                       np.arange(height, dtype=np.float64))
+    pixels = np.stack([u, v], axis=-1).reshape(-1, 1, 2)
+
+    # 去畸变得到归一化平面坐标 (x/z, y/z), 每个像素只在此处迭代求解一次
+    if use_fisheye:
+        normalized = cv2.fisheye.undistortPoints(pixels, camera_matrix,
+                                                 dist_coeffs.reshape(-1, 1)[:4])
+    else:
+        normalized = cv2.undistortPoints(pixels, camera_matrix, dist_coeffs)
+
+    rays = np.ones((height * width, 3), dtype=np.float64)
+    rays[:, :2] = normalized.reshape(-1, 2)
+    rays /= np.linalg.norm(rays, axis=1, keepdims=True)
+
+    return rays.reshape(height, width, 3).astype(np.float32)
+
+
+class BearingTable:
+    """逐像素视线向量查找表"""
+
+    def __init__(self,
+                 camera_matrix: np.ndarray,
+                 dist_coeffs: np.ndarray,
+                 image_size: Tuple[int, int],
+                 use_fisheye: bool = True,
+                 cache_dir: Optional[str] = None):
+        """
+        初始化查找表, 若缓存目录中已有相同标定参数的表则直接加载
+
+        Args:
+            camera_matrix: 相机内参矩阵
+            dist_coeffs: 畸变系数
+            image_size: 图像尺寸 (width, height)
+            use_fisheye: 是否使用鱼眼相机模型
+            cache_dir: 磁盘缓存目录, None 表示不缓存
+        """
+        self.camera_matrix = np.asarray(camera_matrix, dtype=np.float64)
+        self.dist_coeffs = np.asarray(dist_coeffs, dtype=np.float64)
+        self.image_size = (int(image_size[0]), int(image_size[1]))
+        self.use_fisheye = use_fisheye
+        self.cache_dir = cache_dir
+
+        self.rays = self._load_or_compute()
+        # 按 z=1 归一化的射线, 用于 z 深度(而非径向距离)的反投影, 首次使用时生成
+        self._z_rays = None
+
+    @classmethod
+    def from_intrinsic_dict(cls, intrinsic_data: dict,
+                            image_size: Optional[Tuple[int, int]] = None,
+                            cache_dir: Optional[str] = None) -> 'BearingTable':
+        """
+        从内参标定结果字典创建查找表
+
+        Args:
+            intrinsic_data: 内参标定结果 (load_calibration 的返回值)
+            image_size: 图像尺寸 (width, height), 默认使用标定时的尺寸
+            cache_dir: 磁盘缓存目录
+
+        Returns:
+            BearingTable 实例
+        """
+        if image_size is None:
+            image_size = (intrinsic_data['image_width'], intrinsic_data['image_height'])
+        use_fisheye = intrinsic_data.get('camera_model', 'fisheye') == 'fisheye'
+        return cls(np.array(intrinsic_data['camera_matrix']),
+                   np.array(intrinsic_data['distortion_coeffs']),
+                   image_size, use_fisheye, cache_dir)
+
+    @property
+    def cache_key(self) -> str:
+        """由标定参数、分辨率和相机模型生成的缓存键"""
+        digest = hashlib.sha1()
+        digest.update(self.camera_matrix.tobytes())
+        digest.update(self.dist_coeffs.tobytes())
+        digest.update(np.asarray(self.image_size, dtype=np.int64).tobytes())
+        digest.update(b'fisheye' if self.use_fisheye else b'pinhole')
+        return digest.hexdigest()[:16]
+
+    @property
+    def cache_path(self) -> Optional[str]:
+        """缓存文件路径"""
+        if self.cache_dir is None:
+            return None
+        width, height = self.image_size
+        return os.path.join(self.cache_dir, f"bearing_{width}x{height}_{self.cache_key}.npy")
+
+    def _load_or_compute(self) -> np.ndarray:
+        """从缓存加载查找表, 不存在时计算并写入缓存"""
+        path = self.cache_path
+        width, height = self.image_size
+
+        if path is not None and os.path.exists(path):
+            rays = np.load(path)
+            if rays.shape == (height, width, 3) and rays.dtype == np.float32:
+                return rays
+
+        rays = compute_bearing_table(self.camera_matrix, self.dist_coeffs,
+                                     self.image_size, self.use_fisheye)
+
+        if path is not None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # 先写临时文件再替换, 避免并发进程读到不完整的缓存
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.save(f, rays)
+            os.replace(tmp_path, path)
+
+        return rays
+
+    @property
+    def z_rays(self) -> np.ndarray:
+        """按 z=1 归一化的射线 (H, W, 3) float32"""
+        if self._z_rays is None:
+            self._z_rays = self.rays / self.rays[..., 2:3]
+        return self._z_rays
+
+    def _sample(self, table: np.ndarray, u, v) -> np.ndarray:
+        """
+        在相邻四个像素的射线间双线性插值, 保留亚像素精度
+
+        Args:
+            table: (H, W, 3) 射线表
+            u, v: 像素坐标, 标量或数组, 超出图像的坐标截断到边界
+
+        Returns:
+            插值后的射线 (..., 3) float32
+        """
+        width, height = self.image_size
+        u = np.clip(np.asarray(u, dtype=np.float64), 0, width - 1)
+        v = np.clip(np.asarray(v, dtype=np.float64), 0, height - 1)
+        u, v = np.broadcast_arrays(u, v)
+
+        col0 = np.minimum(u.astype(np.intp), max(width - 2, 0))
+        row0 = np.minimum(v.astype(np.intp), max(height - 2, 0))
+        col1 = np.minimum(col0 + 1, width - 1)
+        row1 = np.minimum(row0 + 1, height - 1)
+        fu = (u - col0)[..., None]
+        fv = (v - row0)[..., None]
+
+        top = table[row0, col0] * (1 - fu) + table[row0, col1] * fu
+        bottom = table[row1, col0] * (1 - fu) + table[row1, col1] * fu
+        return (top * (1 - fv) + bottom * fv).astype(np.float32)
+
+    def pixels_to_rays(self, u, v) -> np.ndarray:
+        """
+        查表获取像素的单位视线向量 (亚像素坐标双线性插值)
+
+        Args:
+            u, v: 像素坐标, 标量或数组
+
+        Returns:
+            单位视线向量 (..., 3)
+        """
+        rays = self._sample(self.rays, u, v)
+        # 单位向量插值后模长略小于1, 重新归一化
+        return rays / np.linalg.norm(rays, axis=-1, keepdims=True)
+
+    def pixels_to_points(self, u, v, depth, depth_is_range: bool = False) -> np.ndarray:
+        """
+        像素坐标加深度转相机坐标系3D点 (亚像素坐标双线性插值)
+
+        Args:
+            u, v: 像素坐标, 标量或数组
+            depth: 深度值(米), 与 u, v 形状相同或可广播
+            depth_is_range: True 表示深度为沿射线的距离, False 表示 z 深度
+
+        Returns:
+            相机坐标系中的3D点 (..., 3)
+        """
+        if depth_is_range:
+            rays = self.pixels_to_rays(u, v)
+        else:
+            # z=1 射线插值后 z 分量仍为1, 无需归一化
+            rays = self._sample(self.z_rays, u, v)
+        return rays * np.asarray(depth, dtype=np.float32)[..., None]
+
+    def depth_to_points(self, depth: np.ndarray,
+                        out: Optional[np.ndarray] = None,
+                        depth_is_range: bool = False) -> np.ndarray:
+        """
+        整幅深度图反投影为相机坐标系点云
+
+        Args:
+            depth: (H, W) 深度图(米)
+            out: 可选的 (H, W, 3) float32 输出缓冲区
+            depth_is_range: True 表示深度为沿射线的距离, False 表示 z 深度
+
+        Returns:
+            (H, W, 3) 相机坐标系点云
+        """
+        width, height = self.image_size
+        if depth.shape != (height, width):
+            raise ValueError(f"深度图尺寸 {depth.shape[::-1]} 与查找表尺寸 {self.image_size} 不一致")
+
+        table = self.rays if depth_is_range else self.z_rays
+        return np.multiply(table, depth[..., None], out=out)
@@ -0,0 +1,166 @@
+"""
+标定图像覆盖网格
+把图像划分为网格, 统计已采集视图的角点落在各网格单元中的数量。
+每加入一个视图只需按角点数做一次分桶, 可在采集过程中实时更新;
+预览叠加层只在统计变化后重新绘制, 逐帧只混合尚未覆盖的网格单元
+"""
+import cv2
+import numpy as np
+from typing import List, Tuple
+
+
+class CoverageGrid:
+    """增量更新的角点覆盖网格"""
+
+    def __init__(self, image_size: Tuple[int, int], grid_size: Tuple[int, int] = (8, 6),
+                 min_corners: int = 5):
+        """
+        Args:
+            image_size: 图像尺寸 (width, height)
+            grid_size: 网格大小 (cols, rows)
+            min_corners: 网格单元至少有多少个角点才算被覆盖
+        """
+        self.image_size = tuple(image_size)
+        self.grid_size = tuple(grid_size)
+        self.min_corners = min_corners
+        cols, rows = self.grid_size
+        self.counts = np.zeros((rows, cols), dtype=np.int32)
+        self.views = 0
+        self.version = 0  # 统计每次变化时递增，用于判断叠加层是否需要重新绘制
+
+        # 预绘制的叠加层: 着色图像和需要混合的区域 [(y0, y1, x0, x1), ...]
+        self._overlay = None
+        self._overlay_regions = []
+        self._overlay_version = -1
+
+    def cell_indices(self, corners: np.ndarray) -> np.ndarray:
+        """
+        角点所在网格单元的展平索引
+
+        Args:
+            corners: 角点像素坐标 (N, 2) 或 (N, 1, 2)
+
+        Returns:
+            (N,) 索引，行优先
+        """
+        width, height = self.image_size
+        cols, rows = self.grid_size
+        points = np.asarray(corners, dtype=np.float64).reshape(-1, 2)
+        col = np.clip((points[:, 0] * (cols / width)).astype(np.intp), 0, cols - 1)
+        row = np.clip((points[:, 1] * (rows / height)).astype(np.intp), 0, rows - 1)
+        return row * cols + col
+
+    def add(self, corners: np.ndarray):
+        """
+        加入一个视图的角点
+
+        Args:
+            corners: 角点像素坐标 (N, 2) 或 (N, 1, 2)
+        """
+        np.add.at(self.counts.reshape(-1), self.cell_indices(corners), 1)
+        self.views += 1
+        self.version += 1
+
+    def novelty(self, corners: np.ndarray) -> float:
+        """
+        视图中落在尚未覆盖的网格单元内的角点比例
+
+        Args:
+            corners: 角点像素坐标
+
+        Returns:
+            0-1，越大表示该视图对覆盖率的贡献越大
+        """
+        indices = self.cell_indices(corners)
+        if len(indices) == 0:
+            return 0.0
+        return float(np.mean(self.counts.reshape(-1)[indices] < self.min_corners))
+
+    def coverage(self) -> float:
+        """
+        被覆盖的网格单元比例
+
+        Returns:
+            0-1
+        """
+        return float(np.mean(self.counts >= self.min_corners))
+
+    def missing_cells(self) -> List[Tuple[int, int]]:
+        """
+        尚未覆盖的网格单元
+
+        Returns:
+            [(row, col), ...]
+        """
+        rows, cols = np.nonzero(self.counts < self.min_corners)
+        return list(zip(rows.tolist(), cols.tolist()))
+
+    def cell_edges(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        网格单元的像素边界（与 cell_indices 的分桶一致）
+
+        Returns:
+            (x_edges, y_edges): 长度分别为 cols+1、rows+1，第 i 个单元覆盖 [edges[i], edges[i+1])
+        """
+        width, height = self.image_size
+        cols, rows = self.grid_size
+        x_edges = np.ceil(np.arange(cols + 1) * (width / cols)).astype(int)
+        y_edges = np.ceil(np.arange(rows + 1) * (height / rows)).astype(int)
+        return x_edges, y_edges
+
+    def _render_overlay(self):
+        """按当前统计重新绘制叠加层（只在统计变化后调用）"""
+        width, height = self.image_size
+        if self._overlay is None:
+            self._overlay = np.zeros((height, width, 3), dtype=np.uint8)
+        else:
+            self._overlay.fill(0)
+        x_edges, y_edges = self.cell_edges()
+        counts = self.counts.copy()
+        regions = []
+
+        for row in range(counts.shape[0]):
+            y0, y1 = y_edges[row], y_edges[row + 1]
+            run_start = None
+            for col in range(counts.shape[1] + 1):
+                missing = col < counts.shape[1] and counts[row, col] < self.min_corners
+                if missing:
+                    # 没有角点为红色，部分覆盖为橙色
+                    color = (0, 0, 255) if counts[row, col] == 0 else (0, 140, 255)
+                    x0, x1 = x_edges[col], x_edges[col + 1]
+                    self._overlay[y0:y1, x0:x1] = color
+                    cv2.rectangle(self._overlay, (int(x0), int(y0)), (int(x1) - 1, int(y1) - 1),
+                                  (255, 255, 255), 1)
+                    if run_start is None:
+                        run_start = col
+                elif run_start is not None:
+                    # 同一行相邻的未覆盖单元合并为一个区域，减少逐帧混合的调用次数
+                    regions.append((y0, y1, x_edges[run_start], x_edges[col]))
+                    run_start = None
+
+        self._overlay_regions = regions
+        self._overlay_version = self.version
+
+    def draw_overlay(self, image: np.ndarray, alpha: float = 0.35) -> np.ndarray:
+        """
+        在图像上半透明地标出尚未覆盖的网格单元（原地修改）
+
+        Args:
+            image: BGR 图像，尺寸须为 image_size
+            alpha: 叠加层不透明度
+
+        Returns:
+            image
+        """
+        if self._overlay_version != self.version:
+            self._render_overlay()
+        for y0, y1, x0, x1 in self._overlay_regions:
+            roi = image[y0:y1, x0:x1]
+            cv2.addWeighted(roi, 1 - alpha, self._overlay[y0:y1, x0:x1], alpha, 0, dst=roi)
+        return image
+
+    def reset(self):
+        """清空统计"""
+        self.counts.fill(0)
+        self.views = 0
+        self.version += 1
@@ -0,0 +1,119 @@
+"""
+深度图到车辆坐标系点云
+整帧向量化处理: 深度单位换算 -> 逐像素射线反投影 -> 外参变换 -> 无效深度掩码,
+所有中间结果使用预分配缓冲区, 每帧不分配新内存
+"""
+import numpy as np
+import cv2
+from typing import Tuple
+
+from .bearing_table import BearingTable
+from .extrinsic_calibration import ExtrinsicCalibration
+
+
+class DepthToVehicleCloud:
+    """深度图到车辆坐标系点云的流水线"""
+
+    def __init__(self,
+                 bearing_table: BearingTable,
+                 extrinsic: ExtrinsicCalibration,
+                 depth_scale: float = 0.001,
+                 min_depth: float = 0.1,
+                 max_depth: float = 10.0,
+                 fill_invalid: bool = True):
+        """
+        初始化流水线并预分配缓冲区
+
+        Args:
+            bearing_table: 深度图对应相机的逐像素射线查找表
+            extrinsic: 该相机到车辆坐标系的外参
+            depth_scale: 深度原始值到米的换算系数 (z16 通常为 0.001)
+            min_depth: 有效深度下限（米）
+            max_depth: 有效深度上限（米）
+            fill_invalid: 是否将无效深度对应的点置为 NaN
+        """
+        self.bearing_table = bearing_table
+        self.extrinsic = extrinsic
+        self.depth_scale = np.float32(depth_scale)
+        self.min_depth = np.float32(min_depth)
+        self.max_depth = np.float32(max_depth)
+        self.fill_invalid = fill_invalid
+
+        width, height = bearing_table.image_size
+        self.image_size = (width, height)
+
+        # 预分配缓冲区
+        # 逐像素运算使用 OpenCV 内核: numpy 在 (H, W, 3) 与 (H, W, 1) 间广播时明显更慢
+        self.depth_m = np.empty((height, width), dtype=np.float32)
+        self.points_vehicle = np.empty((height, width, 3), dtype=np.float32)
+        self.valid_mask = np.empty((height, width), dtype=bool)
+        self._depth3 = np.empty((height, width, 3), dtype=np.float32)
+        self._mask_u8 = np.empty((height, width), dtype=np.uint8)
+        self._nan_fill = np.full((height, width, 3), np.nan, dtype=np.float32) if fill_invalid else None
+
+        # 车辆坐标系下的射线 R @ r 与平移 t，外参矩阵内容变化（重新赋值或原地修改）时重建
+        # p_vehicle = R @ (z * r) + t = z * (R @ r) + t，每帧只需一次乘法和一次加法
+        self._rays_source = None
+        self._vehicle_rays = np.empty((height, width, 3), dtype=np.float32)
+        self._translation = (0.0, 0.0, 0.0, 0.0)
+
+    def _update_vehicle_rays(self):
+        """外参矩阵内容变化时重新计算车辆坐标系射线"""
+        matrix = self.extrinsic.transformation_matrix
+        if matrix is None:
+            raise ValueError("外参未设置")
+        T = np.asarray(matrix, dtype=np.float64)
+        source = T.tobytes()
+        if self._rays_source == source:
+            return
+
+        rotation_only = np.zeros((3, 4), dtype=np.float32)
+        rotation_only[:, :3] = T[:3, :3]
+        cv2.transform(self.bearing_table.z_rays.reshape(-1, 1, 3), rotation_only,
+                      dst=self._vehicle_rays.reshape(-1, 1, 3))
+        self._translation = (float(T[0, 3]), float(T[1, 3]), float(T[2, 3]), 0.0)
+        self._rays_source = source
+
+    def process(self, depth_image: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        处理一帧深度图
+
+        Args:
+            depth_image: (H, W) 原始深度图 (如 uint16 z16)
+
+        Returns:
+            (points_vehicle, valid_mask): (H, W, 3) float32 车辆坐标系有序点云和 (H, W) 有效掩码,
+            均为内部缓冲区, 下一帧会被覆盖
+        """
+        width, height = self.image_size
+        if depth_image.shape != (height, width):
+            raise ValueError(f"深度图尺寸 {depth_image.shape[::-1]} 与查找表尺寸 {self.image_size} 不一致")
+
+        self._update_vehicle_rays()
+
+        # 单位换算（uint16 -> float32 米）
+        np.multiply(depth_image, self.depth_scale, out=self.depth_m, dtype=np.float32)
+
+        # 有效深度掩码 [min_depth, max_depth]
+        cv2.inRange(self.depth_m, float(self.min_depth), float(self.max_depth), dst=self._mask_u8)
+        np.greater(self._mask_u8, 0, out=self.valid_mask)
+
+        # 反投影并变换到车辆坐标系: z * (R @ r) + t
+        cv2.merge([self.depth_m, self.depth_m, self.depth_m], dst=self._depth3)
+        cv2.multiply(self._vehicle_rays, self._depth3, dst=self.points_vehicle)
+        cv2.add(self.points_vehicle, self._translation, dst=self.points_vehicle)
+
+        if self.fill_invalid:
+            cv2.bitwise_not(self._mask_u8, dst=self._mask_u8)
+            cv2.copyTo(self._nan_fill, self._mask_u8, dst=self.points_vehicle)
+
+        return self.points_vehicle, self.valid_mask
+
+    def valid_points(self) -> np.ndarray:
+        """
+        最近一帧的有效点 (N, 3)，返回新数组
+
+        Returns:
+            车辆坐标系中的有效点
+        """
+        return self.points_vehicle[self.valid_mask]
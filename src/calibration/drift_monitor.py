@@ -0,0 +1,281 @@
+"""
+外参漂移监测
+在标定工位上持续跟踪棋盘格, 以上一帧位姿为初值求解PnP,
+维护相对已存储外参的平移/旋转偏差滑动估计
+"""
+import time
+from collections import deque
+import numpy as np
+import cv2
+from typing import Tuple, Optional, Union, List
+
+from .extrinsic_calibration import ExtrinsicCalibration
+
+
+class ExtrinsicDriftMonitor:
+    """外参漂移实时监测器"""
+
+    def __init__(self,
+                 camera_matrix: np.ndarray,
+                 dist_coeffs: np.ndarray,
+                 checkerboard_size: Tuple[int, int],
+                 square_size: float,
+                 board_to_vehicle_pose: Union[List[float], Tuple[float, ...]],
+                 reference: Union[dict, ExtrinsicCalibration],
+                 use_fisheye: bool = True,
+                 window: int = 30,
+                 translation_tolerance: float = 0.01,
+                 rotation_tolerance: float = 0.2,
+                 roi_margin: int = 40):
+        """
+        初始化监测器
+
+        Args:
+            camera_matrix: 相机内参矩阵
+            dist_coeffs: 畸变系数
+            checkerboard_size: 棋盘格大小 (cols, rows) - 内角点数量
+            square_size: 方格尺寸（米）
+            board_to_vehicle_pose: 棋盘格左上角在车辆坐标系中的位姿
+                                   [x, y, z, roll, pitch, yaw] 位置单位:米, 姿态单位:度
+            reference: 已存储的外参 (load_calibration 返回的字典或 ExtrinsicCalibration)
+            use_fisheye: 是否使用鱼眼相机模型
+            window: 滑动窗口帧数
+            translation_tolerance: 平移漂移报警阈值（米）
+            rotation_tolerance: 旋转漂移报警阈值（度）
+            roi_margin: 跟踪失败时局部重新检测的边界扩展（像素）
+        """
+        self.camera_matrix = np.asarray(camera_matrix, dtype=np.float64)
+        self.dist_coeffs = np.asarray(dist_coeffs, dtype=np.float64)
+        self.checkerboard_size = tuple(checkerboard_size)
+        self.use_fisheye = use_fisheye
+        self.translation_tolerance = translation_tolerance
+        self.rotation_tolerance = rotation_tolerance
+        self.roi_margin = roi_margin
+
+        if isinstance(reference, dict):
+            calibration = ExtrinsicCalibration()
+            calibration.load_from_dict(reference)
+            reference = calibration
+        self.reference_rotation = np.asarray(reference.rotation_matrix, dtype=np.float64)
+        self.reference_translation = np.asarray(reference.translation_vector, dtype=np.float64)
+
+        self.object_points = ExtrinsicCalibration._board_object_points(checkerboard_size, square_size)
+        self.board_to_vehicle = ExtrinsicCalibration._board_to_vehicle_matrix(board_to_vehicle_pose)
+
+        # 跟踪状态
+        self._prev_gray = None
+        self._prev_corners = None
+        self._rvec = None
+        self._tvec = None
+
+        # 滑动窗口: 平移偏差向量(车辆坐标系)、旋转偏差向量(参考姿态坐标系, 度)、单帧耗时(毫秒)
+        self._translation_devs = deque(maxlen=window)
+        self._rotation_devs = deque(maxlen=window)
+        self._frame_times = deque(maxlen=window)
+        self.frame_count = 0
+        self.lost_count = 0
+
+        self._subpix_criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 10, 0.01)
+        self._lk_params = dict(winSize=(15, 15), maxLevel=2,
+                               criteria=(cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_COUNT, 10, 0.03))
+
+    def reset(self):
+        """清除跟踪状态和滑动窗口"""
+        self._prev_gray = None
+        self._prev_corners = None
+        self._rvec = None
+        self._tvec = None
+        self._translation_devs.clear()
+        self._rotation_devs.clear()
+        self._frame_times.clear()
+        self.frame_count = 0
+        self.lost_count = 0
+
+    def _track_corners(self, gray: np.ndarray) -> Optional[np.ndarray]:
+        """光流跟踪上一帧角点, 前后向一致性检查后亚像素精确化"""
+        if self._prev_gray is None or self._prev_corners is None:
+            return None
+
+        corners, status, _ = cv2.calcOpticalFlowPyrLK(
+            self._prev_gray, gray, self._prev_corners, None, **self._lk_params
+        )
+        if corners is None or not status.all():
+            return None
+
+        back, back_status, _ = cv2.calcOpticalFlowPyrLK(
+            gray, self._prev_gray, corners, None, **self._lk_params
+        )
+        if back is None or not back_status.all():
+            return None
+        if np.abs(back - self._prev_corners).reshape(-1, 2).max() > 1.0:
+            return None
+
+        return cv2.cornerSubPix(gray, corners, (5, 5), (-1, -1), self._subpix_criteria)
+
+    def _detect_in_roi(self, gray: np.ndarray) -> Optional[np.ndarray]:
+        """在上一帧棋盘格外接框附近重新检测"""
+        if self._prev_corners is None:
+            return None
+
+        h, w = gray.shape
+        x, y, bw, bh = cv2.boundingRect(self._prev_corners.reshape(-1, 2).astype(np.float32))
+        x0, y0 = max(0, x - self.roi_margin), max(0, y - self.roi_margin)
+        x1, y1 = min(w, x + bw + self.roi_margin), min(h, y + bh + self.roi_margin)
+
+        ret, corners = cv2.findChessboardCorners(
+            gray[y0:y1, x0:x1], self.checkerboard_size,
+            cv2.CALIB_CB_ADAPTIVE_THRESH + cv2.CALIB_CB_FAST_CHECK
+        )
+        if not ret:
+            return None
+
+        corners = corners.reshape(-1, 1, 2) + np.array([x0, y0], dtype=np.float32)
+        corners = self._match_ordering(corners)
+        return cv2.cornerSubPix(gray, corners, (11, 11), (-1, -1), self._subpix_criteria)
+
+    def _match_ordering(self, corners: np.ndarray) -> np.ndarray:
+        """
+        统一重新检测角点的顺序与上一帧一致
+
+        内角点行列数均为偶数时棋盘格旋转180°后外观相同, findChessboardCorners
+        可能按相反顺序返回角点, 此时沿用上一帧位姿初值会收敛到错误的位姿
+        """
+        prev = self._prev_corners.reshape(-1, 2)
+        first = corners[0, 0]
+        if np.linalg.norm(first - prev[-1]) < np.linalg.norm(first - prev[0]):
+            return np.ascontiguousarray(corners[::-1])
+        return corners
+
+    def _solve_pose(self, corners: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """以上一帧位姿为初值求解PnP"""
+        if self.use_fisheye:
+            image_points = cv2.fisheye.undistortPoints(
+                corners, self.camera_matrix, self.dist_coeffs, P=self.camera_matrix
+            )
+            dist_coeffs = None
+        else:
+            image_points = corners
+            dist_coeffs = self.dist_coeffs
+
+        if self._rvec is None:
+            success, rvec, tvec = cv2.solvePnP(
+                self.object_points, image_points, self.camera_matrix, dist_coeffs,
+                flags=cv2.SOLVEPNP_ITERATIVE
+            )
+            if not success:
+                raise ValueError("PnP求解失败")
+            return rvec, tvec
+
+        # 热启动: 只做几次LM迭代
+        rvec, tvec = cv2.solvePnPRefineLM(
+            self.object_points, image_points, self.camera_matrix, dist_coeffs,
+            self._rvec.copy(), self._tvec.copy()
+        )
+        return rvec, tvec
+
+    def update(self, image: np.ndarray) -> Optional[dict]:
+        """
+        处理一帧图像
+
+        Args:
+            image: 输入图像（BGR或灰度）
+
+        Returns:
+            当前帧及滑动窗口的偏差统计, 未找到棋盘格时返回None
+        """
+        t_start = time.perf_counter()
+        self.frame_count += 1
+
+        if len(image.shape) == 3:
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        else:
+            gray = image
+
+        # 依次尝试: 光流跟踪 -> 局部检测 -> 全图检测
+        corners = self._track_corners(gray)
+        mode = 'track'
+        if corners is None:
+            corners = self._detect_in_roi(gray)
+            mode = 'roi'
+        if corners is None:
+            corners = ExtrinsicCalibration._detect_checkerboard(gray, self.checkerboard_size)
+            mode = 'full'
+            # 全图检测后不沿用可能已失效的位姿初值
+            self._rvec = self._tvec = None
+
+        if corners is None:
+            self.lost_count += 1
+            self._prev_gray = None
+            self._prev_corners = None
+            self._rvec = self._tvec = None
+            return None
+
+        # 统一为 (N, 1, 2), 光流与鱼眼去畸变均要求该形状
+        corners = corners.reshape(-1, 1, 2)
+        try:
+            rvec, tvec = self._solve_pose(corners)
+        except (ValueError, cv2.error):
+            self.lost_count += 1
+            self._rvec = self._tvec = None
+            return None
+
+        self._prev_gray = gray.copy() if gray is image else gray
+        self._prev_corners = corners
+        self._rvec, self._tvec = rvec, tvec
+
+        T_cam_to_vehicle = ExtrinsicCalibration._camera_to_vehicle(rvec, tvec, self.board_to_vehicle)
+        translation_dev = T_cam_to_vehicle[:3, 3] - self.reference_translation
+        # 旋转偏差保留方向 (R_ref^T R 的旋转向量), 滑动平均时逐帧噪声才能相互抵消
+        rotation_dev_vec = np.rad2deg(
+            cv2.Rodrigues(self.reference_rotation.T @ T_cam_to_vehicle[:3, :3])[0].ravel())
+        rotation_dev = float(np.linalg.norm(rotation_dev_vec))
+
+        self._translation_devs.append(translation_dev)
+        self._rotation_devs.append(rotation_dev_vec)
+        self._frame_times.append((time.perf_counter() - t_start) * 1000)
+
+        status = self.get_status()
+        status.update({
+            'mode': mode,
+            'transformation_matrix': T_cam_to_vehicle,
+            'translation_deviation': translation_dev,
+            'translation_error_m': float(np.linalg.norm(translation_dev)),
+            'rotation_deviation_deg': rotation_dev_vec,
+            'rotation_error_deg': rotation_dev
+        })
+        return status
+
+    def get_status(self) -> dict:
+        """
+        获取滑动窗口统计
+
+        Returns:
+            包含滑动平均偏差、最大偏差、单帧耗时及是否漂移的字典
+        """
+        if not self._translation_devs:
+            return {'samples': 0, 'drift_detected': False,
+                    'frames': self.frame_count, 'lost_frames': self.lost_count}
+
+        translation_devs = np.array(self._translation_devs)
+        rotation_devs = np.array(self._rotation_devs)
+        # 对偏差向量求平均可抵消逐帧噪声, 反映的是系统性的安装偏移
+        # (旋转偏差为小角度, 旋转向量的算术平均即可近似 SO(3) 上的平均)
+        mean_translation = translation_devs.mean(axis=0)
+        mean_translation_error = float(np.linalg.norm(mean_translation))
+        mean_rotation = rotation_devs.mean(axis=0)
+        mean_rotation_error = float(np.linalg.norm(mean_rotation))
+
+        return {
+            'samples': len(translation_devs),
+            'frames': self.frame_count,
+            'lost_frames': self.lost_count,
+            'rolling_translation_deviation': mean_translation,
+            'rolling_translation_error_m': mean_translation_error,
+            'rolling_rotation_deviation_deg': mean_rotation,
+            'rolling_rotation_error_deg': mean_rotation_error,
+            'max_translation_error_m': float(np.linalg.norm(translation_devs, axis=1).max()),
+            'max_rotation_error_deg': float(np.linalg.norm(rotation_devs, axis=1).max()),
+            'mean_frame_ms': float(np.mean(self._frame_times)),
+            'drift_detected': (mean_translation_error > self.translation_tolerance or
+                               mean_rotation_error > self.rotation_tolerance)
+        }
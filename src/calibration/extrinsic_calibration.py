@@ -7,12 +7,31 @@
 2. 车辆坐标系: 后轴中心为原点, X轴向前(车头方向), Y轴向左, Z轴向上
 3. 相机坐标系: 相机光心为原点, X轴向右, Y轴向下, Z轴向前(光轴方向)
 """
+import time
+import itertools
 import numpy as np
 import cv2
-from typing import Tuple, Optional, Union, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple, Optional, Union, List, Sequence
 from transforms3d.euler import euler2mat, mat2euler
 
 
+# 可选的PnP求解器
+# - iterative: 基于LM的迭代法（默认，与旧版行为一致）
+# - ippe: 平面目标的解析解，速度快
+# - sqpnp: 全局最优的非迭代解法
+# - epnp: 线性解法，速度快但噪声下精度较低
+# - ransac: solvePnPRansac，对遮挡、误检或错序的角点鲁棒。RANSAC 的最小样本假设
+#           总是由 OpenCV 用 EPnP 求解，下表中的方法只用于最后在内点集上的求解
+PNP_SOLVERS = {
+    'iterative': cv2.SOLVEPNP_ITERATIVE,
+    'ippe': cv2.SOLVEPNP_IPPE,
+    'sqpnp': cv2.SOLVEPNP_SQPNP,
+    'epnp': cv2.SOLVEPNP_EPNP,
+    'ransac': cv2.SOLVEPNP_SQPNP,
+}
+
+
 class ExtrinsicCalibration:
     """相机外参标定类"""
     
@@ -21,6 +40,16 @@ class ExtrinsicCalibration:
         self.rotation_matrix = None
         self.translation_vector = None
         self.transformation_matrix = None
+        
+        # 最近一次标定使用的标定板到车辆坐标系变换 (4x4)，供注册到变换树
+        self.board_to_vehicle_transform = None
+        
+        # 由 transformation_matrix 派生的缓存 (源矩阵字节, {(dtype, inverse): 3x4 仿射矩阵, ...})
+        # 以矩阵内容判断是否失效，重新赋值或原地修改 transformation_matrix 后都会重建
+        self._transform_cache = None
+        
+        # 按内参缓存的视锥半角 {(内参, 畸变, 图像尺寸, 模型): 弧度}，与外参无关
+        self._view_angle_cache = {}
     
     def from_manual_measurement(self, 
                                 position: Tuple[float, float, float],
@@ -58,6 +87,8 @@ class ExtrinsicCalibration:
         self.transformation_matrix = np.eye(4)
         self.transformation_matrix[:3, :3] = self.rotation_matrix
         self.transformation_matrix[:3, 3] = self.translation_vector
+        # 未使用标定板
+        self.board_to_vehicle_transform = None
         
         print("外参设置完成（手动测量）:")
         print(f"位置 (x, y, z): {position}")
@@ -73,7 +104,10 @@ class ExtrinsicCalibration:
                  camera_matrix: np.ndarray,
                  dist_coeffs: np.ndarray,
                  marker_to_vehicle_transform: np.ndarray,
-                 use_fisheye: bool = True) -> dict:
+                 use_fisheye: bool = True,
+                 solver: str = 'iterative',
+                 refine: bool = False,
+                 ransac_threshold: float = 2.0) -> dict:
         """
         通过PnP算法计算外参
         
@@ -84,61 +118,27 @@ class ExtrinsicCalibration:
             dist_coeffs: 畸变系数
             marker_to_vehicle_transform: 标定板坐标系到车辆坐标系的变换矩阵 (4x4)
             use_fisheye: 是否使用鱼眼相机模型
+            solver: PnP求解器 'iterative' | 'ippe' | 'sqpnp' | 'epnp' | 'ransac'
+            refine: 是否追加LM精化（ransac时仅使用内点）
+            ransac_threshold: RANSAC内点重投影阈值（像素）
             
         Returns:
             包含外参的字典
         """
-        # 使用PnP求解相机位姿（相机到标定板）
-        if use_fisheye:
-            # 鱼眼相机需要特殊处理，先去畸变图像点
-            # OpenCV的fisheye模块不直接提供solvePnP，需要使用undistortPoints
-            image_points_undistorted = cv2.fisheye.undistortPoints(
-                image_points, camera_matrix, dist_coeffs, P=camera_matrix
-            )
-            # 使用去畸变后的点和无畸变模型求解
-            success, rvec, tvec = cv2.solvePnP(
-                object_points,
-                image_points_undistorted,
-                camera_matrix,
-                None,  # 已去畸变，不需要畸变系数
-                flags=cv2.SOLVEPNP_ITERATIVE
-            )
-        else:
-            # 标准相机模型
-            success, rvec, tvec = cv2.solvePnP(
-                object_points,
-                image_points,
-                camera_matrix,
-                dist_coeffs,
-                flags=cv2.SOLVEPNP_ITERATIVE
-            )
-        
-        if not success:
-            raise ValueError("PnP求解失败")
-        
-        # 转换旋转向量为旋转矩阵（相机到标定板）
-        R_cam_to_board, _ = cv2.Rodrigues(rvec)
-        t_cam_to_board = tvec.flatten()
-        
-        # 构建相机到标定板的变换矩阵
-        T_cam_to_board = np.eye(4)
-        T_cam_to_board[:3, :3] = R_cam_to_board
-        T_cam_to_board[:3, 3] = t_cam_to_board
-        
-        # 计算标定板到相机的变换（求逆）
-        T_board_to_cam = np.linalg.inv(T_cam_to_board)
-        
-        # 计算相机到车辆坐标系的变换
-        # T_cam_to_vehicle = T_board_to_vehicle @ T_cam_to_board
-        T_board_to_vehicle = marker_to_vehicle_transform
-        T_cam_to_vehicle = T_board_to_vehicle @ T_board_to_cam
+        rvec, tvec, inliers = self._solve_board_pose(object_points, image_points,
+                                                     camera_matrix, dist_coeffs, use_fisheye,
+                                                     solver, refine, ransac_threshold)
+        T_cam_to_vehicle = self._camera_to_vehicle(rvec, tvec, marker_to_vehicle_transform)
+        self.board_to_vehicle_transform = np.asarray(marker_to_vehicle_transform, dtype=np.float64)
         
         # 提取旋转和平移
         self.rotation_matrix = T_cam_to_vehicle[:3, :3]
         self.translation_vector = T_cam_to_vehicle[:3, 3]
         self.transformation_matrix = T_cam_to_vehicle
         
-        print("外参标定完成（PnP方法）:")
+        print(f"外参标定完成（PnP方法, 求解器: {solver}{' + LM' if refine else ''}）:")
+        if not inliers.all():
+            print(f"RANSAC内点: {int(inliers.sum())}/{len(inliers)}")
         print(f"旋转矩阵:\n{self.rotation_matrix}")
         print(f"平移向量: {self.translation_vector}")
         
@@ -152,7 +152,10 @@ class ExtrinsicCalibration:
                          square_size: float,
                          board_to_vehicle_pose: Union[List[float], Tuple[float, ...]],
                          rear_axle_offset: Optional[Union[List[float], Tuple[float, ...]]] = None,
-                         use_fisheye: bool = True) -> dict:
+                         use_fisheye: bool = True,
+                         solver: str = 'iterative',
+                         refine: bool = False,
+                         ransac_threshold: float = 2.0) -> dict:
         """
         使用棋盘格自动标定外参
         
@@ -171,32 +174,472 @@ class ExtrinsicCalibration:
                                    位置单位:米, 姿态单位:度
             rear_axle_offset: 相机相对后轴的粗略偏移 (x, y, z) 米 (可选, 未使用)
             use_fisheye: 是否使用鱼眼相机模型 (默认: True)
+            solver: PnP求解器，见 from_pnp
+            refine: 是否追加LM精化
+            ransac_threshold: RANSAC内点重投影阈值（像素）
             
         Returns:
             包含外参的字典
         """
         # 查找棋盘格角点
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        ret, corners = cv2.findChessboardCorners(gray, checkerboard_size, None)
+        corners = self._detect_checkerboard(image, checkerboard_size)
         
-        if not ret:
+        if corners is None:
+            raise ValueError("未在图像中找到棋盘格")
+        
+        # 生成3D点（棋盘格坐标系: 左上角为原点, X右, Y下, Z外）
+        objp = self._board_object_points(checkerboard_size, square_size)
+        
+        # 构建棋盘格到车辆坐标系的变换矩阵
+        T_board_to_vehicle = self._board_to_vehicle_matrix(board_to_vehicle_pose)
+        
+        print(f"\n棋盘格到车辆变换矩阵:")
+        print(T_board_to_vehicle)
+        
+        # 使用PnP计算外参
+        return self.from_pnp(objp, corners, camera_matrix, dist_coeffs, 
+                            T_board_to_vehicle, use_fisheye,
+                            solver, refine, ransac_threshold)
+    
+    def from_checkerboard_frames(self,
+                                 images: Sequence[np.ndarray],
+                                 camera_matrix: np.ndarray,
+                                 dist_coeffs: np.ndarray,
+                                 checkerboard_size: Tuple[int, int],
+                                 square_size: float,
+                                 board_to_vehicle_pose: Union[List[float], Tuple[float, ...]],
+                                 use_fisheye: bool = True,
+                                 method: str = 'joint',
+                                 max_workers: Optional[int] = None,
+                                 solver: str = 'iterative',
+                                 refine: bool = False,
+                                 ransac_threshold: float = 2.0) -> dict:
+        """
+        使用多帧棋盘格图像标定外参（相机与标定板均静止）
+        
+        各帧并行检测角点，然后:
+        - 'joint': 合并所有帧的角点，求解一次联合PnP
+        - 'robust': 逐帧PnP，在SO(3)上对旋转做鲁棒平均（近似测地中值），平移取几何中值
+        
+        Args:
+            images: 包含棋盘格的图像序列
+            camera_matrix: 相机内参矩阵
+            dist_coeffs: 畸变系数
+            checkerboard_size: 棋盘格大小 (cols, rows) - 内角点数量
+            square_size: 方格尺寸（米）
+            board_to_vehicle_pose: 棋盘格左上角在车辆坐标系中的位姿
+                                   [x, y, z, roll, pitch, yaw] 位置单位:米, 姿态单位:度
+            use_fisheye: 是否使用鱼眼相机模型 (默认: True)
+            method: 'joint' 或 'robust'
+            max_workers: 并行检测线程数，默认由线程池决定
+            solver: PnP求解器，见 from_pnp
+            refine: 是否追加LM精化
+            ransac_threshold: RANSAC内点重投影阈值（像素）
+            
+        Returns:
+            包含外参的字典，附加 'multi_frame' 统计（位姿离散度、每帧耗时）
+        """
+        if method not in ('joint', 'robust'):
+            raise ValueError(f"未知的多帧融合方法: {method}")
+        if len(images) == 0:
+            raise ValueError("未提供图像")
+        
+        # 并行检测（OpenCV在检测时释放GIL，线程池即可并行）
+        t_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            detections = list(executor.map(
+                lambda img: self._detect_checkerboard(img, checkerboard_size), images
+            ))
+        t_detect = time.perf_counter() - t_start
+        
+        frame_corners = [c for c in detections if c is not None]
+        if not frame_corners:
+            raise ValueError("未在任何图像中找到棋盘格")
+        print(f"在 {len(frame_corners)}/{len(images)} 帧中检测到棋盘格")
+        
+        objp = self._board_object_points(checkerboard_size, square_size)
+        T_board_to_vehicle = self._board_to_vehicle_matrix(board_to_vehicle_pose)
+        
+        # 逐帧位姿，用于 robust 融合及离散度统计
+        t_solve_start = time.perf_counter()
+        frame_poses = []
+        for corners in frame_corners:
+            rvec, tvec, _ = self._solve_board_pose(objp, corners, camera_matrix,
+                                                   dist_coeffs, use_fisheye,
+                                                   solver, refine, ransac_threshold)
+            frame_poses.append(self._camera_to_vehicle(rvec, tvec, T_board_to_vehicle))
+        rotations = np.array([T[:3, :3] for T in frame_poses])
+        translations = np.array([T[:3, 3] for T in frame_poses])
+        
+        if method == 'joint':
+            all_objp = np.tile(objp, (len(frame_corners), 1))
+            all_corners = np.concatenate(frame_corners, axis=0)
+            self.from_pnp(all_objp, all_corners, camera_matrix, dist_coeffs,
+                          T_board_to_vehicle, use_fisheye,
+                          solver, refine, ransac_threshold)
+        else:
+            R_fused, t_fused = self._robust_mean_pose(rotations, translations)
+            self.rotation_matrix = R_fused
+            self.translation_vector = t_fused
+            self.transformation_matrix = np.eye(4)
+            self.transformation_matrix[:3, :3] = R_fused
+            self.transformation_matrix[:3, 3] = t_fused
+            self.board_to_vehicle_transform = T_board_to_vehicle
+        t_solve = time.perf_counter() - t_solve_start
+        
+        # 各帧相对最终结果的偏差
+        rotation_dev = self._rotation_angles_deg(rotations, self.rotation_matrix)
+        translation_dev = np.linalg.norm(translations - self.translation_vector, axis=1)
+        
+        stats = {
+            'method': method,
+            'frames_total': len(images),
+            'frames_used': len(frame_corners),
+            'rotation_spread_deg': {
+                'mean': float(rotation_dev.mean()),
+                'std': float(rotation_dev.std()),
+                'max': float(rotation_dev.max())
+            },
+            'translation_spread_m': {
+                'mean': float(translation_dev.mean()),
+                'std': float(translation_dev.std()),
+                'max': float(translation_dev.max())
+            },
+            'translation_std_xyz_m': translations.std(axis=0).tolist(),
+            'detect_ms_per_frame': t_detect * 1000 / len(images),
+            'solve_ms_per_frame': t_solve * 1000 / len(frame_corners)
+        }
+        
+        print(f"多帧外参标定完成（{method}）:")
+        print(f"  旋转离散度: 平均 {stats['rotation_spread_deg']['mean']:.4f}°, "
+              f"最大 {stats['rotation_spread_deg']['max']:.4f}°")
+        print(f"  平移离散度: 平均 {stats['translation_spread_m']['mean'] * 1000:.2f}mm, "
+              f"最大 {stats['translation_spread_m']['max'] * 1000:.2f}mm")
+        print(f"  每帧耗时: 检测 {stats['detect_ms_per_frame']:.2f}ms, "
+              f"求解 {stats['solve_ms_per_frame']:.2f}ms")
+        
+        result = self.get_calibration_result()
+        result['multi_frame'] = stats
+        return result
+    
+    def from_multi_checkerboard(self,
+                                image: np.ndarray,
+                                camera_matrix: np.ndarray,
+                                dist_coeffs: np.ndarray,
+                                boards: Sequence[dict],
+                                use_fisheye: bool = True,
+                                solver: str = 'iterative',
+                                refine: bool = False,
+                                ransac_threshold: float = 2.0,
+                                max_assignments: int = 5040) -> dict:
+        """
+        单张图像中多块棋盘格联合标定外参
+        
+        每块棋盘格在车辆坐标系中的位姿已知，将所有角点变换到车辆坐标系后求解一次
+        非平面PnP，比单块标定板几何条件更好。
+        检测按角点数从多到少进行，每检测到一块即将其区域涂平后继续检测，
+        以免小尺寸棋盘格在大棋盘格内部被误检；同尺寸的多块棋盘格按重投影误差最小分配。
+        
+        Args:
+            image: 包含多块棋盘格的图像
+            camera_matrix: 相机内参矩阵
+            dist_coeffs: 畸变系数
+            boards: 棋盘格配置列表，每项包含:
+                    'checkerboard_size': (cols, rows) 内角点数量
+                    'square_size': 方格尺寸（米）
+                    'board_to_vehicle_pose': [x, y, z, roll, pitch, yaw] 米/度
+                    'name': 名称（可选）
+            use_fisheye: 是否使用鱼眼相机模型 (默认: True)
+            solver: PnP求解器，见 from_pnp（多块棋盘格时不能使用 ippe）
+            refine: 是否追加LM精化
+            ransac_threshold: RANSAC内点重投影阈值（像素）
+            max_assignments: 同尺寸棋盘格分配方案的最大枚举数
+            
+        Returns:
+            包含外参的字典，附加 'multi_board' 统计（检测到的棋盘格、各板重投影误差）
+        """
+        if len(boards) == 0:
+            raise ValueError("未提供棋盘格配置")
+        
+        specs = []
+        for i, board in enumerate(boards):
+            size = tuple(int(n) for n in board['checkerboard_size'])
+            specs.append({
+                'name': board.get('name', f'board_{i}'),
+                'checkerboard_size': size,
+                'object_points': self._board_object_points(size, board['square_size']),
+                'board_to_vehicle': self._board_to_vehicle_matrix(board['board_to_vehicle_pose'])
+            })
+        
+        if len(image.shape) == 3:
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        else:
+            gray = image.copy()
+        
+        # 按尺寸分组，角点数多的先检测
+        groups = {}
+        for spec in specs:
+            groups.setdefault(spec['checkerboard_size'], []).append(spec)
+        sizes = sorted(groups, key=lambda s: s[0] * s[1], reverse=True)
+        
+        detections = {}
+        for size in sizes:
+            detections[size] = self._detect_multiple_checkerboards(gray, size, len(groups[size]))
+        
+        num_detected = sum(len(d) for d in detections.values())
+        if num_detected == 0:
             raise ValueError("未在图像中找到棋盘格")
+        if solver == 'ippe' and num_detected > 1:
+            raise ValueError("ippe 仅适用于单个平面目标，多块棋盘格请使用其他求解器")
+        
+        # 每组内: 检测结果到配置的所有单射分配，跨组取笛卡尔积
+        group_options = [list(itertools.permutations(groups[size], len(detections[size])))
+                         for size in sizes]
+        num_options = int(np.prod([len(o) for o in group_options]))
+        if num_options > max_assignments:
+            raise ValueError(f"同尺寸棋盘格分配方案过多 ({num_options})，请减少同尺寸棋盘格数量")
+        
+        best = None
+        for option in itertools.product(*group_options):
+            pairs = [(spec, corners)
+                     for size, assigned in zip(sizes, option)
+                     for spec, corners in zip(assigned, detections[size])]
+            object_points = np.concatenate([
+                self._transform_points(spec['board_to_vehicle'], spec['object_points'])
+                for spec, _ in pairs
+            ])
+            image_points = np.concatenate([corners.reshape(-1, 2) for _, corners in pairs])
+            try:
+                rvec, tvec, inliers = self._solve_board_pose(
+                    object_points, image_points, camera_matrix, dist_coeffs, use_fisheye,
+                    solver, refine, ransac_threshold
+                )
+            except (ValueError, cv2.error):
+                continue
+            errors = self._reprojection_errors(object_points, image_points, rvec, tvec,
+                                               camera_matrix, dist_coeffs, use_fisheye)
+            rms = float(np.sqrt(np.mean(errors ** 2)))
+            if best is None or rms < best[0]:
+                best = (rms, pairs, rvec, tvec, inliers, errors)
+        
+        if best is None:
+            raise ValueError("PnP求解失败")
+        rms, pairs, rvec, tvec, inliers, errors = best
+        
+        # PnP结果为车辆坐标系到相机坐标系的变换
+        T_cam_to_vehicle = self._camera_to_vehicle(rvec, tvec, np.eye(4))
+        self.rotation_matrix = T_cam_to_vehicle[:3, :3]
+        self.translation_vector = T_cam_to_vehicle[:3, 3]
+        self.transformation_matrix = T_cam_to_vehicle
+        # 多块标定板联合求解，没有单一的标定板坐标系可注册
+        self.board_to_vehicle_transform = None
+        
+        per_board = {}
+        offset = 0
+        for spec, _ in pairs:
+            n = len(spec['object_points'])
+            per_board[spec['name']] = float(np.sqrt(np.mean(errors[offset:offset + n] ** 2)))
+            offset += n
+        
+        stats = {
+            'boards_detected': [spec['name'] for spec, _ in pairs],
+            'boards_missing': [spec['name'] for spec in specs if spec['name'] not in per_board],
+            'points': len(errors),
+            'inliers': int(inliers.sum()),
+            'rms_reprojection_px': rms,
+            'per_board_rms_px': per_board,
+            'assignments_tried': num_options
+        }
+        
+        print(f"多棋盘格外参标定完成（求解器: {solver}{' + LM' if refine else ''}）:")
+        print(f"  检测到 {len(pairs)}/{len(specs)} 块棋盘格, 共 {len(errors)} 个角点")
+        for name, err in per_board.items():
+            print(f"  {name}: 重投影误差 {err:.3f}px")
+        if stats['boards_missing']:
+            print(f"  未检测到: {', '.join(stats['boards_missing'])}")
+        print(f"旋转矩阵:\n{self.rotation_matrix}")
+        print(f"平移向量: {self.translation_vector}")
+        
+        result = self.get_calibration_result()
+        result['multi_board'] = stats
+        return result
+    
+    @staticmethod
+    def _rotation_angles_deg(rotations: np.ndarray, reference: np.ndarray) -> np.ndarray:
+        """
+        计算一组旋转矩阵与参考旋转之间的夹角（度）
+        
+        Args:
+            rotations: (N, 3, 3) 旋转矩阵
+            reference: (3, 3) 参考旋转矩阵
+            
+        Returns:
+            (N,) 夹角
+        """
+        # trace(R_ref^T R) = 1 + 2cos(theta)
+        traces = np.einsum('ij,nij->n', np.asarray(reference), rotations)
+        return np.rad2deg(np.arccos(np.clip((traces - 1) / 2, -1.0, 1.0)))
+    
+    @staticmethod
+    def _robust_mean_pose(rotations: np.ndarray,
+                          translations: np.ndarray,
+                          iterations: int = 20) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        位姿鲁棒平均
+        
+        旋转: 迭代重加权的弦距离平均（权重取与当前估计夹角的倒数，近似SO(3)测地中值）
+        平移: Weiszfeld 几何中值
+        
+        Args:
+            rotations: (N, 3, 3) 旋转矩阵
+            translations: (N, 3) 平移向量
+            iterations: 迭代次数
+            
+        Returns:
+            (R, t) 融合后的旋转矩阵和平移向量
+        """
+        eps = 1e-9
+        
+        def project_to_so3(M):
+            U, _, Vt = np.linalg.svd(M)
+            D = np.diag([1.0, 1.0, np.sign(np.linalg.det(U @ Vt))])
+            return U @ D @ Vt
+        
+        R = project_to_so3(rotations.sum(axis=0))
+        t = np.median(translations, axis=0)
+        for _ in range(iterations):
+            angles = np.deg2rad(ExtrinsicCalibration._rotation_angles_deg(rotations, R))
+            weights = 1.0 / np.maximum(angles, eps)
+            R = project_to_so3(np.einsum('n,nij->ij', weights, rotations))
+            
+            distances = np.linalg.norm(translations - t, axis=1)
+            t_weights = 1.0 / np.maximum(distances, eps)
+            t = (t_weights[:, None] * translations).sum(axis=0) / t_weights.sum()
+        
+        return R, t
+    
+    @staticmethod
+    def _detect_checkerboard(image: np.ndarray,
+                             checkerboard_size: Tuple[int, int]) -> Optional[np.ndarray]:
+        """
+        检测棋盘格角点并亚像素精确化
+        
+        Args:
+            image: 输入图像（BGR或灰度）
+            checkerboard_size: 棋盘格大小 (cols, rows) - 内角点数量
+            
+        Returns:
+            角点坐标 (N, 1, 2)，未找到返回None
+        """
+        if len(image.shape) == 3:
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        else:
+            gray = image
+        
+        ret, corners = cv2.findChessboardCorners(gray, tuple(checkerboard_size), None)
+        if not ret:
+            return None
         
         # 亚像素精确化
         criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
-        corners = cv2.cornerSubPix(gray, corners, (11, 11), (-1, -1), criteria)
+        return cv2.cornerSubPix(gray, corners, (11, 11), (-1, -1), criteria)
+    
+    @staticmethod
+    def _detect_multiple_checkerboards(gray: np.ndarray,
+                                       checkerboard_size: Tuple[int, int],
+                                       max_count: int) -> List[np.ndarray]:
+        """
+        在同一图像中检测多块同尺寸棋盘格
         
-        # 生成3D点（棋盘格坐标系: 左上角为原点, X右, Y下, Z外）
+        每检测到一块，就将其外扩一个半方格后的区域涂成均匀灰度再继续检测。
+        会原地修改 gray，使后续更小尺寸的检测不会落在已检测的棋盘格内部。
+        
+        Args:
+            gray: 灰度图像（会被修改）
+            checkerboard_size: 棋盘格大小 (cols, rows) - 内角点数量
+            max_count: 最多检测的块数
+            
+        Returns:
+            角点列表，每项为 (N, 1, 2)
+        """
+        cols, rows = checkerboard_size
+        found = []
+        while len(found) < max_count:
+            corners = ExtrinsicCalibration._detect_checkerboard(gray, checkerboard_size)
+            if corners is None:
+                break
+            corners = corners.reshape(-1, 1, 2)
+            found.append(corners)
+            
+            # 由四个外角点沿网格方向外推 1.5 个方格，覆盖棋盘格外圈方格和白边
+            grid = corners.reshape(rows, cols, 2)
+            outline = []
+            for r, c, dr, dc in ((0, 0, 1, 1), (0, -1, 1, -1), (-1, -1, -1, -1), (-1, 0, -1, 1)):
+                p = grid[r, c]
+                step_c = grid[r, c + dc] - p
+                step_r = grid[r + dr, c] - p
+                outline.append(p - 1.5 * (step_c + step_r))
+            cv2.fillConvexPoly(gray, np.round(outline).astype(np.int32), 128)
+        return found
+    
+    @staticmethod
+    def _transform_points(transform: np.ndarray, points: np.ndarray) -> np.ndarray:
+        """用 4x4 变换矩阵变换 (N, 3) 点"""
+        transform = np.asarray(transform, dtype=np.float64)
+        return np.asarray(points, dtype=np.float64) @ transform[:3, :3].T + transform[:3, 3]
+    
+    @staticmethod
+    def _reprojection_errors(object_points: np.ndarray,
+                             image_points: np.ndarray,
+                             rvec: np.ndarray,
+                             tvec: np.ndarray,
+                             camera_matrix: np.ndarray,
+                             dist_coeffs: np.ndarray,
+                             use_fisheye: bool = True) -> np.ndarray:
+        """
+        逐点重投影误差（像素，原始带畸变图像上）
+        
+        Returns:
+            (N,) 误差
+        """
+        object_points = np.asarray(object_points, dtype=np.float64).reshape(-1, 1, 3)
+        if use_fisheye:
+            projected, _ = cv2.fisheye.projectPoints(object_points, rvec, tvec,
+                                                     camera_matrix, dist_coeffs)
+        else:
+            projected, _ = cv2.projectPoints(object_points, rvec, tvec,
+                                             camera_matrix, dist_coeffs)
+        return np.linalg.norm(projected.reshape(-1, 2) - np.asarray(image_points).reshape(-1, 2), axis=1)
+    
+    @staticmethod
+    def _board_object_points(checkerboard_size: Tuple[int, int], square_size: float) -> np.ndarray:
+        """
+        生成棋盘格角点的3D坐标（棋盘格坐标系: 左上角为原点, X右, Y下, Z外）
+        
+        Returns:
+            (N, 3) float32 角点坐标
+        """
         objp = np.zeros((checkerboard_size[0] * checkerboard_size[1], 3), np.float32)
         objp[:, :2] = np.mgrid[0:checkerboard_size[0], 
                                0:checkerboard_size[1]].T.reshape(-1, 2)
         objp *= square_size
+        return objp
+    
+    @staticmethod
+    def _board_to_vehicle_matrix(board_to_vehicle_pose: Union[List[float], Tuple[float, ...]]) -> np.ndarray:
+        """
+        由棋盘格左上角在车辆坐标系中的位姿构建 4x4 变换矩阵
         
+        Args:
+            board_to_vehicle_pose: [x, y, z, roll, pitch, yaw] 位置单位:米, 姿态单位:度
+            
+        Returns:
+            棋盘格到车辆坐标系的变换矩阵 (4x4)
+        """
         # 解析棋盘格到车辆的位姿
         board_position = board_to_vehicle_pose[:3]
         board_orientation = board_to_vehicle_pose[3:6]
         
-        # 构建棋盘格到车辆坐标系的变换矩阵
         # 棋盘格坐标系: X右, Y下, Z外
         # 车辆坐标系: X前, Y左, Z上
         
@@ -221,39 +664,312 @@ class ExtrinsicCalibration:
         T_board_to_vehicle = np.eye(4)
         T_board_to_vehicle[:3, :3] = R_board_to_vehicle
         T_board_to_vehicle[:3, 3] = board_position
+        return T_board_to_vehicle
+    
+    @staticmethod
+    def _solve_board_pose(object_points: np.ndarray,
+                          image_points: np.ndarray,
+                          camera_matrix: np.ndarray,
+                          dist_coeffs: np.ndarray,
+                          use_fisheye: bool = True,
+                          solver: str = 'iterative',
+                          refine: bool = False,
+                          ransac_threshold: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        PnP求解标定板在相机坐标系中的位姿
         
-        print(f"\n棋盘格到车辆变换矩阵:")
-        print(T_board_to_vehicle)
+        Args:
+            object_points: 标定板上的3D点
+            image_points: 图像中对应的2D点
+            camera_matrix: 相机内参矩阵
+            dist_coeffs: 畸变系数
+            use_fisheye: 是否使用鱼眼相机模型
+            solver: PnP求解器，见 PNP_SOLVERS
+            refine: 是否在（内点上）追加LM精化
+            ransac_threshold: RANSAC内点重投影阈值（像素）
+            
+        Returns:
+            (rvec, tvec, inliers): X_cam = R(rvec) @ X_board + tvec，inliers 为内点布尔掩码
+        """
+        if solver not in PNP_SOLVERS:
+            raise ValueError(f"未知的PnP求解器: {solver}，可选: {', '.join(PNP_SOLVERS)}")
         
-        # 使用PnP计算外参
-        return self.from_pnp(objp, corners, camera_matrix, dist_coeffs, 
-                            T_board_to_vehicle, use_fisheye)
+        object_points = np.asarray(object_points, dtype=np.float64).reshape(-1, 3)
+        image_points = np.asarray(image_points, dtype=np.float64).reshape(-1, 1, 2)
+        
+        if use_fisheye:
+            # 鱼眼相机需要特殊处理，先去畸变图像点
+            # OpenCV的fisheye模块不直接提供solvePnP，需要使用undistortPoints
+            image_points = cv2.fisheye.undistortPoints(
+                image_points, camera_matrix, dist_coeffs, P=camera_matrix
+            )
+            dist_coeffs = None  # 已去畸变，不需要畸变系数
+        
+        inliers = np.ones(len(object_points), dtype=bool)
+        if solver == 'ransac':
+            # RANSAC剔除误检/错序角点: 最小样本假设由 OpenCV 内部用 EPnP 求解（与 flags 无关），
+            # flags 只决定最后在全部内点上的求解方法，这里用 SQPnP（平面标定板上比EPnP稳定）
+            success, rvec, tvec, inlier_idx = cv2.solvePnPRansac(
+                object_points,
+                image_points,
+                camera_matrix,
+                dist_coeffs,
+                reprojectionError=ransac_threshold,
+                confidence=0.999,
+                flags=PNP_SOLVERS[solver]
+            )
+            if success and inlier_idx is not None:
+                inliers[:] = False
+                inliers[inlier_idx.ravel()] = True
+        else:
+            success, rvec, tvec = cv2.solvePnP(
+                object_points,
+                image_points,
+                camera_matrix,
+                dist_coeffs,
+                flags=PNP_SOLVERS[solver]
+            )
+        
+        if not success:
+            raise ValueError("PnP求解失败")
+        
+        if refine:
+            rvec, tvec = cv2.solvePnPRefineLM(
+                object_points[inliers],
+                image_points[inliers],
+                camera_matrix,
+                dist_coeffs,
+                rvec,
+                tvec
+            )
+        
+        return rvec, tvec, inliers
     
-    def transform_point_to_vehicle(self, point_camera: np.ndarray) -> np.ndarray:
+    @staticmethod
+    def _camera_to_vehicle(rvec: np.ndarray, tvec: np.ndarray,
+                           board_to_vehicle_transform: np.ndarray) -> np.ndarray:
         """
-        将相机坐标系中的点转换到车辆坐标系
+        由PnP结果计算相机到车辆坐标系的变换
         
         Args:
-            point_camera: 相机坐标系中的点 (x, y, z) 或 (N, 3)
+            rvec, tvec: 标定板在相机坐标系中的位姿（PnP结果）
+            board_to_vehicle_transform: 标定板坐标系到车辆坐标系的变换矩阵 (4x4)
             
         Returns:
-            车辆坐标系中的点
+            相机到车辆坐标系的变换矩阵 (4x4)
+        """
+        # PnP结果即标定板到相机的变换
+        R_board_to_cam, _ = cv2.Rodrigues(rvec)
+        t_board_to_cam = np.asarray(tvec, dtype=np.float64).flatten()
+        
+        # 求逆得到相机到标定板的变换: R^T, -R^T t
+        T_cam_to_board = np.eye(4)
+        T_cam_to_board[:3, :3] = R_board_to_cam.T
+        T_cam_to_board[:3, 3] = -R_board_to_cam.T @ t_board_to_cam
+        
+        # T_cam_to_vehicle = T_board_to_vehicle @ T_cam_to_board
+        return np.asarray(board_to_vehicle_transform, dtype=np.float64) @ T_cam_to_board
+    
+    def _affine_matrix(self, dtype, inverse: bool = False) -> np.ndarray:
+        """
+        获取指定精度的 3x4 仿射矩阵，按 transformation_matrix 缓存
+        
+        Args:
+            dtype: 矩阵精度
+            inverse: False 返回相机->车辆 [R | t]，True 返回车辆->相机 [R^T | -R^T t]
+        
+        Returns:
+            (3, 4) 矩阵
         """
         if self.transformation_matrix is None:
             raise ValueError("外参未设置")
         
-        point_camera = np.asarray(point_camera)
-        if point_camera.ndim == 1:
-            # 单个点
-            point_homo = np.append(point_camera, 1)
-            point_vehicle = self.transformation_matrix @ point_homo
-            return point_vehicle[:3]
+        T = np.asarray(self.transformation_matrix, dtype=np.float64)
+        # 4x4 矩阵的 tobytes 开销可忽略
+        source = T.tobytes()
+        if self._transform_cache is None or self._transform_cache[0] != source:
+            self._transform_cache = (source, {})
+        
+        cache = self._transform_cache[1]
+        key = (np.dtype(dtype), inverse)
+        if key not in cache:
+            if inverse:
+                R, t = T[:3, :3], T[:3, 3]
+                T = np.hstack([R.T, (-R.T @ t)[:, None]])
+            cache[key] = np.ascontiguousarray(T[:3, :], dtype=key[0])
+        return cache[key]
+    
+    @staticmethod
+    def _apply_affine(points: np.ndarray, affine_getter, out: Optional[np.ndarray]) -> np.ndarray:
+        """按 (N, 1, 3) 三通道图像调用 cv2.transform，保持输入形状"""
+        points = np.asarray(points)
+        if points.shape[-1] != 3:
+            raise ValueError(f"点的最后一维必须为3，当前形状: {points.shape}")
+        
+        dtype = np.float32 if points.dtype == np.float32 else np.float64
+        affine = affine_getter(dtype)
+        
+        if out is None:
+            out = np.empty(points.shape, dtype=dtype)
+        elif out.shape != points.shape or out.dtype != dtype or not out.flags.c_contiguous:
+            raise ValueError(f"out 必须为与输入形状相同的C连续 {np.dtype(dtype).name} 数组")
+        
+        if points.size == 0:
+            return out
+        
+        # reshape 对C连续数组返回视图，结果直接写入 out
+        cv2.transform(points.astype(dtype, copy=False).reshape(-1, 1, 3), affine,
+                      dst=out.reshape(-1, 1, 3))
+        return out
+    
+    def transform_point_to_vehicle(self, point_camera: np.ndarray,
+                                   out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        将相机坐标系中的点转换到车辆坐标系
+        
+        直接计算 R @ p + t（cv2.transform），不构造齐次坐标；float32 输入全程保持 float32，
+        提供 out 时不分配新的点云内存
+        
+        Args:
+            point_camera: 相机坐标系中的点 (3,)、(N, 3) 或有序点云 (H, W, 3)
+            out: 可选的输出缓冲区，形状与 point_camera 相同且为C连续，可与输入相同（原地变换）
+            
+        Returns:
+            车辆坐标系中的点，形状与输入相同
+        """
+        return self._apply_affine(point_camera, self._affine_matrix, out)
+    
+    def transform_point_to_camera(self, point_vehicle: np.ndarray,
+                                  out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        将车辆坐标系中的点转换到相机坐标系（外参的逆变换，按外参缓存）
+        
+        Args:
+            point_vehicle: 车辆坐标系中的点 (3,)、(N, 3) 或 (H, W, 3)
+            out: 可选的输出缓冲区，约定同 transform_point_to_vehicle
+            
+        Returns:
+            相机坐标系中的点，形状与输入相同
+        """
+        return self._apply_affine(point_vehicle,
+                                  lambda dtype: self._affine_matrix(dtype, inverse=True), out)
+    
+    @staticmethod
+    def _max_view_angle(camera_matrix: np.ndarray, dist_coeffs: np.ndarray,
+                        image_size: Tuple[int, int], use_fisheye: bool,
+                        samples_per_edge: int = 32) -> float:
+        """
+        图像边界对应的最大视角（弧度），即相机视锥的外接圆锥半角
+        
+        由图像边界像素去畸变得到，超出该角度的点即使畸变多项式折返回图像内也属于不可见
+        """
+        w, h = image_size
+        xs = np.linspace(0, w - 1, samples_per_edge)
+        ys = np.linspace(0, h - 1, samples_per_edge)
+        border = np.concatenate([
+            np.stack([xs, np.zeros_like(xs)], axis=1),
+            np.stack([xs, np.full_like(xs, h - 1)], axis=1),
+            np.stack([np.zeros_like(ys), ys], axis=1),
+            np.stack([np.full_like(ys, w - 1), ys], axis=1),
+        ]).reshape(-1, 1, 2)
+        
+        if use_fisheye:
+            normalized = cv2.fisheye.undistortPoints(border, camera_matrix, dist_coeffs)
         else:
-            # 多个点
-            ones = np.ones((point_camera.shape[0], 1))
-            points_homo = np.hstack([point_camera, ones])
-            points_vehicle = (self.transformation_matrix @ points_homo.T).T
-            return points_vehicle[:, :3]
+            normalized = cv2.undistortPoints(border, camera_matrix, dist_coeffs)
+        radius = np.linalg.norm(normalized.reshape(-1, 2), axis=1)
+        return float(np.arctan(radius.max()))
+    
+    def project_vehicle_points(self, points_vehicle: np.ndarray,
+                               camera_matrix: np.ndarray,
+                               dist_coeffs: np.ndarray,
+                               image_size: Tuple[int, int],
+                               use_fisheye: bool = True,
+                               min_depth: float = 0.05,
+                               angle_margin_deg: float = 1.0) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        将车辆坐标系中的点批量投影到（带畸变的）原始图像
+        
+        依次进行: 逆外参变换 -> 近平面剔除 -> 视锥角剔除 -> 仅对候选点做畸变投影 -> 图像边界检查
+        
+        Args:
+            points_vehicle: 车辆坐标系中的点 (N, 3) 或 (3,)
+            camera_matrix: 相机内参矩阵
+            dist_coeffs: 畸变系数
+            image_size: 图像尺寸 (width, height)
+            use_fisheye: 是否使用鱼眼相机模型
+            min_depth: 近平面距离（米），相机Z轴上小于该值的点不可见
+            angle_margin_deg: 视锥角剔除的余量（度）
+            
+        Returns:
+            (pixels, visible): (N, 2) 像素坐标（不可见点为 NaN）和 (N,) 可见掩码
+        """
+        points = np.asarray(points_vehicle, dtype=np.float64).reshape(-1, 3)
+        camera_matrix = np.asarray(camera_matrix, dtype=np.float64)
+        dist_coeffs = np.asarray(dist_coeffs, dtype=np.float64).ravel()
+        
+        pixels = np.full((len(points), 2), np.nan)
+        visible = np.zeros(len(points), dtype=bool)
+        if len(points) == 0:
+            return pixels, visible
+        
+        # 视锥半角只取决于内参，单独缓存（外参变化时无需重新计算）
+        key = (camera_matrix.tobytes(), dist_coeffs.tobytes(), tuple(image_size), use_fisheye)
+        if key not in self._view_angle_cache:
+            if len(self._view_angle_cache) >= 8:
+                self._view_angle_cache.clear()
+            self._view_angle_cache[key] = self._max_view_angle(camera_matrix, dist_coeffs,
+                                                               image_size, use_fisheye)
+        max_angle = self._view_angle_cache[key] + np.deg2rad(angle_margin_deg)
+        
+        points_camera = self.transform_point_to_camera(points)
+        x, y, z = points_camera[:, 0], points_camera[:, 1], points_camera[:, 2]
+        
+        # 近平面 + 视锥角: atan2(r, z) <= max_angle
+        candidates = z > min_depth
+        candidates &= np.arctan2(np.hypot(x, y), z) <= max_angle
+        index = np.flatnonzero(candidates)
+        if len(index) == 0:
+            return pixels, visible
+        
+        # 点已在相机坐标系，投影时旋转平移为零
+        zero = np.zeros(3)
+        object_points = points_camera[index].reshape(-1, 1, 3)
+        if use_fisheye:
+            projected, _ = cv2.fisheye.projectPoints(object_points, zero, zero,
+                                                     camera_matrix, dist_coeffs)
+        else:
+            projected, _ = cv2.projectPoints(object_points, zero, zero,
+                                             camera_matrix, dist_coeffs)
+        projected = projected.reshape(-1, 2)
+        
+        w, h = image_size
+        inside = ((projected[:, 0] >= 0) & (projected[:, 0] <= w - 1) &
+                  (projected[:, 1] >= 0) & (projected[:, 1] <= h - 1))
+        index = index[inside]
+        pixels[index] = projected[inside]
+        visible[index] = True
+        return pixels, visible
+    
+    def register(self, graph, camera_frame: str = 'camera',
+                 vehicle_frame: str = 'vehicle', board_frame: Optional[str] = None):
+        """
+        将外参注册到坐标系变换树（TransformGraph）
+        
+        Args:
+            graph: TransformGraph 实例
+            camera_frame: 相机坐标系名称
+            vehicle_frame: 车辆坐标系名称
+            board_frame: 若指定，同时注册最近一次标定使用的标定板坐标系
+                         （手动测量、多棋盘格联合标定或从字典加载的外参没有单一标定板，此时报错）
+        """
+        if self.transformation_matrix is None:
+            raise ValueError("外参未设置")
+        graph.set_transform(vehicle_frame, camera_frame, self.transformation_matrix)
+        if board_frame is not None:
+            if self.board_to_vehicle_transform is None:
+                raise ValueError("没有可注册的标定板位姿（外参不是由单块标定板求解得到）")
+            graph.set_transform(vehicle_frame, board_frame, self.board_to_vehicle_transform)
     
     def get_calibration_result(self) -> dict:
         """
@@ -291,3 +1007,4 @@ class ExtrinsicCalibration:
         self.rotation_matrix = np.array(extrinsic_dict['rotation_matrix'])
         self.translation_vector = np.array(extrinsic_dict['translation_vector'])
         self.transformation_matrix = np.array(extrinsic_dict['transformation_matrix'])
+        self.board_to_vehicle_transform = None
@@ -103,7 +103,8 @@ class IntrinsicCalibration:
         
         if corners is not None:
             self.objpoints.append(self.objp)
-            self.imgpoints.append(corners)
+            # 鱼眼标定要求 (N, 1, 2)，OpenCV 5 的 cornerSubPix 返回 (N, 2)
+            self.imgpoints.append(corners.reshape(-1, 1, 2))
             return True
         
         return False
@@ -130,12 +131,17 @@ class IntrinsicCalibration:
             dist_coeffs = np.zeros((4, 1))
             rvecs = [np.zeros((1, 1, 3), dtype=np.float64) for _ in range(len(self.objpoints))]
             tvecs = [np.zeros((1, 1, 3), dtype=np.float64) for _ in range(len(self.objpoints))]
+            # OpenCV 5 的鱼眼标定只接受 (1, N, 3) / (1, N, 2) 的点集
+            objpoints = [points.reshape(1, -1, 3) for points in self.objpoints]
+            imgpoints = [points.reshape(1, -1, 2) for points in self.imgpoints]
             
-            calibration_flags = cv2.fisheye.CALIB_RECOMPUTE_EXTRINSIC + cv2.fisheye.CALIB_CHECK_COND + cv2.fisheye.CALIB_FIX_SKEW
+            # OpenCV 5 将鱼眼标定标志移到了 cv2 顶层
+            flags = cv2.fisheye if hasattr(cv2.fisheye, 'CALIB_RECOMPUTE_EXTRINSIC') else cv2
+            calibration_flags = flags.CALIB_RECOMPUTE_EXTRINSIC + flags.CALIB_CHECK_COND + flags.CALIB_FIX_SKEW
 
             ret, camera_matrix, dist_coeffs, rvecs, tvecs = cv2.fisheye.calibrate(
-                self.objpoints,
-                self.imgpoints,
+                objpoints,
+                imgpoints,
                 image_size,
                 camera_matrix,
                 dist_coeffs,
@@ -268,7 +274,9 @@ class IntrinsicCalibration:
                     self.objpoints[i], self.rvecs[i], self.tvecs[i],
                     self.camera_matrix, self.dist_coeffs
                 )
-            error = cv2.norm(self.imgpoints[i], imgpoints2, cv2.NORM_L2) / len(imgpoints2)
+            # 统一为 (N, 2)，不同 OpenCV 版本返回的角点形状不同
+            error = cv2.norm(self.imgpoints[i].reshape(-1, 2).astype(np.float32),
+                             imgpoints2.reshape(-1, 2).astype(np.float32), cv2.NORM_L2) / len(imgpoints2)
             total_error += error
         
         mean_error = total_error / len(self.objpoints)
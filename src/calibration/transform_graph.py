@@ -0,0 +1,202 @@
+"""
+坐标系变换树
+以命名坐标系为节点、刚体变换为边, 支持任意两个坐标系之间的变换查询,
+组合变换及其逆按需计算并缓存, 某条边更新时只失效依赖它的缓存项
+"""
+import threading
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+from .extrinsic_calibration import ExtrinsicCalibration
+
+
+def invert_transform(transform: np.ndarray) -> np.ndarray:
+    """
+    刚体变换求逆: [R | t]^-1 = [R^T | -R^T t]
+
+    Args:
+        transform: 4x4 刚体变换矩阵
+
+    Returns:
+        4x4 逆变换矩阵
+    """
+    R = transform[:3, :3]
+    t = transform[:3, 3]
+    inverse = np.eye(4)
+    inverse[:3, :3] = R.T
+    inverse[:3, 3] = -R.T @ t
+    return inverse
+
+
+class TransformGraph:
+    """坐标系变换树（每个坐标系至多一个父坐标系）"""
+
+    def __init__(self):
+        """初始化空的变换树"""
+        # 子坐标系 -> (父坐标系, 子到父的 4x4 变换)
+        self._edges: Dict[str, Tuple[str, np.ndarray]] = {}
+        self._frames = set()
+
+        # (源, 目标) -> {'matrix': 4x4 只读矩阵, dtype: 3x4 仿射矩阵}
+        self._cache: Dict[Tuple[str, str], dict] = {}
+        # 边（以子坐标系命名） -> 依赖该边的缓存键
+        self._dependents: Dict[str, set] = {}
+        self._lock = threading.RLock()
+
+    @property
+    def frames(self) -> List[str]:
+        """所有坐标系名称"""
+        return sorted(self._frames)
+
+    def has_frame(self, frame: str) -> bool:
+        """坐标系是否存在"""
+        return frame in self._frames
+
+    def parent(self, frame: str) -> Optional[str]:
+        """父坐标系，根坐标系返回None"""
+        edge = self._edges.get(frame)
+        return edge[0] if edge else None
+
+    def set_transform(self, parent: str, child: str, transform: np.ndarray):
+        """
+        设置或更新一条边
+
+        Args:
+            parent: 父坐标系名称
+            child: 子坐标系名称
+            transform: 子坐标系到父坐标系的 4x4 变换 (p_parent = T @ p_child)
+        """
+        if parent == child:
+            raise ValueError("父子坐标系不能相同")
+        transform = np.array(transform, dtype=np.float64)
+        if transform.shape != (4, 4):
+            raise ValueError(f"变换矩阵必须为 4x4，当前形状: {transform.shape}")
+
+        with self._lock:
+            existing = self._edges.get(child)
+            if existing is not None and existing[0] != parent:
+                raise ValueError(f"坐标系 {child} 已有父坐标系 {existing[0]}，请先 remove_transform")
+            if existing is None and child in self._path_to_root(parent):
+                raise ValueError(f"添加 {parent} -> {child} 会形成环")
+
+            transform.setflags(write=False)
+            self._edges[child] = (parent, transform)
+            self._frames.update((parent, child))
+            self._invalidate(child)
+
+    def remove_transform(self, child: str):
+        """
+        删除子坐标系到其父坐标系的边
+
+        Args:
+            child: 子坐标系名称
+        """
+        with self._lock:
+            if child not in self._edges:
+                raise KeyError(f"坐标系 {child} 没有父坐标系")
+            del self._edges[child]
+            self._invalidate(child)
+
+    def _invalidate(self, edge: str):
+        """失效依赖某条边的所有缓存项"""
+        for key in self._dependents.pop(edge, ()):
+            self._cache.pop(key, None)
+
+    def _path_to_root(self, frame: str) -> List[str]:
+        """从 frame 沿父坐标系到根的坐标系序列（含 frame 本身）"""
+        path = [frame]
+        while frame in self._edges:
+            frame = self._edges[frame][0]
+            path.append(frame)
+        return path
+
+    def _chain(self, path: List[str]) -> np.ndarray:
+        """path[0] 到 path[-1] 的组合变换（path 为向上的链）"""
+        transform = np.eye(4)
+        for frame in path[:-1]:
+            transform = self._edges[frame][1] @ transform
+        return transform
+
+    def _entry(self, source: str, target: str) -> dict:
+        """获取（必要时计算并缓存）source 到 target 的缓存项"""
+        entry = self._cache.get((source, target))
+        if entry is not None:
+            return entry
+
+        with self._lock:
+            entry = self._cache.get((source, target))
+            if entry is not None:
+                return entry
+
+            for frame in (source, target):
+                if frame not in self._frames:
+                    raise KeyError(f"未知的坐标系: {frame}")
+
+            # 经最近公共祖先组合: T(source->target) = T(target->lca)^-1 @ T(source->lca)
+            source_path = self._path_to_root(source)
+            target_path = self._path_to_root(target)
+            target_index = {frame: i for i, frame in enumerate(target_path)}
+            lca = next((f for f in source_path if f in target_index), None)
+            if lca is None:
+                raise ValueError(f"坐标系 {source} 与 {target} 不连通")
+            up = source_path[:source_path.index(lca) + 1]
+            down = target_path[:target_index[lca] + 1]
+
+            matrix = invert_transform(self._chain(down)) @ self._chain(up)
+            inverse = invert_transform(matrix)
+
+            # 正反两个方向一并缓存，依赖的边相同
+            edges = up[:-1] + down[:-1]
+            for key, value in (((source, target), matrix), ((target, source), inverse)):
+                value.setflags(write=False)
+                self._cache[key] = {'matrix': value}
+                for edge in edges:
+                    self._dependents.setdefault(edge, set()).add(key)
+            return self._cache[(source, target)]
+
+    def get_transform(self, source: str, target: str) -> np.ndarray:
+        """
+        查询 source 坐标系到 target 坐标系的变换
+
+        Args:
+            source: 源坐标系
+            target: 目标坐标系
+
+        Returns:
+            4x4 只读矩阵 (p_target = T @ p_source)
+        """
+        return self._entry(source, target)['matrix']
+
+    def _affine_matrix(self, source: str, target: str, dtype) -> np.ndarray:
+        """source 到 target 的指定精度 3x4 仿射矩阵，随缓存项一起失效"""
+        entry = self._entry(source, target)
+        key = np.dtype(dtype)
+        affine = entry.get(key)
+        if affine is None:
+            affine = np.ascontiguousarray(entry['matrix'][:3, :], dtype=key)
+            entry[key] = affine
+        return affine
+
+    def transform_points(self, points: np.ndarray, source: str, target: str,
+                         out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        批量变换点
+
+        Args:
+            points: source 坐标系中的点 (3,)、(N, 3) 或 (H, W, 3)；float32 保持 float32
+            source: 源坐标系
+            target: 目标坐标系
+            out: 可选的C连续输出缓冲区，形状与 points 相同
+
+        Returns:
+            target 坐标系中的点，形状与输入相同
+        """
+        return ExtrinsicCalibration._apply_affine(
+            points, lambda dtype: self._affine_matrix(source, target, dtype), out
+        )
+
+    def clear_cache(self):
+        """清除所有缓存的组合变换"""
+        with self._lock:
+            self._cache.clear()
+            self._dependents.clear()
@@ -0,0 +1,190 @@
+"""
+预览去畸变
+直接按显示分辨率生成重映射表, 一次 remap 同时完成去畸变和缩放,
+显示路径不再生成全分辨率的中间图像
+"""
+import numpy as np
+import cv2
+from typing import Tuple, Optional
+
+
+class PreviewUndistorter:
+    """按显示分辨率去畸变的预览器"""
+
+    def __init__(self,
+                 camera_matrix: np.ndarray,
+                 dist_coeffs: np.ndarray,
+                 image_size: Tuple[int, int],
+                 display_size: Optional[Tuple[int, int]] = None,
+                 use_fisheye: bool = True,
+                 balance: float = 1.0):
+        """
+        初始化预览器并生成重映射表
+
+        Args:
+            camera_matrix: 相机内参矩阵
+            dist_coeffs: 畸变系数
+            image_size: 输入图像尺寸 (width, height)
+            display_size: 显示尺寸 (width, height), 默认与输入相同
+            use_fisheye: 是否使用鱼眼相机模型
+            balance: 视野保留比例, 0 为仅保留有效像素, 1 为保留全部视野
+        """
+        self.camera_matrix = np.asarray(camera_matrix, dtype=np.float64)
+        self.dist_coeffs = np.asarray(dist_coeffs, dtype=np.float64)
+        self.image_size = (int(image_size[0]), int(image_size[1]))
+        self.display_size = tuple(int(s) for s in (display_size or image_size))
+        self.use_fisheye = use_fisheye
+        self.balance = balance
+
+        self.new_camera_matrix = self._display_camera_matrix()
+        self.map1, self.map2 = self._build_maps()
+
+        # side_by_side 使用的左右半幅缓冲区
+        self._left = None
+        self._right = None
+
+    @classmethod
+    def from_intrinsic_dict(cls, intrinsic_data: dict,
+                            image_size: Optional[Tuple[int, int]] = None,
+                            display_size: Optional[Tuple[int, int]] = None,
+                            balance: float = 1.0) -> 'PreviewUndistorter':
+        """
+        从内参标定结果字典创建预览器
+
+        Args:
+            intrinsic_data: 内参标定结果 (load_calibration 的返回值)
+            image_size: 输入图像尺寸 (width, height), 默认使用标定时的尺寸
+            display_size: 显示尺寸 (width, height)
+            balance: 视野保留比例
+
+        Returns:
+            PreviewUndistorter 实例
+        """
+        if image_size is None:
+            image_size = (intrinsic_data['image_width'], intrinsic_data['image_height'])
+        use_fisheye = intrinsic_data.get('camera_model', 'fisheye') == 'fisheye'
+        return cls(np.array(intrinsic_data['camera_matrix']),
+                   np.array(intrinsic_data['distortion_coeffs']),
+                   image_size, display_size, use_fisheye, balance)
+
+    def _display_camera_matrix(self) -> np.ndarray:
+        """计算全分辨率去畸变内参, 再缩放到显示分辨率"""
+        width, height = self.image_size
+
+        if self.use_fisheye:
+            full_matrix = cv2.fisheye.estimateNewCameraMatrixForUndistortRectify(
+                self.camera_matrix, self.dist_coeffs, (width, height), np.eye(3),
+                balance=self.balance
+            )
+        else:
+            full_matrix, _ = cv2.getOptimalNewCameraMatrix(
+                self.camera_matrix, self.dist_coeffs, (width, height),
+                self.balance, (width, height)
+            )
+
+        # 按像素中心对齐缩放: x' = (x + 0.5) * s - 0.5
+        scale_x = self.display_size[0] / width
+        scale_y = self.display_size[1] / height
+        display_matrix = np.array(full_matrix, dtype=np.float64)
+        display_matrix[0, 0] *= scale_x
+        display_matrix[1, 1] *= scale_y
+        display_matrix[0, 2] = (display_matrix[0, 2] + 0.5) * scale_x - 0.5
+        display_matrix[1, 2] = (display_matrix[1, 2] + 0.5) * scale_y - 0.5
+        return display_matrix
+
+    def _build_maps(self):
+        """生成显示分辨率的定点重映射表"""
+        if self.use_fisheye:
+            return cv2.fisheye.initUndistortRectifyMap(
+                self.camera_matrix, self.dist_coeffs, np.eye(3),
+                self.new_camera_matrix, self.display_size, cv2.CV_16SC2
+            )
+        return cv2.initUndistortRectifyMap(
+            self.camera_matrix, self.dist_coeffs, np.eye(3),
+            self.new_camera_matrix, self.display_size, cv2.CV_16SC2
+        )
+
+    def undistort(self, image: np.ndarray, dst: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        去畸变并缩放到显示分辨率
+
+        Args:
+            image: 输入图像, 尺寸需与 image_size 一致
+            dst: 可选的输出缓冲区 (display_height, display_width[, channels])
+
+        Returns:
+            显示分辨率的去畸变图像
+        """
+        if (image.shape[1], image.shape[0]) != self.image_size:
+            raise ValueError(f"图像尺寸 {image.shape[1::-1]} 与预览器尺寸 {self.image_size} 不一致")
+
+        return cv2.remap(image, self.map1, self.map2, interpolation=cv2.INTER_LINEAR,
+                         borderMode=cv2.BORDER_CONSTANT, dst=dst)
+
+    def source_pixel(self, u, v) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        显示图像中的像素对应的原始图像像素 (直接查重映射表)
+
+        Args:
+            u, v: 显示图像中的像素坐标
+
+        Returns:
+            (u_src, v_src) 原始图像中的亚像素坐标
+        """
+        display_width, display_height = self.display_size
+        cols = np.clip(np.rint(u).astype(np.intp), 0, display_width - 1)
+        rows = np.clip(np.rint(v).astype(np.intp), 0, display_height - 1)
+
+        # CV_16SC2 定点表: map1 为整数坐标, map2 低5位/高5位为 x/y 的 1/32 小数部分
+        integer = self.map1[rows, cols].astype(np.float64)
+        fraction = self.map2[rows, cols].astype(np.int32)
+        tab_size = cv2.INTER_TAB_SIZE
+        u_src = integer[..., 0] + (fraction % tab_size) / tab_size
+        v_src = integer[..., 1] + (fraction // tab_size) / tab_size
+        return u_src, v_src
+
+    def resize(self, image: np.ndarray, dst: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        将原始图像缩放到显示分辨率 (用于与去畸变结果并排对比)
+
+        Args:
+            image: 输入图像
+            dst: 可选的输出缓冲区
+
+        Returns:
+            显示分辨率的原始图像
+        """
+        if self.display_size == self.image_size:
+            if dst is None:
+                return image
+            np.copyto(dst, image)
+            return dst
+        return cv2.resize(image, self.display_size, dst=dst, interpolation=cv2.INTER_AREA)
+
+    def side_by_side(self, image: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        生成 原始|去畸变 并排预览图
+
+        Args:
+            image: 输入图像
+            out: 可选的 (display_height, 2 * display_width[, channels]) 输出缓冲区,
+                 复用时每帧不分配新内存
+
+        Returns:
+            并排预览图
+        """
+        display_width, display_height = self.display_size
+        if out is None:
+            out = np.empty((display_height, 2 * display_width) + image.shape[2:], dtype=image.dtype)
+
+        # 左右两半是 out 的非连续视图, remap/resize 不能直接写入, 故经由固定缓冲区
+        half_shape = (display_height, display_width) + image.shape[2:]
+        if self._left is None or self._left.shape != half_shape or self._left.dtype != out.dtype:
+            self._left = np.empty(half_shape, dtype=out.dtype)
+            self._right = np.empty_like(self._left)
+
+        self.resize(image, dst=self._left)
+        self.undistort(image, dst=self._right)
+        out[:, :display_width] = self._left
+        out[:, display_width:] = self._right
+        return out
@@ -1,3 +1,18 @@
+from .base import CameraSource
 from .femto_bolt import FemtoBoltCamera
+from .playback import PlaybackCamera, RecordingWriter, load_recording_metadata
+from .recorder import ChunkedRecorder
+from .synthetic import SyntheticBoardCamera, render_checkerboard_texture
+from .factory import create_camera
+from .registration import DepthToColorRegistration
+from .frame_buffer import FrameRingBuffer, FrameRecord
+from .frame_pool import FramePool, PooledFrame
+from .multi_camera import MultiCameraCapture, FrameSet
+from .latency import LatencyHistogram
+from .streaming import FrameStream
 
-__all__ = ['FemtoBoltCamera']
+__all__ = ['CameraSource', 'FemtoBoltCamera', 'PlaybackCamera', 'RecordingWriter', 'ChunkedRecorder',
+           'load_recording_metadata', 'SyntheticBoardCamera', 'render_checkerboard_texture', 'create_camera',
+           'DepthToColorRegistration', 'FrameRingBuffer', 'FrameRecord',
+           'FramePool', 'PooledFrame', 'MultiCameraCapture', 'FrameSet', 'LatencyHistogram',
+           'FrameStream']
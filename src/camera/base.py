@@ -0,0 +1,330 @@
+"""
+相机数据源基类
+实现 FemtoBoltCamera、回放等数据源共用的后台采集、帧缓冲池和读取接口,
+子类只需实现 start/stop 和 _read_frames
+"""
+import threading
+import time
+from .frame_buffer import FrameRingBuffer, FrameRecord
+from .frame_pool import FramePool
+from .streaming import FrameStream
+
+
+class CameraSource:
+    """彩色/深度相机数据源基类"""
+
+    # 后台采集连续读取失败的退避时间（秒）和放弃前的最大连续失败次数
+    CAPTURE_RETRY_DELAY = 0.01
+    CAPTURE_MAX_RETRY_DELAY = 1.0
+    CAPTURE_MAX_ERRORS = 20
+
+    def __init__(self, width=640, height=480, fps=30, threaded=False, buffer_size=4,
+                 use_pool=False, pool_size=None):
+        """
+        Args:
+            width: 图像宽度
+            height: 图像高度
+            fps: 帧率
+            threaded: 是否在后台线程中采集（消费者处理慢时不阻塞采集）
+            buffer_size: 后台采集的环形缓冲区容量（帧）
+            use_pool: 是否使用预分配的帧缓冲池（稳定运行时不再逐帧分配图像内存）。
+                      get_frames 返回的图像在下一次调用 get_frames 时被回收复用，需要保留时请自行复制
+            pool_size: 缓冲池帧数，默认后台采集时为 buffer_size + 2，否则为 2
+        """
+        self.width = width
+        self.height = height
+        self.fps = fps
+
+        # 后台采集
+        self.threaded = threaded
+        self._pace_capture = False  # 数据源本身不阻塞时由采集线程按帧率节流
+        self._end_of_stream = False
+
+        # 帧缓冲池: 环形缓冲区中的帧 + 消费者持有的一帧 + 采集线程正在写入的一帧
+        self.frame_pool = None
+        self._held_buffer = None
+        if use_pool:
+            if pool_size is None:
+                pool_size = buffer_size + 2 if threaded else 2
+            self.frame_pool = FramePool((height, width, 3), (height, width), pool_size)
+
+        on_discard = self.release_frame if use_pool else None
+        self.frame_buffer = FrameRingBuffer(buffer_size, on_discard) if threaded else None
+        self._capture_thread = None
+        self._stop_event = threading.Event()
+        self._sequence = 0
+        self._capture_errors = 0
+        self.capture_failed = False  # 连续读取失败次数过多，后台采集已停止
+        self._capture_start = None
+        self._capture_stop = None
+
+        # 最近一次读取的设备时间戳（秒）和设备帧号，由子类在 _read_frames 中设置
+        self._device_timestamp = None
+        self._frame_number = None
+
+    def start(self):
+        """启动数据源，成功返回True"""
+        self._start_capture_thread()
+        return True
+
+    def stop(self):
+        """停止数据源"""
+        self._stop_capture_thread()
+        self._release_held()
+
+    def _start_capture_thread(self):
+        """启动后台采集线程（仅 threaded 模式）"""
+        if not self.threaded or self._capture_thread is not None:
+            return
+        self.frame_buffer.reopen()
+        self._stop_event.clear()
+        self._sequence = 0
+        self._capture_errors = 0
+        self.capture_failed = False
+        self._capture_start = time.perf_counter()
+        self._capture_stop = None
+        self._capture_thread = threading.Thread(target=self._capture_loop,
+                                                name=f'{type(self).__name__}Capture', daemon=True)
+        self._capture_thread.start()
+
+    def _stop_capture_thread(self):
+        """停止后台采集线程"""
+        if self._capture_thread is None:
+            return
+        self._stop_event.set()
+        self.frame_buffer.close()
+        self._capture_thread.join(timeout=2.0)
+        self._capture_thread = None
+        if self._capture_stop is None:
+            self._capture_stop = time.perf_counter()
+
+    def _capture_loop(self):
+        """
+        采集线程: 持续读取帧并写入环形缓冲区，数据流结束时关闭缓冲区。
+        读取失败（如设备断开）时指数退避重试，连续失败 CAPTURE_MAX_ERRORS 次后
+        置 capture_failed 并关闭缓冲区，消费者随之读到数据流结束
+        """
+        period = 1.0 / self.fps
+        next_time = time.perf_counter()
+        consecutive_errors = 0
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    record = self._read_record(copy=True)
+                except Exception as e:
+                    # 读取或写入缓冲池出错（如帧尺寸与缓冲池不一致、解码失败）按读取失败处理
+                    print(f"{type(self).__name__}: 读取帧出错: {e}")
+                    record = None
+                if record is None:
+                    if self._end_of_stream:
+                        break
+                    self._capture_errors += 1
+                    consecutive_errors += 1
+                    if consecutive_errors >= self.CAPTURE_MAX_ERRORS:
+                        self.capture_failed = True
+                        print(f"{type(self).__name__}: 连续 {consecutive_errors} 次读取失败，停止后台采集")
+                        break
+                    delay = min(self.CAPTURE_RETRY_DELAY * 2 ** (consecutive_errors - 1),
+                                self.CAPTURE_MAX_RETRY_DELAY)
+                    self._stop_event.wait(delay)
+                    next_time = time.perf_counter()
+                    continue
+                consecutive_errors = 0
+                self.frame_buffer.push(record)
+
+                if self._pace_capture:
+                    next_time += period
+                    self._stop_event.wait(max(0.0, next_time - time.perf_counter()))
+        finally:
+            # 任何情况下线程退出时都关闭缓冲区，消费者读到数据流结束而不是一直超时
+            self._capture_stop = time.perf_counter()
+            self.frame_buffer.close()
+
+    def get_frames(self, mode='latest', timeout=1.0):
+        """
+        获取RGB和深度图像
+
+        Args:
+            mode: 后台采集模式下的读取语义，'latest' 取最新帧（跳过积压），'next' 按顺序取下一帧
+            timeout: 后台采集模式下等待新帧的最长时间（秒），0 表示不等待
+
+        Returns:
+            tuple: (color_image, depth_image) 或 (None, None) 如果失败。
+            使用缓冲池时图像在下一次调用时被回收
+        """
+        if self.threaded:
+            frame = self.get_frame(mode, timeout)
+            if frame is None:
+                return None, None
+            if self.frame_pool is not None:
+                self._release_held()
+                self._held_buffer = frame.buffer
+            return frame.color, frame.depth
+
+        if self.frame_pool is not None:
+            self._release_held()
+            self._held_buffer = self._read_pooled()
+            if self._held_buffer is None:
+                return None, None
+            return self._held_buffer.color, self._held_buffer.depth
+        return self._read_frames()
+
+    def get_frame(self, mode='latest', timeout=1.0):
+        """
+        获取带时间戳的帧记录
+
+        Args:
+            mode: 后台采集模式下的读取语义，'latest' 或 'next'，见 get_frames
+            timeout: 后台采集模式下等待新帧的最长时间（秒），0 表示不等待
+
+        Returns:
+            FrameRecord，失败或超时返回None。非后台模式下同步读取一帧;
+            使用缓冲池时处理完毕后需调用 release_frame()
+        """
+        if not self.threaded:
+            return self._read_record()
+        return self.frame_buffer.get(mode, timeout)
+
+    def stream(self, maxsize=4, backpressure='drop_oldest'):
+        """
+        异步帧流，在 asyncio 中使用:
+
+            async with camera.stream() as frames:
+                async for frame in frames:
+                    ...
+
+        Args:
+            maxsize: 队列容量（帧）
+            backpressure: 队列满时 'drop_oldest' 丢弃最旧的帧，'block' 阻塞读取（不丢帧）
+
+        Returns:
+            FrameStream，逐个产生 FrameRecord。使用缓冲池时处理完毕后需调用 release_frame()
+        """
+        return FrameStream(self, maxsize, backpressure)
+
+    def release_frame(self, frame):
+        """
+        将 get_frame 取得的帧归还到缓冲池（未使用缓冲池时无效果）
+
+        Args:
+            frame: FrameRecord
+        """
+        if frame.buffer is not None:
+            frame.buffer.release()
+
+    def _release_held(self):
+        """归还 get_frames 上一次返回的缓冲区"""
+        if self._held_buffer is not None:
+            self._held_buffer.release()
+            self._held_buffer = None
+
+    def get_capture_stats(self):
+        """
+        获取后台采集统计
+
+        Returns:
+            dict: 采集/交付/丢弃/跳过帧数、队列深度、采集帧率、读取失败次数及是否因连续失败而停止，非后台模式返回None
+        """
+        if not self.threaded:
+            return None
+        stats = self.frame_buffer.get_stats()
+        elapsed = 0.0
+        if self._capture_start is not None:
+            elapsed = (self._capture_stop or time.perf_counter()) - self._capture_start
+        stats['capture_errors'] = self._capture_errors
+        stats['capture_failed'] = self.capture_failed
+        stats['capture_fps'] = stats['pushed'] / elapsed if elapsed > 0 else 0.0
+        if self.frame_pool is not None:
+            stats['pool'] = self.frame_pool.get_stats()
+        return stats
+
+    def _read_record(self, copy=False):
+        """
+        读取一组帧并记录主机收到的时间和设备时间戳
+
+        Args:
+            copy: 是否复制图像数据（帧需要跨线程交付时为True，使用缓冲池时图像已在池缓冲区中）
+
+        Returns:
+            FrameRecord 或 None 如果失败
+        """
+        if self.frame_pool is not None:
+            buffer = self._read_pooled()
+            if buffer is None:
+                return None
+            color_image, depth_image = buffer.color, buffer.depth
+        else:
+            buffer = None
+            color_image, depth_image = self._read_frames(copy=copy)
+            if color_image is None:
+                return None
+
+        record = FrameRecord(color_image, depth_image, time.perf_counter(), self._sequence, buffer,
+                             self._device_timestamp, self._frame_number)
+        self._sequence += 1
+        return record
+
+    def _read_pooled(self):
+        """
+        读取一组帧到缓冲池的缓冲区中
+
+        Returns:
+            PooledFrame 或 None 如果失败
+        """
+        color_image, depth_image = self._read_frames()
+        if color_image is None:
+            return None
+        return self.frame_pool.fill(color_image, depth_image)
+
+    def _read_frames(self, copy=False):
+        """
+        阻塞读取一组帧（子类实现）
+
+        Args:
+            copy: 是否复制图像数据（数据源的缓冲区会被回收，跨线程保存时需要复制）
+
+        Returns:
+            tuple: (color_image, depth_image) 或 (None, None) 如果失败;
+            数据流结束时同时置 self._end_of_stream = True。
+            数据源提供设备时间戳/帧号时同时设置 self._device_timestamp 和 self._frame_number
+        """
+        raise NotImplementedError
+
+    def get_intrinsics(self, stream='color'):
+        """
+        获取相机内参
+
+        Args:
+            stream: 'color' 或 'depth'
+
+        Returns:
+            dict: 包含内参矩阵和畸变系数，如果不可用返回None
+        """
+        return None
+
+    def get_extrinsics(self, from_stream='depth', to_stream='color'):
+        """
+        获取两个数据流之间的外参
+
+        Returns:
+            np.ndarray: 4x4 变换矩阵 (p_to = T @ p_from, 单位:米)，如果不可用返回None
+        """
+        return None
+
+    def get_depth_scale(self):
+        """
+        获取深度原始值到米的换算系数
+
+        Returns:
+            float: 深度比例，如果不可用返回None
+        """
+        return None
+
+    def __enter__(self):
+        """上下文管理器入口"""
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器出口"""
+        self.stop()
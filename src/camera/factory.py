@@ -0,0 +1,32 @@
+"""
+相机数据源工厂
+按参数创建真实相机、录制回放或合成棋盘格数据源, 脚本通过同一接口使用
+"""
+from .femto_bolt import FemtoBoltCamera
+from .playback import PlaybackCamera
+from .synthetic import SyntheticBoardCamera
+
+
+def create_camera(width=640, height=480, fps=30, playback=None, playback_speed=1.0,
+                  loop=False, synthetic=None, **kwargs):
+    """
+    创建相机数据源
+
+    Args:
+        width: 图像宽度（回放时由录制决定）
+        height: 图像高度（回放时由录制决定）
+        fps: 帧率（回放时由录制决定）
+        playback: 录制目录，指定时创建 PlaybackCamera
+        playback_speed: 回放速度倍率，0 表示尽可能快
+        loop: 回放结束后是否从头循环
+        synthetic: 内参标定结果字典，指定时创建以其为真值模型的 SyntheticBoardCamera
+        **kwargs: threaded、buffer_size、use_pool、pool_size 等通用参数
+
+    Returns:
+        FemtoBoltCamera、PlaybackCamera 或 SyntheticBoardCamera
+    """
+    if synthetic is not None:
+        return SyntheticBoardCamera.from_intrinsic_dict(synthetic, fps=fps, **kwargs)
+    if playback:
+        return PlaybackCamera(playback, speed=playback_speed, loop=loop, **kwargs)
+    return FemtoBoltCamera(width=width, height=height, fps=fps, **kwargs)
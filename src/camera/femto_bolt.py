@@ -4,6 +4,7 @@ Femto Bolt 相机接口类
 """
 import numpy as np
 import cv2
+from .base import CameraSource
 try:
     import pyrealsense2 as rs
     REALSENSE_AVAILABLE = True
@@ -12,10 +13,11 @@ except ImportError:
     print("Warning: pyrealsense2 not installed. Using mock camera for testing.")
 
 
-class FemtoBoltCamera:
+class FemtoBoltCamera(CameraSource):
     """Femto Bolt 深度相机接口"""
     
-    def __init__(self, width=640, height=480, fps=30):
+    def __init__(self, width=640, height=480, fps=30, threaded=False, buffer_size=4,
+                 use_pool=False, pool_size=None, serial=None):
         """
         初始化相机
         
@@ -23,10 +25,15 @@ class FemtoBoltCamera:
             width: 图像宽度
             height: 图像高度
             fps: 帧率
+            threaded: 是否在后台线程中采集（消费者处理慢时不阻塞采集）
+            buffer_size: 后台采集的环形缓冲区容量（帧）
+            use_pool: 是否使用预分配的帧缓冲池（稳定运行时不再逐帧分配图像内存）。
+                      get_frames 返回的图像在下一次调用 get_frames 时被回收复用，需要保留时请自行复制
+            pool_size: 缓冲池帧数，默认后台采集时为 buffer_size + 2，否则为 2
+            serial: 设备序列号，连接多台相机时用于选择设备，默认使用第一台
         """
-        self.width = width
-        self.height = height
-        self.fps = fps
+        super().__init__(width, height, fps, threaded, buffer_size, use_pool, pool_size)
+        self.serial = serial
         self.pipeline = None
         self.config = None
         
@@ -37,6 +44,8 @@ class FemtoBoltCamera:
         try:
             self.pipeline = rs.pipeline()
             self.config = rs.config()
+            if serial is not None:
+                self.config.enable_device(serial)
             
             # 配置RGB流
             self.config.enable_stream(rs.stream.color, width, height, rs.format.bgr8, fps)
@@ -44,7 +53,7 @@ class FemtoBoltCamera:
             # 配置深度流
             self.config.enable_stream(rs.stream.depth, width, height, rs.format.z16, fps)
             
-            print(f"Camera initialized: {width}x{height} @ {fps}fps")
+            print(f"Camera initialized: {width}x{height} @ {fps}fps" + (f" (serial {serial})" if serial else ""))
         except Exception as e:
             print(f"Failed to initialize camera: {e}")
             self.pipeline = None
@@ -53,25 +62,49 @@ class FemtoBoltCamera:
         """启动相机"""
         if self.pipeline is None:
             print("Camera not available")
+            # 模拟模式下仍启动后台采集（按帧率节流），便于无硬件测试
+            self._pace_capture = True
+            self._start_capture_thread()
             return False
         
         try:
             self.pipeline.start(self.config)
             print("Camera started")
-            return True
         except Exception as e:
             print(f"Failed to start camera: {e}")
             return False
+        
+        self._start_capture_thread()
+        return True
     
     def stop(self):
         """停止相机"""
+        super().stop()
         if self.pipeline is not None:
             self.pipeline.stop()
             print("Camera stopped")
     
-    def get_frames(self):
+    def _read_pooled(self):
+        """
+        读取一组帧到缓冲池的缓冲区中
+        
+        Returns:
+            PooledFrame 或 None 如果失败
+        """
+        if self.pipeline is None:
+            # 模拟图像直接在缓冲区中生成，不逐帧分配
+            buffer = self.frame_pool.acquire()
+            buffer.color.fill(0)
+            buffer.depth.fill(0)
+            return buffer
+        return super()._read_pooled()
+    
+    def _read_frames(self, copy=False):
         """
-        获取RGB和深度图像
+        阻塞读取一组帧
+        
+        Args:
+            copy: 是否复制图像数据（SDK帧缓冲区会被回收，跨线程保存时需要复制）
         
         Returns:
             tuple: (color_image, depth_image) 或 (None, None) 如果失败
@@ -93,9 +126,16 @@ class FemtoBoltCamera:
             if not color_frame or not depth_frame:
                 return None, None
             
+            # 设备时间戳（毫秒）和帧号，用于测量延迟和对齐外部数据
+            self._device_timestamp = frames.get_timestamp() / 1000.0
+            self._frame_number = frames.get_frame_number()
+            
             # 转换为numpy数组
             color_image = np.asanyarray(color_frame.get_data())
             depth_image = np.asanyarray(depth_frame.get_data())
+            if copy:
+                color_image = color_image.copy()
+                depth_image = depth_image.copy()
             
             return color_image, depth_image
         
@@ -103,10 +143,13 @@ class FemtoBoltCamera:
             print(f"Error getting frames: {e}")
             return None, None
     
-    def get_intrinsics(self):
+    def get_intrinsics(self, stream='color'):
         """
         获取相机内参（从硬件读取）
         
+        Args:
+            stream: 'color' 或 'depth'
+        
         Returns:
             dict: 包含内参矩阵和畸变系数，如果不可用返回None
         """
@@ -116,8 +159,9 @@ class FemtoBoltCamera:
         try:
             # 获取profile
             profile = self.pipeline.get_active_profile()
-            color_profile = rs.video_stream_profile(profile.get_stream(rs.stream.color))
-            intrinsics = color_profile.get_intrinsics()
+            rs_stream = rs.stream.depth if stream == 'depth' else rs.stream.color
+            stream_profile = rs.video_stream_profile(profile.get_stream(rs_stream))
+            intrinsics = stream_profile.get_intrinsics()
             
             # 构建内参矩阵
             camera_matrix = np.array([
@@ -139,11 +183,49 @@ class FemtoBoltCamera:
             print(f"Error getting intrinsics: {e}")
             return None
     
-    def __enter__(self):
-        """上下文管理器入口"""
-        self.start()
-        return self
+    def get_extrinsics(self, from_stream='depth', to_stream='color'):
+        """
+        获取两个数据流之间的外参（从硬件读取）
+        
+        Args:
+            from_stream: 源数据流 'depth' 或 'color'
+            to_stream: 目标数据流 'depth' 或 'color'
+        
+        Returns:
+            np.ndarray: 4x4 变换矩阵 (p_to = T @ p_from, 单位:米)，如果不可用返回None
+        """
+        if self.pipeline is None:
+            return None
+        
+        try:
+            profile = self.pipeline.get_active_profile()
+            streams = {'depth': rs.stream.depth, 'color': rs.stream.color}
+            source = profile.get_stream(streams[from_stream])
+            target = profile.get_stream(streams[to_stream])
+            extrinsics = source.get_extrinsics_to(target)
+            
+            # rotation 为列主序的 3x3 矩阵
+            transform = np.eye(4)
+            transform[:3, :3] = np.array(extrinsics.rotation).reshape(3, 3).T
+            transform[:3, 3] = extrinsics.translation
+            return transform
+        except Exception as e:
+            print(f"Error getting extrinsics: {e}")
+            return None
     
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        """上下文管理器出口"""
-        self.stop()
+    def get_depth_scale(self):
+        """
+        获取深度原始值到米的换算系数
+        
+        Returns:
+            float: 深度比例，如果不可用返回None
+        """
+        if self.pipeline is None:
+            return None
+        
+        try:
+            profile = self.pipeline.get_active_profile()
+            return profile.get_device().first_depth_sensor().get_depth_scale()
+        except Exception as e:
+            print(f"Error getting depth scale: {e}")
+            return None
@@ -0,0 +1,183 @@
+"""
+带时间戳的帧记录和环形缓冲区
+采集线程写入、处理线程读取; 缓冲区满时丢弃最旧的帧, 读取支持
+'latest'（取最新帧并跳过积压）和 'next'（按顺序取下一帧）两种语义
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+
+class FrameRecord:
+    """
+    一组同时采集的彩色/深度帧及其时间信息
+
+    使用 __slots__，逐帧创建的开销与元组相当。处理流水线可用 mark() 记录各阶段完成的时间,
+    再由 LatencyHistogram 统计从主机收到帧到各阶段的延迟
+    """
+
+    __slots__ = ('color', 'depth', 'timestamp', 'sequence', 'buffer',
+                 'device_timestamp', 'frame_number', 'stages')
+
+    def __init__(self, color: np.ndarray, depth: np.ndarray, timestamp: float, sequence: int,
+                 buffer: Any = None, device_timestamp: Optional[float] = None,
+                 frame_number: Optional[int] = None):
+        """
+        Args:
+            color: 彩色图像
+            depth: 深度图像
+            timestamp: 主机收到帧时的 time.perf_counter()
+            sequence: 采集序号，从0开始连续递增
+            buffer: 图像所在的 PooledFrame（使用缓冲池时），用完后需 release()
+            device_timestamp: 设备时间戳（秒，设备时钟），数据源不提供时为None
+            frame_number: 设备帧号（可用于发现设备端丢帧），数据源不提供时为None
+        """
+        self.color = color
+        self.depth = depth
+        self.timestamp = timestamp
+        self.sequence = sequence
+        self.buffer = buffer
+        self.device_timestamp = device_timestamp
+        self.frame_number = frame_number
+        self.stages = None  # [(阶段名, time.perf_counter()), ...]，首次 mark() 时创建
+
+    def mark(self, stage: str, timestamp: Optional[float] = None):
+        """
+        记录一个处理阶段完成的时间
+
+        Args:
+            stage: 阶段名，如 'detect'、'display'
+            timestamp: 完成时间，默认为当前 time.perf_counter()
+        """
+        if self.stages is None:
+            self.stages = []
+        self.stages.append((stage, time.perf_counter() if timestamp is None else timestamp))
+
+    def latencies(self) -> dict:
+        """
+        各阶段相对主机收到帧的延迟
+
+        Returns:
+            dict: 阶段名 -> 延迟（秒）
+        """
+        if self.stages is None:
+            return {}
+        return {stage: timestamp - self.timestamp for stage, timestamp in self.stages}
+
+    def __repr__(self) -> str:
+        return (f"FrameRecord(sequence={self.sequence}, frame_number={self.frame_number}, "
+                f"timestamp={self.timestamp:.6f}, device_timestamp={self.device_timestamp})")
+
+
+class FrameRingBuffer:
+    """有界帧缓冲区（线程安全）"""
+
+    def __init__(self, capacity: int = 4,
+                 on_discard: Optional[Callable[[FrameRecord], None]] = None):
+        """
+        Args:
+            capacity: 缓冲区容量（帧）
+            on_discard: 帧被丢弃或跳过（未交付给消费者）时的回调，用于归还缓冲区
+        """
+        if capacity < 1:
+            raise ValueError("缓冲区容量至少为1")
+        self.capacity = capacity
+        self._frames = deque(maxlen=capacity)
+        self._condition = threading.Condition()
+        self._closed = False
+        self._on_discard = on_discard
+
+        # 统计
+        self.pushed = 0       # 写入总帧数
+        self.delivered = 0    # 交付给消费者的帧数
+        self.dropped = 0      # 缓冲区满被覆盖、从未被读取的帧数
+        self.skipped = 0      # 'latest' 读取时被跳过的积压帧数
+        self.max_depth = 0    # 观察到的最大积压深度
+
+    def push(self, frame: FrameRecord):
+        """写入一帧，缓冲区满时丢弃最旧的帧"""
+        with self._condition:
+            if len(self._frames) == self.capacity:
+                self.dropped += 1
+                self._discard(self._frames.popleft())
+            self._frames.append(frame)
+            self.pushed += 1
+            self.max_depth = max(self.max_depth, len(self._frames))
+            self._condition.notify_all()
+
+    def get(self, mode: str = 'latest', timeout: Optional[float] = None) -> Optional[FrameRecord]:
+        """
+        读取一帧
+
+        Args:
+            mode: 'latest' 返回最新帧并丢弃积压; 'next' 按采集顺序返回最旧的未读帧
+            timeout: 没有未读帧时的等待时间（秒），0 表示不等待，None 表示一直等待
+
+        Returns:
+            帧，超时或缓冲区已关闭时返回None
+        """
+        if mode not in ('latest', 'next'):
+            raise ValueError(f"未知的读取模式: {mode}")
+
+        with self._condition:
+            if not self._frames and not self._closed and timeout != 0:
+                self._condition.wait_for(lambda: self._frames or self._closed, timeout)
+            if not self._frames:
+                return None
+
+            if mode == 'latest':
+                frame = self._frames.pop()
+                self.skipped += len(self._frames)
+                while self._frames:
+                    self._discard(self._frames.popleft())
+            else:
+                frame = self._frames.popleft()
+            self.delivered += 1
+            return frame
+
+    def _discard(self, frame: FrameRecord):
+        if self._on_discard is not None:
+            self._on_discard(frame)
+
+    def close(self):
+        """关闭缓冲区，唤醒所有等待的读取者"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def reopen(self):
+        """清空并重新开放缓冲区，统计归零"""
+        with self._condition:
+            while self._frames:
+                self._discard(self._frames.popleft())
+            self._closed = False
+            self.pushed = self.delivered = self.dropped = self.skipped = self.max_depth = 0
+
+    @property
+    def closed(self) -> bool:
+        """缓冲区是否已关闭（关闭后仍可读出剩余的帧）"""
+        return self._closed
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def get_stats(self) -> dict:
+        """
+        获取缓冲区统计
+
+        Returns:
+            写入/交付/丢弃/跳过帧数和当前、最大积压深度
+        """
+        with self._condition:
+            return {
+                'pushed': self.pushed,
+                'delivered': self.delivered,
+                'dropped': self.dropped,
+                'skipped': self.skipped,
+                'queue_depth': len(self._frames),
+                'max_queue_depth': self.max_depth,
+                'capacity': self.capacity
+            }
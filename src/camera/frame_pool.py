@@ -0,0 +1,137 @@
+"""
+相机帧缓冲池
+预分配并循环使用彩色/深度图像缓冲区, 采集时只做一次内存拷贝, 稳定运行时不再分配帧内存。
+帧的生命周期显式管理: acquire() 取出, release() 归还; 池耗尽时按需扩容并计数
+"""
+import threading
+from typing import List, Tuple
+
+import numpy as np
+
+
+class PooledFrame:
+    """从缓冲池取出的一组帧缓冲区，使用完毕后需调用 release()"""
+
+    __slots__ = ('color', 'depth', '_pool', '_in_use')
+
+    def __init__(self, color: np.ndarray, depth: np.ndarray, pool: 'FramePool'):
+        self.color = color
+        self.depth = depth
+        self._pool = pool
+        self._in_use = False
+
+    def release(self):
+        """归还到缓冲池（重复调用无效果）"""
+        if self._in_use:
+            self._pool._release(self)
+
+    def __enter__(self) -> 'PooledFrame':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+
+class FramePool:
+    """固定尺寸的帧缓冲池（线程安全）"""
+
+    def __init__(self,
+                 color_shape: Tuple[int, ...],
+                 depth_shape: Tuple[int, ...],
+                 capacity: int = 8,
+                 color_dtype=np.uint8,
+                 depth_dtype=np.uint16):
+        """
+        Args:
+            color_shape: 彩色图像形状，如 (480, 640, 3)
+            depth_shape: 深度图像形状，如 (480, 640)
+            capacity: 预分配的帧数
+            color_dtype: 彩色图像数据类型
+            depth_dtype: 深度图像数据类型
+        """
+        if capacity < 1:
+            raise ValueError("缓冲池容量至少为1")
+        self.color_shape = tuple(color_shape)
+        self.depth_shape = tuple(depth_shape)
+        self.color_dtype = np.dtype(color_dtype)
+        self.depth_dtype = np.dtype(depth_dtype)
+
+        self._lock = threading.Lock()
+        self._free: List[PooledFrame] = []
+        self.allocated = 0   # 已分配的帧数（含扩容）
+        self.acquired = 0    # 累计取出次数
+        self.grown = 0       # 池耗尽时扩容的次数
+        for _ in range(capacity):
+            self._free.append(self._allocate())
+
+    def _allocate(self) -> PooledFrame:
+        """分配一帧新的缓冲区"""
+        self.allocated += 1
+        return PooledFrame(np.zeros(self.color_shape, dtype=self.color_dtype),
+                           np.zeros(self.depth_shape, dtype=self.depth_dtype),
+                           self)
+
+    def acquire(self) -> PooledFrame:
+        """
+        取出一帧缓冲区（内容为上一次使用时的数据）
+
+        Returns:
+            PooledFrame；池已耗尽时分配新帧并计入 grown
+        """
+        with self._lock:
+            if self._free:
+                frame = self._free.pop()
+            else:
+                frame = self._allocate()
+                self.grown += 1
+            frame._in_use = True
+            self.acquired += 1
+            return frame
+
+    def _release(self, frame: PooledFrame):
+        with self._lock:
+            if frame._in_use:
+                frame._in_use = False
+                self._free.append(frame)
+
+    def fill(self, color: np.ndarray, depth: np.ndarray) -> PooledFrame:
+        """
+        取出一帧并拷贝图像数据
+
+        Args:
+            color: 彩色图像（形状需与缓冲池一致）
+            depth: 深度图像
+
+        Returns:
+            PooledFrame
+        """
+        frame = self.acquire()
+        try:
+            np.copyto(frame.color, color)
+            np.copyto(frame.depth, depth)
+        except Exception:
+            # 形状不一致等错误时归还缓冲区，避免缓冲池泄漏
+            frame.release()
+            raise
+        return frame
+
+    @property
+    def free(self) -> int:
+        """空闲帧数"""
+        return len(self._free)
+
+    def get_stats(self) -> dict:
+        """
+        获取缓冲池统计
+
+        Returns:
+            已分配、空闲、使用中帧数及累计取出、扩容次数
+        """
+        with self._lock:
+            return {
+                'allocated': self.allocated,
+                'free': len(self._free),
+                'in_use': self.allocated - len(self._free),
+                'acquired': self.acquired,
+                'grown': self.grown
+            }
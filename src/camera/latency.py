@@ -0,0 +1,144 @@
+"""
+帧延迟直方图
+按处理阶段统计从主机收到帧（FrameRecord.timestamp）到各阶段完成（FrameRecord.mark）的延迟。
+延迟按对数间隔分桶计数, 记录一个样本只需一次二分查找, 不保存原始样本, 可长时间运行
+"""
+import bisect
+import math
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+from .frame_buffer import FrameRecord
+
+
+class LatencyHistogram:
+    """按阶段统计的对数分桶延迟直方图，可按固定间隔在终端输出报告"""
+
+    def __init__(self, report_interval: Optional[float] = None, min_latency: float = 1e-4,
+                 max_latency: float = 10.0, bins_per_decade: int = 20):
+        """
+        Args:
+            report_interval: maybe_report() 输出报告的间隔（秒），None 表示不自动输出
+            min_latency: 最小分桶边界（秒），更小的样本计入第一个桶
+            max_latency: 最大分桶边界（秒），更大的样本计入溢出桶
+            bins_per_decade: 每十倍区间的桶数，20 时相对分辨率约 12%
+        """
+        decades = math.log10(max_latency / min_latency)
+        num_edges = int(round(decades * bins_per_decade)) + 1
+        self._edges = np.geomspace(min_latency, max_latency, num_edges)
+        self._edge_list = self._edges.tolist()
+        # 每个桶代表的延迟取两侧边界的几何中点，首尾桶取边界值
+        centers = np.sqrt(self._edges[1:] * self._edges[:-1])
+        self._centers = np.concatenate([[min_latency], centers, [max_latency]])
+
+        self.report_interval = report_interval
+        self._histograms: Dict[str, list] = {}
+        self._sums: Dict[str, float] = {}
+        self._maxima: Dict[str, float] = {}
+        self._last_report = time.perf_counter()
+
+    def add(self, record: FrameRecord):
+        """
+        记录一帧各阶段的延迟
+
+        Args:
+            record: 已用 mark() 标记过处理阶段的帧记录
+        """
+        if record.stages is None:
+            return
+        for stage, timestamp in record.stages:
+            self.add_sample(stage, timestamp - record.timestamp)
+
+    def add_sample(self, stage: str, latency: float):
+        """
+        记录一个延迟样本
+
+        Args:
+            stage: 阶段名
+            latency: 延迟（秒）
+        """
+        counts = self._histograms.get(stage)
+        if counts is None:
+            counts = self._histograms[stage] = [0] * (len(self._edge_list) + 1)
+            self._sums[stage] = 0.0
+            self._maxima[stage] = 0.0
+        counts[bisect.bisect_right(self._edge_list, latency)] += 1
+        self._sums[stage] += latency
+        if latency > self._maxima[stage]:
+            self._maxima[stage] = latency
+
+    def percentile(self, stage: str, q: float) -> float:
+        """
+        估计某阶段延迟的分位数
+
+        Args:
+            stage: 阶段名
+            q: 分位数 (0-100)
+
+        Returns:
+            延迟（秒），精度为桶宽；没有样本返回 nan
+        """
+        counts = np.asarray(self._histograms.get(stage, ()))
+        total = counts.sum()
+        if total == 0:
+            return float('nan')
+        index = int(np.searchsorted(np.cumsum(counts), q / 100.0 * total))
+        return float(min(self._centers[index], self._maxima[stage]))
+
+    def summary(self) -> dict:
+        """
+        各阶段延迟统计
+
+        Returns:
+            dict: 阶段名 -> {count, mean_ms, p50_ms, p95_ms, p99_ms, max_ms}
+        """
+        result = {}
+        for stage, counts in self._histograms.items():
+            count = sum(counts)
+            result[stage] = {
+                'count': count,
+                'mean_ms': self._sums[stage] / count * 1000,
+                'p50_ms': self.percentile(stage, 50) * 1000,
+                'p95_ms': self.percentile(stage, 95) * 1000,
+                'p99_ms': self.percentile(stage, 99) * 1000,
+                'max_ms': self._maxima[stage] * 1000,
+            }
+        return result
+
+    def format_report(self) -> str:
+        """
+        格式化的延迟报告（每阶段一行）
+
+        Returns:
+            报告文本
+        """
+        lines = [f"{'阶段':<12}{'帧数':>8}{'平均ms':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'最大':>9}"]
+        for stage, stats in self.summary().items():
+            lines.append(f"{stage:<12}{stats['count']:>8}{stats['mean_ms']:>9.2f}{stats['p50_ms']:>9.2f}"
+                         f"{stats['p95_ms']:>9.2f}{stats['p99_ms']:>9.2f}{stats['max_ms']:>9.2f}")
+        return "\n".join(lines)
+
+    def maybe_report(self) -> bool:
+        """
+        距上次输出超过 report_interval 时在终端输出报告
+
+        Returns:
+            是否输出了报告
+        """
+        if self.report_interval is None or not self._histograms:
+            return False
+        now = time.perf_counter()
+        if now - self._last_report < self.report_interval:
+            return False
+        self._last_report = now
+        print(f"\n帧延迟（相对主机收到帧）:\n{self.format_report()}")
+        return True
+
+    def reset(self):
+        """清空统计"""
+        self._histograms.clear()
+        self._sums.clear()
+        self._maxima.clear()
+        self._last_report = time.perf_counter()
@@ -0,0 +1,219 @@
+"""
+多相机同步采集
+每台相机在自己的后台线程中采集, 同步线程按时间戳把各相机的帧配对成帧组:
+各相机最早的未配对帧时间差在容差内时组成一组, 否则丢弃落后的帧继续等待。
+帧组通过一个环形缓冲区交付给消费者, 并统计每台相机的配对、丢弃和延迟
+"""
+import threading
+import time
+from typing import Dict, NamedTuple, Optional
+
+from .base import CameraSource
+from .frame_buffer import FrameRingBuffer, FrameRecord
+
+
+class FrameSet(NamedTuple):
+    """一组时间同步的多相机帧"""
+    frames: Dict[str, FrameRecord]  # 相机名 -> 帧
+    timestamp: float  # 组内最晚一帧的采集时间 time.perf_counter()
+    spread: float     # 组内最早与最晚帧的时间差（秒）
+    sequence: int     # 帧组序号，从0开始连续递增
+
+
+class _DeviceStats:
+    """单台相机的同步统计"""
+
+    __slots__ = ('matched', 'unmatched', 'latency_sum', 'latency_max', 'offset_sum', 'offset_max')
+
+    def __init__(self):
+        self.matched = 0        # 进入帧组的帧数
+        self.unmatched = 0      # 找不到其他相机对应帧而被丢弃的帧数
+        self.latency_sum = 0.0  # 采集到组成帧组的延迟累计（秒）
+        self.latency_max = 0.0
+        self.offset_sum = 0.0   # 相对帧组时间戳的偏差累计（秒）
+        self.offset_max = 0.0
+
+
+class MultiCameraCapture:
+    """多相机同步采集管理器"""
+
+    def __init__(self, cameras: Dict[str, CameraSource], tolerance: float = 0.010,
+                 buffer_size: int = 4):
+        """
+        Args:
+            cameras: 相机名 -> 数据源，数据源必须以 threaded=True 创建
+            tolerance: 同一帧组内各相机帧的最大时间差（秒）
+            buffer_size: 帧组环形缓冲区容量，消费者处理慢时丢弃最旧的帧组
+        """
+        if len(cameras) < 1:
+            raise ValueError("至少需要一台相机")
+        for name, camera in cameras.items():
+            if not camera.threaded:
+                raise ValueError(f"相机 {name} 必须以 threaded=True 创建")
+        self.cameras = dict(cameras)
+        self.tolerance = tolerance
+        self.frame_sets = FrameRingBuffer(buffer_size, on_discard=self.release_frame_set)
+
+        self._pending: Dict[str, FrameRecord] = {}
+        self._stats = {name: _DeviceStats() for name in self.cameras}
+        self._sync_thread = None
+        self._stop_event = threading.Event()
+        self._sequence = 0
+        self._start_time = None
+        self._stop_time = None
+
+    def start(self):
+        """
+        启动所有相机和同步线程
+
+        Returns:
+            所有相机都启动成功返回True（模拟模式的相机返回False但仍产生帧）
+        """
+        if self._sync_thread is not None:
+            return True
+        ok = all([camera.start() for camera in self.cameras.values()])
+        self.frame_sets.reopen()
+        self._stop_event.clear()
+        self._pending.clear()
+        self._stats = {name: _DeviceStats() for name in self.cameras}
+        self._sequence = 0
+        self._start_time = time.perf_counter()
+        self._stop_time = None
+        self._sync_thread = threading.Thread(target=self._sync_loop, name='MultiCameraSync', daemon=True)
+        self._sync_thread.start()
+        return ok
+
+    def stop(self):
+        """停止同步线程和所有相机"""
+        if self._sync_thread is not None:
+            self._stop_event.set()
+            self.frame_sets.close()
+            self._sync_thread.join(timeout=2.0)
+            self._sync_thread = None
+        for camera in self.cameras.values():
+            camera.stop()
+        for name, frame in self._pending.items():
+            self.cameras[name].release_frame(frame)
+        self._pending.clear()
+        if self._stop_time is None:
+            self._stop_time = time.perf_counter()
+
+    def _sync_loop(self):
+        """同步线程: 从各相机缓冲区按顺序取帧并配对"""
+        poll = min(0.05, max(self.tolerance, 0.001))
+        while not self._stop_event.is_set():
+            # 每台相机保持一帧待配对
+            waiting = False
+            for name, camera in self.cameras.items():
+                if name in self._pending:
+                    continue
+                frame = camera.frame_buffer.get('next', timeout=poll)
+                if frame is not None:
+                    self._pending[name] = frame
+                elif camera.frame_buffer.closed and len(camera.frame_buffer) == 0:
+                    # 有相机数据流结束，无法再组成完整的帧组
+                    self._stop_time = time.perf_counter()
+                    self.frame_sets.close()
+                    return
+                else:
+                    waiting = True
+            if waiting:
+                continue
+
+            # 以最晚的帧为基准，丢弃比它早超过容差的帧，由下一轮补取
+            latest = max(frame.timestamp for frame in self._pending.values())
+            stale = [name for name, frame in self._pending.items()
+                     if latest - frame.timestamp > self.tolerance]
+            if stale:
+                for name in stale:
+                    self._stats[name].unmatched += 1
+                    self.cameras[name].release_frame(self._pending.pop(name))
+                continue
+
+            self._emit(latest)
+
+        self._stop_time = time.perf_counter()
+        self.frame_sets.close()
+
+    def _emit(self, latest):
+        """把待配对的帧组成帧组写入缓冲区"""
+        now = time.perf_counter()
+        earliest = latest
+        for name, frame in self._pending.items():
+            stats = self._stats[name]
+            latency = now - frame.timestamp
+            offset = latest - frame.timestamp
+            stats.matched += 1
+            stats.latency_sum += latency
+            stats.latency_max = max(stats.latency_max, latency)
+            stats.offset_sum += offset
+            stats.offset_max = max(stats.offset_max, offset)
+            earliest = min(earliest, frame.timestamp)
+
+        self.frame_sets.push(FrameSet(self._pending, latest, latest - earliest, self._sequence))
+        self._pending = {}
+        self._sequence += 1
+
+    def get_frame_set(self, mode='next', timeout=1.0) -> Optional[FrameSet]:
+        """
+        获取一个同步帧组
+
+        Args:
+            mode: 'next' 按顺序取下一组，'latest' 取最新一组（跳过积压）
+            timeout: 等待新帧组的最长时间（秒），0 表示不等待
+
+        Returns:
+            FrameSet，超时或采集已结束返回None。使用缓冲池的相机需在处理完毕后调用 release_frame_set()
+        """
+        return self.frame_sets.get(mode, timeout)
+
+    def release_frame_set(self, frame_set: FrameSet):
+        """
+        将帧组中各帧归还到对应相机的缓冲池（未使用缓冲池时无效果）
+
+        Args:
+            frame_set: FrameSet
+        """
+        for name, frame in frame_set.frames.items():
+            self.cameras[name].release_frame(frame)
+
+    def get_stats(self) -> dict:
+        """
+        获取同步采集统计
+
+        Returns:
+            dict: 帧组缓冲区统计、帧组速率，以及 'devices' 下每台相机的
+            采集帧率、相机缓冲区丢弃数、配对/未配对帧数、平均/最大延迟和时间偏差（毫秒）
+        """
+        stats = self.frame_sets.get_stats()
+        elapsed = 0.0
+        if self._start_time is not None:
+            elapsed = (self._stop_time or time.perf_counter()) - self._start_time
+        stats['set_fps'] = stats['pushed'] / elapsed if elapsed > 0 else 0.0
+
+        devices = {}
+        for name, camera in self.cameras.items():
+            device = self._stats[name]
+            capture = camera.get_capture_stats()
+            count = max(device.matched, 1)
+            devices[name] = {
+                'captured': capture['pushed'],
+                'capture_fps': capture['capture_fps'],
+                'buffer_dropped': capture['dropped'],
+                'capture_errors': capture['capture_errors'],
+                'matched': device.matched,
+                'unmatched': device.unmatched,
+                'mean_latency_ms': device.latency_sum / count * 1000,
+                'max_latency_ms': device.latency_max * 1000,
+                'mean_offset_ms': device.offset_sum / count * 1000,
+                'max_offset_ms': device.offset_max * 1000,
+            }
+        stats['devices'] = devices
+        return stats
+
+    def __enter__(self) -> 'MultiCameraCapture':
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
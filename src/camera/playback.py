@@ -0,0 +1,363 @@
+"""
+录制数据回放
+录制目录包含记录帧数、帧率和相机内外参的 metadata.yaml, 以及以下两种格式之一:
+- npy（RecordingWriter）: color.npy (N, H, W, 3) uint8、depth.npy (N, H, W) uint16、timestamps.npy (N,) 秒,
+  以内存映射方式读取, 只有被访问的帧才从磁盘读入
+- chunked（ChunkedRecorder）: 只追加写入的数据块文件 chunk_XXXXX.bin（每帧为无损压缩的彩色 PNG 和原始深度）
+  和定长记录的索引 index.bin, 读取时按索引解码
+可按录制节奏或尽可能快地回放
+"""
+import os
+import time
+import cv2
+import yaml
+import numpy as np
+from typing import Optional, Tuple
+
+from .base import CameraSource
+from ..utils.file_utils import convert_numpy_to_list
+
+METADATA_FILE = 'metadata.yaml'
+INDEX_FILE = 'index.bin'
+
+# chunked 格式的索引记录: 帧在数据块文件中的位置（彩色 PNG 之后紧接原始深度）和时间信息
+INDEX_DTYPE = np.dtype([
+    ('sequence', '<i8'),          # 写入序号
+    ('chunk', '<i4'),             # 数据块文件编号
+    ('offset', '<i8'),            # 帧在数据块文件中的起始位置
+    ('color_size', '<i4'),        # 彩色 PNG 字节数
+    ('depth_size', '<i4'),        # 深度字节数
+    ('timestamp', '<f8'),         # 主机时间戳（秒）
+    ('device_timestamp', '<f8'),  # 设备时间戳（秒），没有时为 nan
+    ('frame_number', '<i8'),      # 设备帧号，没有时为 -1
+])
+
+
+def chunk_filename(path: str, chunk: int) -> str:
+    """chunked 格式的数据块文件路径"""
+    return os.path.join(path, f'chunk_{chunk:05d}.bin')
+
+
+def load_recording_metadata(path: str) -> dict:
+    """
+    读取录制目录的元数据
+
+    Args:
+        path: 录制目录
+
+    Returns:
+        元数据字典
+    """
+    filename = os.path.join(path, METADATA_FILE)
+    if not os.path.exists(filename):
+        raise FileNotFoundError(f"不是有效的录制目录（缺少 {METADATA_FILE}）: {path}")
+    with open(filename, 'r') as f:
+        return yaml.safe_load(f)
+
+
+def write_recording_metadata(path: str, metadata: dict):
+    """
+    写入录制目录的元数据
+
+    Args:
+        path: 录制目录
+        metadata: 元数据字典
+    """
+    with open(os.path.join(path, METADATA_FILE), 'w') as f:
+        yaml.dump(convert_numpy_to_list(metadata), f, default_flow_style=False)
+
+
+def camera_metadata(camera: CameraSource) -> dict:
+    """
+    读取相机的内外参和深度比例，用于写入录制元数据
+
+    Args:
+        camera: 相机数据源
+
+    Returns:
+        元数据字典
+    """
+    return {
+        'color_intrinsics': camera.get_intrinsics('color'),
+        'depth_intrinsics': camera.get_intrinsics('depth'),
+        'depth_to_color': camera.get_extrinsics('depth', 'color'),
+        'depth_scale': camera.get_depth_scale()
+    }
+
+
+class RecordingWriter:
+    """将彩色/深度帧序列写入录制目录（预分配内存映射文件，逐帧只做一次拷贝）"""
+
+    def __init__(self, path: str, max_frames: int, width: int, height: int, fps: int = 30,
+                 camera: Optional[CameraSource] = None):
+        """
+        Args:
+            path: 输出目录
+            max_frames: 最大帧数（文件按此预分配，实际帧数记录在元数据中）
+            width: 图像宽度
+            height: 图像高度
+            fps: 录制帧率
+            camera: 可选的相机，用于把内外参和深度比例写入元数据
+        """
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.max_frames = max_frames
+        self.num_frames = 0
+        self._metadata = {'version': 1, 'width': width, 'height': height, 'fps': fps}
+        if camera is not None:
+            self._metadata.update(camera_metadata(camera))
+
+        open_memmap = np.lib.format.open_memmap
+        self._color = open_memmap(os.path.join(path, 'color.npy'), mode='w+', dtype=np.uint8,
+                                  shape=(max_frames, height, width, 3))
+        self._depth = open_memmap(os.path.join(path, 'depth.npy'), mode='w+', dtype=np.uint16,
+                                  shape=(max_frames, height, width))
+        self._timestamps = open_memmap(os.path.join(path, 'timestamps.npy'), mode='w+',
+                                       dtype=np.float64, shape=(max_frames,))
+
+    def write(self, color_image: np.ndarray, depth_image: np.ndarray,
+              timestamp: Optional[float] = None) -> bool:
+        """
+        写入一帧
+
+        Args:
+            color_image: 彩色图像
+            depth_image: 深度图像
+            timestamp: 采集时间（秒），默认为当前 time.perf_counter()
+
+        Returns:
+            是否写入（达到 max_frames 后返回False）
+        """
+        if self.num_frames >= self.max_frames:
+            return False
+        index = self.num_frames
+        self._color[index] = color_image
+        self._depth[index] = depth_image
+        self._timestamps[index] = time.perf_counter() if timestamp is None else timestamp
+        self.num_frames += 1
+        return True
+
+    def close(self):
+        """刷新数据并写入元数据"""
+        if self._color is None:
+            return
+        for array in (self._color, self._depth, self._timestamps):
+            array.flush()
+        self._color = self._depth = self._timestamps = None
+
+        self._metadata['num_frames'] = self.num_frames
+        write_recording_metadata(self.path, self._metadata)
+
+    def __enter__(self) -> 'RecordingWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class ChunkedRecordingReader:
+    """读取 chunked 格式录制（ChunkedRecorder 写入）的帧"""
+
+    def __init__(self, path: str, metadata: dict):
+        """
+        Args:
+            path: 录制目录
+            metadata: 录制元数据
+        """
+        self.path = path
+        self.width = metadata['width']
+        self.height = metadata['height']
+
+        # 写入线程并行写入，索引记录按完成顺序追加；录制中断时末尾可能有不完整的记录
+        with open(os.path.join(path, INDEX_FILE), 'rb') as f:
+            data = f.read()
+        usable = len(data) - len(data) % INDEX_DTYPE.itemsize
+        index = np.frombuffer(data[:usable], dtype=INDEX_DTYPE)
+        self.index = np.sort(index, order='sequence')
+        self.timestamps = self.index['timestamp'].copy()
+        self._files = {}
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def read(self, frame: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        读取并解码一帧
+
+        Args:
+            frame: 帧序号（按写入顺序）
+
+        Returns:
+            tuple: (color_image, depth_image)
+
+        Raises:
+            ValueError: 数据块文件被截断或彩色图像无法解码
+        """
+        entry = self.index[frame]
+        chunk = int(entry['chunk'])
+        file = self._files.get(chunk)
+        if file is None:
+            file = self._files[chunk] = open(chunk_filename(self.path, chunk), 'rb')
+        color_size, depth_size = int(entry['color_size']), int(entry['depth_size'])
+        # 读入可写缓冲区，返回的深度图可直接原地修改
+        data = bytearray(color_size + depth_size)
+        file.seek(int(entry['offset']))
+        if file.readinto(data) != len(data):
+            raise ValueError(f"数据块文件不完整: {chunk_filename(self.path, chunk)} (帧 {frame})")
+
+        color_image = cv2.imdecode(np.frombuffer(data, np.uint8, color_size), cv2.IMREAD_COLOR)
+        if color_image is None:
+            raise ValueError(f"无法解码彩色图像: {chunk_filename(self.path, chunk)} (帧 {frame})")
+        depth_image = np.frombuffer(data, np.uint16, depth_size // 2, color_size)
+        return color_image, depth_image.reshape(self.height, self.width)
+
+    def close(self):
+        """关闭数据块文件"""
+        for file in self._files.values():
+            file.close()
+        self._files.clear()
+
+
+class PlaybackCamera(CameraSource):
+    """回放录制的彩色/深度序列，接口与 FemtoBoltCamera 相同"""
+
+    def __init__(self, path, speed=1.0, loop=False, threaded=False, buffer_size=4,
+                 use_pool=False, pool_size=None):
+        """
+        Args:
+            path: 录制目录
+            speed: 回放速度倍率，1.0 按录制时间戳节奏回放，0 表示尽可能快
+            loop: 播放结束后是否从头循环
+            threaded: 是否在后台线程中读取
+            buffer_size: 后台读取的环形缓冲区容量（帧）
+            use_pool: 是否使用预分配的帧缓冲池
+            pool_size: 缓冲池帧数
+        """
+        metadata = load_recording_metadata(path)
+        super().__init__(metadata['width'], metadata['height'], metadata.get('fps', 30),
+                         threaded, buffer_size, use_pool, pool_size)
+        self.path = path
+        self.metadata = metadata
+        self.speed = speed
+        self.loop = loop
+        self._reader = None
+        if metadata.get('format') == 'chunked':
+            # 录制中断时元数据中没有帧数，以索引为准
+            self._reader = ChunkedRecordingReader(path, metadata)
+            self.num_frames = len(self._reader)
+            self._timestamps = self._reader.timestamps
+        else:
+            self.num_frames = int(metadata['num_frames'])
+            # 写时复制的内存映射: 调用方可以在返回的图像上绘制而不修改录制文件
+            self._color = np.load(os.path.join(path, 'color.npy'), mmap_mode='c')
+            self._depth = np.load(os.path.join(path, 'depth.npy'), mmap_mode='c')
+            self._timestamps = np.load(os.path.join(path, 'timestamps.npy'))[:self.num_frames]
+        if self.num_frames == 0:
+            raise ValueError(f"录制目录中没有帧: {path}")
+        self._timestamps = self._timestamps - self._timestamps[0]
+
+        self.frame_index = 0
+        self._clock_start = None
+
+        print(f"Playback: {path} ({self.num_frames} frames, {self.width}x{self.height} @ {self.fps}fps)")
+
+    def start(self):
+        """从头开始回放"""
+        self.frame_index = 0
+        self._end_of_stream = False
+        self._clock_start = time.perf_counter()
+        self._start_capture_thread()
+        return True
+
+    def stop(self):
+        """停止回放并关闭已打开的数据块文件（再次 start() 时按需重新打开）"""
+        super().stop()
+        if self._reader is not None:
+            self._reader.close()
+
+    def _read_frames(self, copy=False):
+        """
+        读取下一帧，按回放速度等待到该帧的时间戳
+
+        Args:
+            copy: 是否复制图像数据（默认返回内存映射的视图）
+
+        Returns:
+            tuple: (color_image, depth_image)，回放结束返回 (None, None)。
+            设备时间戳为录制时间戳（相对第一帧，秒），帧号为录制中的帧序号
+        """
+        if self._clock_start is None:
+            self.start()
+
+        if self.frame_index >= self.num_frames:
+            if not self.loop:
+                self._end_of_stream = True
+                return None, None
+            # 循环: 下一轮第0帧在上一轮最后一帧之后一个帧周期
+            period = 1.0 / self.fps
+            self._clock_start += (self._timestamps[-1] + period) / self.speed if self.speed > 0 else 0.0
+            self.frame_index = 0
+
+        index = self.frame_index
+        self.frame_index += 1
+        self._device_timestamp = float(self._timestamps[index])
+        self._frame_number = index
+
+        if self.speed > 0:
+            delay = self._clock_start + self._timestamps[index] / self.speed - time.perf_counter()
+            if delay > 0:
+                self._stop_event.wait(delay)
+
+        if self._reader is not None:
+            # 解码得到的是新数组，无需复制
+            return self._reader.read(index)
+
+        color_image, depth_image = self._color[index], self._depth[index]
+        if copy:
+            color_image = np.array(color_image)
+            depth_image = np.array(depth_image)
+        return color_image, depth_image
+
+    def get_intrinsics(self, stream='color'):
+        """
+        获取录制时保存的相机内参
+
+        Args:
+            stream: 'color' 或 'depth'
+
+        Returns:
+            dict: 包含内参矩阵和畸变系数，如果录制中没有返回None
+        """
+        intrinsics = self.metadata.get(f'{stream}_intrinsics')
+        if intrinsics is None:
+            return None
+        return {
+            'camera_matrix': np.array(intrinsics['camera_matrix']),
+            'distortion_coeffs': np.array(intrinsics['distortion_coeffs']),
+            'width': intrinsics['width'],
+            'height': intrinsics['height']
+        }
+
+    def get_extrinsics(self, from_stream='depth', to_stream='color'):
+        """
+        获取录制时保存的数据流间外参
+
+        Returns:
+            np.ndarray: 4x4 变换矩阵 (p_to = T @ p_from, 单位:米)，如果录制中没有返回None
+        """
+        depth_to_color = self.metadata.get('depth_to_color')
+        if depth_to_color is None:
+            return None
+        transform = np.array(depth_to_color, dtype=np.float64)
+        if from_stream == to_stream:
+            return np.eye(4)
+        return transform if from_stream == 'depth' else np.linalg.inv(transform)
+
+    def get_depth_scale(self):
+        """
+        获取录制时保存的深度比例
+
+        Returns:
+            float: 深度比例，如果录制中没有返回None
+        """
+        return self.metadata.get('depth_scale')
@@ -0,0 +1,259 @@
+"""
+异步压缩录制
+采集线程只把帧放入队列, 后台写入线程并行完成彩色图像的无损 PNG 压缩和写盘,
+写盘较慢或压缩耗时波动时不阻塞采集。输出为 chunked 格式录制目录（见 playback.py）:
+每个写入线程只追加写入自己的数据块文件, 写完一帧后向索引追加一条定长记录,
+录制中断时已写入索引的帧仍可回放。写盘出错（磁盘已满、无权限等）时写入线程继续清空队列并归还缓冲区,
+错误在下一次 write() 或 close() 时抛出
+"""
+import os
+import queue
+import threading
+import time
+from typing import Callable, Optional
+
+import cv2
+import numpy as np
+
+from .base import CameraSource
+from .frame_buffer import FrameRecord
+from .playback import (INDEX_DTYPE, INDEX_FILE, camera_metadata, chunk_filename,
+                       write_recording_metadata)
+
+
+class ChunkedRecorder:
+    """后台线程压缩写入彩色/深度数据流"""
+
+    def __init__(self, path: str, width: int, height: int, fps: int = 30,
+                 camera: Optional[CameraSource] = None, num_workers: int = 2, queue_size: int = 64,
+                 chunk_size: int = 256 * 2 ** 20, compression: int = 1, block: bool = True):
+        """
+        Args:
+            path: 输出目录（不能已包含录制）
+            width: 图像宽度
+            height: 图像高度
+            fps: 录制帧率
+            camera: 可选的相机，用于把内外参和深度比例写入元数据
+            num_workers: 写入线程数（PNG 压缩在 OpenCV 中释放 GIL，可并行）
+            queue_size: 待写入帧队列容量
+            chunk_size: 单个数据块文件的大小上限（字节），超过后写入线程换用新文件
+            compression: PNG 压缩级别 0-9，级别越高文件越小、压缩越慢
+            block: 队列满时 write() 是否阻塞等待；False 时丢弃该帧并计数
+        """
+        if os.path.exists(os.path.join(path, INDEX_FILE)):
+            raise FileExistsError(f"目录中已有录制: {path}")
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.width = width
+        self.height = height
+        self.chunk_size = chunk_size
+        self.block = block
+        self._png_params = [cv2.IMWRITE_PNG_COMPRESSION, compression]
+
+        self._metadata = {'version': 2, 'format': 'chunked', 'width': width, 'height': height, 'fps': fps,
+                          'color_codec': 'png', 'depth_format': 'uint16'}
+        if camera is not None:
+            self._metadata.update(camera_metadata(camera))
+        # 先写入不含帧数的元数据，录制中断时目录仍可回放
+        write_recording_metadata(path, self._metadata)
+
+        self._queue = queue.Queue(queue_size)
+        self._index_file = open(os.path.join(path, INDEX_FILE), 'ab')
+        self._lock = threading.Lock()
+        self._next_chunk = 0
+        self._closed = False
+        self._error = None  # 写入线程遇到的第一个错误
+
+        # 统计
+        self.submitted = 0      # 送入队列的帧数
+        self.written = 0        # 已写盘的帧数
+        self.dropped = 0        # 队列满被丢弃的帧数
+        self.max_queue_depth = 0
+        self.bytes_written = 0
+        self.raw_bytes = 0      # 未压缩时的字节数
+        self.encode_time = 0.0  # 压缩累计耗时（秒）
+
+        self._workers = [threading.Thread(target=self._write_loop, name=f'ChunkedRecorder{i}', daemon=True)
+                         for i in range(num_workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def write(self, color_image: np.ndarray, depth_image: np.ndarray, timestamp: Optional[float] = None,
+              device_timestamp: Optional[float] = None, frame_number: Optional[int] = None,
+              copy: bool = True, on_written: Optional[Callable[[], None]] = None) -> bool:
+        """
+        提交一帧（由单个采集/处理线程调用）
+
+        Args:
+            color_image: 彩色图像
+            depth_image: 深度图像
+            timestamp: 主机时间戳（秒），默认为当前 time.perf_counter()
+            device_timestamp: 设备时间戳（秒）
+            frame_number: 设备帧号
+            copy: 是否复制图像；False 时调用方须保证图像在写盘完成前不被修改
+            on_written: 写盘完成（或帧被丢弃）后的回调，用于归还缓冲区
+
+        Returns:
+            是否进入写入队列（block=False 且队列满时返回False）
+
+        Raises:
+            写入线程遇到的错误（如磁盘已满）
+        """
+        if self._closed:
+            raise RuntimeError("录制已关闭")
+        if self._error is not None:
+            raise self._error
+        if copy:
+            color_image = color_image.copy()
+            depth_image = depth_image.copy()
+        item = (self.submitted + self.dropped, color_image, depth_image,
+                time.perf_counter() if timestamp is None else timestamp,
+                np.nan if device_timestamp is None else device_timestamp,
+                -1 if frame_number is None else frame_number, on_written)
+
+        if self.block:
+            self._queue.put(item)
+        else:
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                self.dropped += 1
+                if on_written is not None:
+                    on_written()
+                return False
+        self.submitted += 1
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return True
+
+    def write_record(self, record: FrameRecord, release: Optional[Callable[[FrameRecord], None]] = None) -> bool:
+        """
+        提交一个帧记录（不复制图像，写盘完成后调用 release(record)）
+
+        Args:
+            record: 帧记录，图像在写盘完成前不能被修改（非后台采集的 SDK 帧请用 write()）
+            release: 写盘完成后的回调，通常为 camera.release_frame
+
+        Returns:
+            是否进入写入队列
+        """
+        on_written = None if release is None else (lambda: release(record))
+        return self.write(record.color, record.depth, record.timestamp, record.device_timestamp,
+                          record.frame_number, copy=False, on_written=on_written)
+
+    def _write_loop(self):
+        """写入线程: 压缩并追加写入自己的数据块文件，再追加索引记录"""
+        file = None
+        chunk = -1
+        offset = 0
+        entry = np.zeros(1, dtype=INDEX_DTYPE)
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                sequence, color_image, depth_image, timestamp, device_timestamp, frame_number, on_written = item
+                if self._error is not None:
+                    # 已出错: 不再写盘，只清空队列并归还缓冲区，避免 write() 在满队列上永久阻塞
+                    if on_written is not None:
+                        on_written()
+                    continue
+
+                try:
+                    t_start = time.perf_counter()
+                    _, png = cv2.imencode('.png', color_image, self._png_params)
+                    encode_time = time.perf_counter() - t_start
+                    depth = np.ascontiguousarray(depth_image, dtype=np.uint16)
+
+                    if file is None or offset >= self.chunk_size:
+                        if file is not None:
+                            file.close()
+                            file = None
+                        with self._lock:
+                            chunk = self._next_chunk
+                            self._next_chunk += 1
+                        file = open(chunk_filename(self.path, chunk), 'ab')
+                        offset = 0
+                    file.write(png)
+                    file.write(depth)
+                    # 数据先于索引写出，索引中的记录总是指向完整的帧
+                    file.flush()
+                except Exception as e:
+                    with self._lock:
+                        if self._error is None:
+                            self._error = e
+                    continue
+                finally:
+                    if on_written is not None:
+                        on_written()
+
+                entry[0] = (sequence, chunk, offset, png.size, depth.nbytes,
+                            timestamp, device_timestamp, frame_number)
+                offset += png.size + depth.nbytes
+                with self._lock:
+                    try:
+                        self._index_file.write(entry.tobytes())
+                        self._index_file.flush()
+                    except Exception as e:
+                        if self._error is None:
+                            self._error = e
+                        continue
+                    self.written += 1
+                    self.bytes_written += png.size + depth.nbytes
+                    self.raw_bytes += color_image.nbytes + depth.nbytes
+                    self.encode_time += encode_time
+        finally:
+            if file is not None:
+                file.close()
+
+    def close(self):
+        """
+        等待队列中的帧全部写盘，关闭文件并写入最终元数据
+
+        Raises:
+            写入线程遇到的错误，此时只有已写入索引的帧可回放
+        """
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+        try:
+            self._index_file.close()
+        except OSError as e:
+            self._error = self._error or e
+
+        try:
+            self._metadata['num_frames'] = self.written
+            write_recording_metadata(self.path, self._metadata)
+        except OSError as e:
+            self._error = self._error or e
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self) -> 'ChunkedRecorder':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def get_stats(self) -> dict:
+        """
+        获取录制统计
+
+        Returns:
+            dict: 提交/写盘/丢弃帧数、队列深度、写盘字节数、压缩比和平均压缩耗时（毫秒）
+        """
+        with self._lock:
+            written = self.written
+            return {
+                'submitted': self.submitted,
+                'written': written,
+                'dropped': self.dropped,
+                'queue_depth': self._queue.qsize(),
+                'max_queue_depth': self.max_queue_depth,
+                'bytes_written': self.bytes_written,
+                'compression_ratio': self.raw_bytes / self.bytes_written if self.bytes_written else 0.0,
+                'mean_encode_ms': self.encode_time / written * 1000 if written else 0.0
+            }
@@ -0,0 +1,261 @@
+"""
+深度图到彩色图的配准
+利用深度/彩色相机内参和深度->彩色外参, 一次性预计算深度像素射线在彩色相机坐标系中的方向,
+每帧只需向量化的缩放、投影和 z-buffer, 代替 SDK 逐帧的 rs.align
+"""
+import numpy as np
+import cv2
+from typing import Optional, Tuple
+
+from ..calibration.bearing_table import BearingTable
+
+
+class DepthToColorRegistration:
+    """深度图配准到彩色相机视角"""
+
+    def __init__(self,
+                 depth_camera_matrix: np.ndarray,
+                 depth_dist_coeffs: Optional[np.ndarray],
+                 depth_size: Tuple[int, int],
+                 color_camera_matrix: np.ndarray,
+                 color_dist_coeffs: Optional[np.ndarray],
+                 color_size: Tuple[int, int],
+                 depth_to_color: np.ndarray,
+                 depth_scale: float = 0.001,
+                 splat: Optional[int] = None,
+                 cache_dir: Optional[str] = None):
+        """
+        初始化并预计算配准表
+
+        Args:
+            depth_camera_matrix: 深度相机内参矩阵
+            depth_dist_coeffs: 深度相机畸变系数 (Brown-Conrady)，None 表示无畸变
+            depth_size: 深度图尺寸 (width, height)
+            color_camera_matrix: 彩色相机内参矩阵
+            color_dist_coeffs: 彩色相机畸变系数 (Brown-Conrady)，None 表示无畸变
+            color_size: 彩色图尺寸 (width, height)
+            depth_to_color: 深度相机到彩色相机的 4x4 变换 (p_color = T @ p_depth)
+            depth_scale: 深度原始值到米的换算系数
+            splat: 每个深度点写入的彩色像素块边长 (1 或 2)。彩色分辨率高于深度时单像素写入会留下空洞,
+                   被遮挡的背景点会从空洞中漏出; 默认按两者焦距之比自动选择
+            cache_dir: 深度相机射线查找表的磁盘缓存目录
+        """
+        self.depth_size = tuple(int(s) for s in depth_size)
+        self.color_size = tuple(int(s) for s in color_size)
+        self.depth_scale = float(depth_scale)
+        self.color_camera_matrix = np.asarray(color_camera_matrix, dtype=np.float64)
+        self.color_dist_coeffs = (None if color_dist_coeffs is None or not np.any(color_dist_coeffs)
+                                  else np.asarray(color_dist_coeffs, dtype=np.float64).ravel())
+        if self.color_dist_coeffs is not None and len(self.color_dist_coeffs) > 5:
+            raise ValueError("彩色相机仅支持 Brown-Conrady 畸变模型 (k1, k2, p1, p2, k3)")
+
+        # 投影参数（float32，逐帧向量化计算）
+        self._focal = self.color_camera_matrix[[0, 1], [0, 1]].astype(np.float32)
+        self._center = self.color_camera_matrix[:2, 2].astype(np.float32)
+        if self.color_dist_coeffs is not None:
+            k1, k2, p1, p2, k3 = np.pad(self.color_dist_coeffs, (0, 5 - len(self.color_dist_coeffs)))
+            self._distortion = tuple(np.float32(c) for c in (k1, k2, p1, p2, k3))
+        else:
+            self._distortion = None
+
+        if splat is None:
+            density = self.color_camera_matrix[0, 0] / np.asarray(depth_camera_matrix)[0, 0]
+            splat = 2 if density > 1.0 else 1
+        if splat not in (1, 2):
+            raise ValueError("splat 只能为 1 或 2")
+        self.splat = splat
+
+        depth_dist_coeffs = np.zeros(5) if depth_dist_coeffs is None else depth_dist_coeffs
+        self.depth_bearing = BearingTable(depth_camera_matrix, depth_dist_coeffs, self.depth_size,
+                                          use_fisheye=False, cache_dir=cache_dir)
+
+        # 彩色相机坐标系下的深度射线 R @ (r / r_z): p_color = z_depth * (R @ r) + t
+        # 按 X/Y/Z 分平面存储，逐帧运算都在连续的一维数组上进行
+        T = np.asarray(depth_to_color, dtype=np.float64)
+        self.depth_to_color = T
+        width, height = self.depth_size
+        rays = self.depth_bearing.z_rays.reshape(-1, 3).astype(np.float64) @ T[:3, :3].T
+        self._ray_planes = np.ascontiguousarray(rays.T, dtype=np.float32)
+        self._translation = T[:3, 3].astype(np.float32)
+
+        # 逐帧缓冲区: 彩色相机坐标 X/Y/Z、投影中间量、有效掩码
+        num_pixels = width * height
+        self._points = np.empty((3, num_pixels), dtype=np.float32)
+        self._uv = np.empty((2, num_pixels), dtype=np.float32)
+        self._scratch = np.empty((6, num_pixels), dtype=np.float32)
+        self._valid = np.empty(num_pixels, dtype=bool)
+        self._check = np.empty(num_pixels, dtype=bool)
+
+        # 原始深度值上限 (z16)，同时作为 z-buffer 的空值
+        self._max_raw = np.iinfo(np.uint16).max
+
+        color_width, color_height = self.color_size
+        self.registered = np.zeros((color_height, color_width), dtype=np.uint16)
+        # 投影网格: splat=2 时按 2x2 块的右下角像素索引，块可以只覆盖图像的第一行/列或最后一行/列，
+        # 因此比彩色图多一行一列
+        self._grid_size = (color_width + self.splat - 1, color_height + self.splat - 1)
+        if self.splat == 2:
+            self._splat_kernel = np.ones((2, 2), dtype=np.uint8)
+            self._splat_buffer = np.empty((color_height + 1, color_width + 1), dtype=np.uint16)
+
+    @classmethod
+    def from_camera(cls, camera, cache_dir: Optional[str] = None) -> 'DepthToColorRegistration':
+        """
+        由相机 SDK 读取的内外参创建
+
+        Args:
+            camera: 已启动的 FemtoBoltCamera
+            cache_dir: 射线查找表的磁盘缓存目录
+
+        Returns:
+            DepthToColorRegistration，参数不可用（如模拟模式）时抛出 ValueError
+        """
+        depth = camera.get_intrinsics('depth')
+        color = camera.get_intrinsics('color')
+        extrinsics = camera.get_extrinsics('depth', 'color')
+        depth_scale = camera.get_depth_scale()
+        if depth is None or color is None or extrinsics is None or depth_scale is None:
+            raise ValueError("无法从相机读取配准所需的内外参")
+
+        return cls(depth['camera_matrix'], depth['distortion_coeffs'], (depth['width'], depth['height']),
+                   color['camera_matrix'], color['distortion_coeffs'], (color['width'], color['height']),
+                   extrinsics, depth_scale=depth_scale, cache_dir=cache_dir)
+
+    def project(self, depth_image: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        将有效深度像素投影到彩色图像
+
+        Args:
+            depth_image: (H, W) 原始深度图 (z16)
+
+        Returns:
+            (pixel_index, depth_raw, source_index): 彩色图像中的线性像素索引（splat=2 时为 2x2 块右下角在
+            (color_height + 1, color_width + 1) 网格中的索引）、彩色相机坐标系下的深度（原始单位）、
+            对应的深度图线性像素索引
+        """
+        width, height = self.depth_size
+        if depth_image.shape != (height, width):
+            raise ValueError(f"深度图尺寸 {depth_image.shape[::-1]} 与配准表尺寸 {self.depth_size} 不一致")
+
+        depth = depth_image.reshape(-1)
+        X, Y, Z = self._points
+        x, y = self._uv
+        r2, radial, xy, dx, dy, tmp = self._scratch
+        valid, check = self._valid, self._check
+
+        # 相机坐标: z * (R @ r) + t
+        np.multiply(depth, np.float32(self.depth_scale), out=tmp, dtype=np.float32)
+        for plane, rays, offset in zip(self._points, self._ray_planes, self._translation):
+            np.multiply(rays, tmp, out=plane)
+            plane += offset
+
+        # 有效: 深度非零且在彩色相机前方；无效点的 Z 置 1 避免除零
+        np.not_equal(depth, 0, out=valid)
+        np.greater(Z, 0, out=check)
+        valid &= check
+        np.logical_not(valid, out=check)
+        np.copyto(Z, np.float32(1), where=check)
+
+        # 归一化平面坐标及 Brown-Conrady 畸变（cv2.projectPoints 在大量点上明显更慢）
+        np.divide(X, Z, out=x)
+        np.divide(Y, Z, out=y)
+        if self._distortion is not None:
+            k1, k2, p1, p2, k3 = self._distortion
+            np.multiply(x, x, out=r2)
+            np.multiply(y, y, out=tmp)
+            r2 += tmp
+            # radial = 1 + r2 * (k1 + r2 * (k2 + r2 * k3))
+            np.multiply(r2, k3, out=radial)
+            radial += k2
+            radial *= r2
+            radial += k1
+            radial *= r2
+            radial += 1
+            # 切向: dx = 2 p1 xy + p2 (r2 + 2x^2), dy = p1 (r2 + 2y^2) + 2 p2 xy
+            np.multiply(x, y, out=xy)
+            np.multiply(x, x, out=dx)
+            dx *= 2
+            dx += r2
+            dx *= p2
+            np.multiply(xy, 2 * p1, out=tmp)
+            dx += tmp
+            np.multiply(y, y, out=dy)
+            dy *= 2
+            dy += r2
+            dy *= p1
+            np.multiply(xy, 2 * p2, out=tmp)
+            dy += tmp
+            x *= radial
+            x += dx
+            y *= radial
+            y += dy
+
+        # 像素坐标 floor(x + 0.5): 单像素写入时为最近像素，2x2 写入时为包围投影点的四个像素中心的右下角
+        x *= self._focal[0]
+        x += self._center[0] + 0.5
+        y *= self._focal[1]
+        y += self._center[1] + 0.5
+        np.floor(x, out=x)
+        np.floor(y, out=y)
+
+        grid_width, grid_height = self._grid_size
+        for plane, size in ((x, grid_width), (y, grid_height)):
+            np.greater_equal(plane, 0, out=check)
+            valid &= check
+            np.less(plane, size, out=check)
+            valid &= check
+
+        source_index = np.flatnonzero(valid)
+        pixel_index = y[source_index].astype(np.int64)
+        pixel_index *= grid_width
+        pixel_index += x[source_index].astype(np.int64)
+
+        # 彩色相机坐标系下的 Z，换算为原始深度单位
+        depth_color = Z[source_index]
+        depth_color /= np.float32(self.depth_scale)
+        depth_color += np.float32(0.5)
+        np.clip(depth_color, 0, self._max_raw, out=depth_color)
+        return pixel_index, depth_color.astype(np.uint16), source_index
+
+    def register(self, depth_image: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        将一帧深度图配准到彩色相机视角
+
+        多个深度像素落在同一彩色像素时保留最近的 (z-buffer)；没有深度像素落入的彩色像素为 0
+
+        Args:
+            depth_image: (H, W) 原始深度图 (z16)
+            out: 可选的输出缓冲区 (color_height, color_width) uint16，默认使用内部缓冲区
+
+        Returns:
+            与彩色图对齐的深度图 (z16, 彩色相机坐标系下的 Z)
+        """
+        if out is None:
+            out = self.registered
+        out.fill(0)
+
+        pixel_index, depth_raw, _ = self.project(depth_image)
+        if len(pixel_index) == 0:
+            return out
+
+        # z-buffer: 以 (像素索引, 深度) 组合为单个 int64 键排序，每个像素的第一个即最近深度
+        keys = (pixel_index << 16) | depth_raw
+        keys.sort(kind='stable')
+        pixels = keys >> 16
+        first = np.empty(len(keys), dtype=bool)
+        first[0] = True
+        np.not_equal(pixels[1:], pixels[:-1], out=first[1:])
+
+        if self.splat == 1:
+            out.reshape(-1)[pixels[first]] = keys[first] & 0xFFFF
+            return out
+
+        # 2x2 写入: 在右下角像素上做 z-buffer 后，2x2 最小值滤波即等价于每个点写入四个像素
+        buffer = self._splat_buffer
+        buffer.fill(self._max_raw)
+        buffer.reshape(-1)[pixels[first]] = keys[first] & 0xFFFF
+        cv2.erode(buffer, self._splat_kernel, dst=buffer, anchor=(0, 0))
+        color_width, color_height = self.color_size
+        np.copyto(out, buffer[:color_height, :color_width])
+        out[out == self._max_raw] = 0
+        return out
@@ -0,0 +1,197 @@
+"""
+asyncio 帧流
+在后台线程中读取帧, 通过 asyncio.Queue 交付给事件循环中的消费者:
+
+    async with camera.stream() as frames:
+        async for frame in frames:
+            ...
+
+队列满时可丢弃最旧的帧（'drop_oldest'，消费者始终处理较新的帧）或阻塞读取线程（'block'，不丢帧）。
+消费者任务被取消或退出 async with 时读取线程随之停止, 队列中未交付的帧归还到缓冲池
+"""
+import asyncio
+import concurrent.futures
+import threading
+import time
+
+BACKPRESSURE_MODES = ('drop_oldest', 'block')
+
+_END = object()  # 数据流结束标记
+
+
+class FrameStream:
+    """相机数据源的异步帧迭代器"""
+
+    def __init__(self, camera, maxsize=4, backpressure='drop_oldest'):
+        """
+        Args:
+            camera: 已启动的 CameraSource。threaded=True 时从其采集缓冲区按顺序读取,
+                    否则由本对象的读取线程直接读取
+            maxsize: 队列容量（帧）
+            backpressure: 队列满时的处理，'drop_oldest' 丢弃最旧的帧，'block' 阻塞读取线程
+        """
+        if backpressure not in BACKPRESSURE_MODES:
+            raise ValueError(f"未知的背压模式: {backpressure}，可选 {BACKPRESSURE_MODES}")
+        if maxsize < 1:
+            raise ValueError("队列容量至少为1")
+        self.camera = camera
+        self.maxsize = maxsize
+        self.backpressure = backpressure
+
+        self._loop = None
+        self._queue = None
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._closed = False
+        self._finished = False  # 读取线程已结束（数据流结束或出错）
+
+        # 统计
+        self.produced = 0   # 读取线程送入队列的帧数
+        self.delivered = 0  # 交付给消费者的帧数
+        self.dropped = 0    # 队列满时被丢弃的帧数
+
+    def _start(self):
+        """在当前事件循环中创建队列并启动读取线程"""
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(self.maxsize)
+        self._thread = threading.Thread(target=self._produce, name=f'{type(self.camera).__name__}Stream',
+                                        daemon=True)
+        self._thread.start()
+
+    def _produce(self):
+        """读取线程: 读取帧并送入事件循环的队列"""
+        camera = self.camera
+        period = 1.0 / camera.fps
+        next_time = time.perf_counter()
+        try:
+            while not self._stop_event.is_set():
+                if camera.threaded:
+                    record = camera.frame_buffer.get('next', timeout=0.1)
+                    if record is None:
+                        if camera.frame_buffer.closed and len(camera.frame_buffer) == 0:
+                            break
+                        continue
+                else:
+                    if camera._pace_capture:
+                        # 数据源本身不阻塞时按帧率节流（在读取之前等待，不计入帧延迟）
+                        self._stop_event.wait(max(0.0, next_time - time.perf_counter()))
+                        next_time += period
+                    # 帧跨线程交付，复制数据源的缓冲区
+                    record = camera._read_record(copy=True)
+                    if record is None:
+                        if camera._end_of_stream:
+                            break
+                        continue
+
+                if not self._deliver(record):
+                    camera.release_frame(record)
+                    break
+        finally:
+            try:
+                self._loop.call_soon_threadsafe(self._finish)
+            except RuntimeError:
+                # 事件循环已关闭
+                pass
+
+    def _deliver(self, record):
+        """
+        把一帧送入队列（在读取线程中调用）
+
+        Returns:
+            是否送入，流已关闭时返回False
+        """
+        try:
+            if self.backpressure == 'drop_oldest':
+                self._loop.call_soon_threadsafe(self._put_drop_oldest, record)
+                return True
+
+            future = asyncio.run_coroutine_threadsafe(self._queue.put(record), self._loop)
+            while True:
+                try:
+                    future.result(timeout=0.1)
+                    self.produced += 1
+                    return True
+                except concurrent.futures.TimeoutError:
+                    if self._stop_event.is_set():
+                        future.cancel()
+                        return False
+        except RuntimeError:
+            return False
+
+    def _put_drop_oldest(self, record):
+        """在事件循环中写入一帧，队列满时丢弃最旧的帧"""
+        if self._closed:
+            self.camera.release_frame(record)
+            return
+        if self._queue.full():
+            self.camera.release_frame(self._queue.get_nowait())
+            self.dropped += 1
+        self._queue.put_nowait(record)
+        self.produced += 1
+
+    def _finish(self):
+        """在事件循环中标记读取线程结束，唤醒等待的消费者"""
+        self._finished = True
+        if not self._closed and not self._queue.full():
+            self._queue.put_nowait(_END)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._closed:
+            raise StopAsyncIteration
+        if self._queue is None:
+            self._start()
+        if self._finished and self._queue.empty():
+            self._shutdown()
+            raise StopAsyncIteration
+
+        try:
+            record = await self._queue.get()
+        except asyncio.CancelledError:
+            self._shutdown()
+            raise
+        if record is _END:
+            self._shutdown()
+            raise StopAsyncIteration
+        self.delivered += 1
+        return record
+
+    def _shutdown(self):
+        """停止读取线程（不等待）并归还队列中的帧"""
+        self._closed = True
+        self._stop_event.set()
+        if self._queue is not None:
+            while not self._queue.empty():
+                record = self._queue.get_nowait()
+                if record is not _END:
+                    self.camera.release_frame(record)
+
+    async def aclose(self):
+        """停止数据流并等待读取线程退出"""
+        self._shutdown()
+        if self._thread is not None and self._thread.is_alive():
+            await self._loop.run_in_executor(None, self._thread.join, 2.0)
+        self._shutdown()
+
+    async def __aenter__(self) -> 'FrameStream':
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    def get_stats(self) -> dict:
+        """
+        获取数据流统计
+
+        Returns:
+            dict: 送入队列/交付/丢弃帧数和当前队列深度
+        """
+        return {
+            'produced': self.produced,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'queue_depth': 0 if self._queue is None else self._queue.qsize(),
+            'capacity': self.maxsize
+        }
@@ -0,0 +1,398 @@
+"""
+合成棋盘格相机
+通过已知的针孔或鱼眼相机模型渲染处于随机或指定位姿的棋盘格, 可叠加模糊和噪声,
+每帧附带真值位姿和角点像素坐标, 用于无硬件地测量检测与标定的精度和速度。
+
+渲染方式: 预计算每个像素的归一化射线 (x/z, y/z, 1), 每帧由棋盘格平面单应矩阵把射线映射到
+棋盘格纹理坐标, 再用一次 cv2.remap 采样纹理, 畸变模型只在初始化时计算一次
+"""
+import cv2
+import numpy as np
+from typing import Optional, Sequence, Tuple
+
+from .base import CameraSource
+from ..calibration.bearing_table import BearingTable
+
+
+def render_checkerboard_texture(checkerboard_size: Tuple[int, int], pixels_per_square: int = 32,
+                                margin_squares: float = 1.0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    生成棋盘格纹理图像
+
+    Args:
+        checkerboard_size: 内角点数量 (列, 行)
+        pixels_per_square: 每个方格的纹理像素数
+        margin_squares: 白色边框宽度（方格数）
+
+    Returns:
+        (texture, board_to_texture): 灰度纹理图像, 以及棋盘格坐标 (方格为单位, 第一个内角点为原点)
+        到纹理像素坐标的 3x3 变换
+    """
+    cols, rows = checkerboard_size
+    margin = int(round(margin_squares * pixels_per_square))
+    squares = np.indices((rows + 1, cols + 1)).sum(axis=0) % 2
+    board = np.where(squares == 0, 0, 255).astype(np.uint8)
+    board = np.repeat(np.repeat(board, pixels_per_square, axis=0), pixels_per_square, axis=1)
+    texture = cv2.copyMakeBorder(board, margin, margin, margin, margin, cv2.BORDER_CONSTANT, value=255)
+
+    # 第一个内角点位于第一个方格的右下角; 纹理像素中心在整数坐标上
+    offset = margin + pixels_per_square - 0.5
+    board_to_texture = np.array([[pixels_per_square, 0, offset],
+                                 [0, pixels_per_square, offset],
+                                 [0, 0, 1]], dtype=np.float64)
+    return texture, board_to_texture
+
+
+class SyntheticBoardCamera(CameraSource):
+    """渲染棋盘格的合成相机，接口与 FemtoBoltCamera 相同，真值见 get_ground_truth()"""
+
+    def __init__(self,
+                 camera_matrix: np.ndarray,
+                 dist_coeffs: np.ndarray,
+                 image_size: Tuple[int, int] = (640, 480),
+                 use_fisheye: bool = False,
+                 checkerboard_size: Tuple[int, int] = (12, 8),
+                 square_size: float = 0.038,
+                 pattern: Optional[str] = None,
+                 poses: Optional[Sequence[Tuple[np.ndarray, np.ndarray]]] = None,
+                 num_frames: Optional[int] = None,
+                 distance_range: Tuple[float, float] = (0.4, 1.5),
+                 max_tilt_deg: float = 45.0,
+                 blur_sigma: float = 0.0,
+                 noise_sigma: float = 0.0,
+                 background: int = 110,
+                 seed: int = 0,
+                 fps: int = 30,
+                 pace: bool = False,
+                 threaded: bool = False,
+                 buffer_size: int = 4,
+                 use_pool: bool = False,
+                 pool_size: Optional[int] = None):
+        """
+        Args:
+            camera_matrix: 真值内参矩阵
+            dist_coeffs: 真值畸变系数（鱼眼模型为 k1~k4）
+            image_size: 图像尺寸 (width, height)
+            use_fisheye: 是否使用鱼眼相机模型
+            checkerboard_size: 内角点数量 (列, 行)
+            square_size: 方格边长（米）
+            pattern: 可选的棋盘格图像（如 pattern.png），需能检测到 checkerboard_size 个内角点；默认生成纹理
+            poses: 可选的位姿序列 [(rvec, tvec), ...]（棋盘格->相机），默认随机生成
+            num_frames: 帧数，默认随机位姿时无限、指定位姿时为位姿数
+            distance_range: 随机位姿时棋盘格中心到相机的距离范围（米）
+            max_tilt_deg: 随机位姿时棋盘格相对正对相机的最大倾斜角（度）
+            blur_sigma: 高斯模糊标准差（像素），0 表示不模糊
+            noise_sigma: 高斯噪声标准差（灰度值），0 表示无噪声
+            background: 背景灰度
+            seed: 随机种子（位姿和噪声）
+            fps: 帧率
+            pace: 是否按帧率节流，默认尽可能快
+            threaded: 是否在后台线程中渲染
+            buffer_size: 后台渲染的环形缓冲区容量（帧）
+            use_pool: 是否使用预分配的帧缓冲池
+            pool_size: 缓冲池帧数
+        """
+        width, height = int(image_size[0]), int(image_size[1])
+        super().__init__(width, height, fps, threaded, buffer_size, use_pool, pool_size)
+        self.camera_matrix = np.asarray(camera_matrix, dtype=np.float64)
+        self.dist_coeffs = np.asarray(dist_coeffs, dtype=np.float64).ravel()
+        self.use_fisheye = use_fisheye
+        self.checkerboard_size = tuple(checkerboard_size)
+        self.square_size = float(square_size)
+        self.poses = None if poses is None else [(np.asarray(r, dtype=np.float64).reshape(3),
+                                                  np.asarray(t, dtype=np.float64).reshape(3))
+                                                 for r, t in poses]
+        if num_frames is None and self.poses is not None:
+            num_frames = len(self.poses)
+        self.num_frames = num_frames
+        self.distance_range = distance_range
+        self.max_tilt = np.deg2rad(max_tilt_deg)
+        self.blur_sigma = blur_sigma
+        self.noise_sigma = noise_sigma
+        self.background = background
+        self.seed = seed
+        self._pace_capture = pace
+
+        # 棋盘格角点（与 IntrinsicCalibration.objp 顺序一致）
+        cols, rows = self.checkerboard_size
+        self.object_points = np.zeros((cols * rows, 3), dtype=np.float64)
+        self.object_points[:, :2] = np.mgrid[0:cols, 0:rows].T.reshape(-1, 2) * self.square_size
+
+        # 纹理及棋盘格坐标(米) -> 纹理像素的变换
+        if pattern is None:
+            self.texture, board_to_texture = render_checkerboard_texture(self.checkerboard_size)
+        else:
+            self.texture, board_to_texture = self._load_pattern(pattern, self.checkerboard_size)
+        self._board_to_texture = board_to_texture @ np.diag([1 / self.square_size, 1 / self.square_size, 1])
+
+        # 每个像素的归一化射线 (x/z, y/z, 1)；往返投影误差大的像素（鱼眼视场外等）视为看不到棋盘格
+        # 按 X/Y 分平面存储，逐帧的单应变换用 cv2.addWeighted 完成
+        table = BearingTable(self.camera_matrix, self.dist_coeffs, (width, height), use_fisheye)
+        rays = table.z_rays.copy()
+        rays[~self._round_trip_valid(table.z_rays)] = (1e6, 1e6, 1.0)
+        self._ray_x = np.ascontiguousarray(rays[..., 0], dtype=np.float32)
+        self._ray_y = np.ascontiguousarray(rays[..., 1], dtype=np.float32)
+
+        # 逐帧缓冲区
+        self._map_x = np.empty((height, width), dtype=np.float32)
+        self._map_y = np.empty((height, width), dtype=np.float32)
+        self._denominator = np.empty((height, width), dtype=np.float32)
+        self._inverse_depth = np.empty((height, width), dtype=np.float32)
+        self._gray = np.empty((height, width), dtype=np.uint8)
+        self._depth_m = np.empty((height, width), dtype=np.float32)
+        self._inside = np.empty((height, width), dtype=np.uint8)
+        self._check = np.empty((height, width), dtype=np.uint8)
+        self._color = np.empty((height, width, 3), dtype=np.uint8)
+        self._depth = np.empty((height, width), dtype=np.uint16)
+        self._depth_raw = np.empty((height, width), dtype=np.uint16)
+
+        # 噪声: cv2.randn 逐帧生成整幅高斯噪声较慢，预生成两倍尺寸的噪声场，每帧随机取一个窗口
+        self._rng = np.random.default_rng(seed)
+        self._noise_field = None
+        if noise_sigma > 0:
+            self._noise_field = np.round(self._rng.normal(0, noise_sigma, (2 * height, 2 * width))).astype(np.int16)
+
+        self.frame_index = 0
+        self._truth = {}
+
+    @classmethod
+    def from_intrinsic_dict(cls, intrinsic_data: dict, **kwargs) -> 'SyntheticBoardCamera':
+        """
+        以内参标定结果为真值相机模型创建
+
+        Args:
+            intrinsic_data: 内参标定结果 (load_calibration 的返回值)
+            **kwargs: 其余构造参数（棋盘格、位姿、噪声等）
+
+        Returns:
+            SyntheticBoardCamera 实例
+        """
+        kwargs.setdefault('image_size', (intrinsic_data['image_width'], intrinsic_data['image_height']))
+        kwargs.setdefault('use_fisheye', intrinsic_data.get('camera_model', 'fisheye') == 'fisheye')
+        return cls(np.array(intrinsic_data['camera_matrix']),
+                   np.array(intrinsic_data['distortion_coeffs']), **kwargs)
+
+    @staticmethod
+    def _load_pattern(pattern: str, checkerboard_size: Tuple[int, int]) -> Tuple[np.ndarray, np.ndarray]:
+        """读取棋盘格图像，由检测到的内角点拟合棋盘格坐标(方格为单位)到纹理像素的单应"""
+        texture = cv2.imread(pattern, cv2.IMREAD_GRAYSCALE)
+        if texture is None:
+            raise FileNotFoundError(f"无法读取棋盘格图像: {pattern}")
+        found, corners = cv2.findChessboardCorners(texture, checkerboard_size)
+        if not found:
+            raise ValueError(f"棋盘格图像中未检测到 {checkerboard_size} 个内角点: {pattern}")
+        corners = cv2.cornerSubPix(texture, corners, (11, 11), (-1, -1),
+                                   (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001))
+        cols, rows = checkerboard_size
+        grid = np.mgrid[0:cols, 0:rows].T.reshape(-1, 2).astype(np.float64)
+        board_to_texture, _ = cv2.findHomography(grid, corners.reshape(-1, 2).astype(np.float64))
+        return texture, board_to_texture
+
+    def _round_trip_valid(self, z_rays: np.ndarray, tolerance: float = 0.05) -> np.ndarray:
+        """射线重新投影回像素的误差小于 tolerance 的像素"""
+        height, width = z_rays.shape[:2]
+        points = z_rays.reshape(-1, 1, 3).astype(np.float64)
+        projected = self.project(points[:, 0], np.zeros(3), np.zeros(3))
+        u, v = np.meshgrid(np.arange(width), np.arange(height))
+        error = np.hypot(projected[:, 0] - u.ravel(), projected[:, 1] - v.ravel())
+        return (error < tolerance).reshape(height, width)
+
+    def project(self, points: np.ndarray, rvec: np.ndarray, tvec: np.ndarray) -> np.ndarray:
+        """
+        用真值相机模型投影三维点
+
+        Args:
+            points: (N, 3) 点
+            rvec: 旋转向量
+            tvec: 平移向量
+
+        Returns:
+            (N, 2) 像素坐标
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 1, 3)
+        rvec = np.ascontiguousarray(rvec, dtype=np.float64).reshape(3, 1)
+        tvec = np.ascontiguousarray(tvec, dtype=np.float64).reshape(3, 1)
+        if self.use_fisheye:
+            pixels, _ = cv2.fisheye.projectPoints(points, rvec, tvec, self.camera_matrix, self.dist_coeffs[:4])
+        else:
+            pixels, _ = cv2.projectPoints(points, rvec, tvec, self.camera_matrix, self.dist_coeffs)
+        return pixels.reshape(-1, 2)
+
+    def sample_pose(self, margin: float = 10.0, max_attempts: int = 100) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        随机生成所有角点都在图像内的棋盘格位姿
+
+        Args:
+            margin: 角点距图像边缘的最小距离（像素）
+            max_attempts: 最大尝试次数
+
+        Returns:
+            (rvec, tvec) 棋盘格->相机
+        """
+        cols, rows = self.checkerboard_size
+        center = np.array([(cols - 1) / 2 * self.square_size, (rows - 1) / 2 * self.square_size, 0.0])
+        rng = self._rng
+        for _ in range(max_attempts):
+            # 棋盘格中心沿随机像素的视线放置，正对相机后随机倾斜和旋转
+            u = rng.uniform(0.2, 0.8) * self.width
+            v = rng.uniform(0.2, 0.8) * self.height
+            ray = np.array([self._ray_x[int(v), int(u)], self._ray_y[int(v), int(u)], 1.0])
+            if ray[0] > 1e5:
+                continue
+            distance = rng.uniform(*self.distance_range)
+            angles = (rng.uniform(-self.max_tilt, self.max_tilt),
+                      rng.uniform(-self.max_tilt, self.max_tilt),
+                      rng.uniform(-np.pi / 6, np.pi / 6))
+            R = (cv2.Rodrigues(np.array([angles[0], 0.0, 0.0]))[0]
+                 @ cv2.Rodrigues(np.array([0.0, angles[1], 0.0]))[0]
+                 @ cv2.Rodrigues(np.array([0.0, 0.0, angles[2]]))[0])
+            tvec = ray / np.linalg.norm(ray) * distance - R @ center
+            rvec = cv2.Rodrigues(R)[0].ravel()
+
+            pixels = self.project(self.object_points, rvec, tvec)
+            inside = ((pixels[:, 0] >= margin) & (pixels[:, 0] < self.width - margin) &
+                      (pixels[:, 1] >= margin) & (pixels[:, 1] < self.height - margin))
+            if inside.all():
+                return rvec, tvec
+        raise RuntimeError("无法生成棋盘格完整可见的位姿，请检查距离范围和视场")
+
+    def render(self, rvec: np.ndarray, tvec: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        渲染一帧
+
+        Args:
+            rvec: 旋转向量（棋盘格->相机）
+            tvec: 平移向量（米）
+
+        Returns:
+            (color_image, depth_image): BGR 图像和 z16 深度图（毫米，棋盘格外为0），
+            均为内部缓冲区，下一次渲染时被覆盖
+        """
+        R = cv2.Rodrigues(np.asarray(rvec, dtype=np.float64).reshape(3, 1))[0]
+        t = np.asarray(tvec, dtype=np.float64).reshape(3)
+
+        # 射线 r = (x, y, 1) 与棋盘格平面的交点: inv([r1 r2 t]) @ r = (X, Y, 1) / z，第三行即 1/z
+        ray_to_board = np.linalg.inv(np.column_stack([R[:, 0], R[:, 1], t]))
+        ray_to_texture = self._board_to_texture @ ray_to_board
+        map_x, map_y, denominator = self._map_x, self._map_y, self._denominator
+
+        def plane_transform(row, dst):
+            # dst = row[0] * x + row[1] * y + row[2]
+            return cv2.addWeighted(self._ray_x, float(row[0]), self._ray_y, float(row[1]), float(row[2]), dst=dst)
+
+        plane_transform(ray_to_texture[2], denominator)
+        # 交点在相机后方（分母非正）时把分母置为极小正数，纹理坐标落到纹理外即为背景
+        cv2.max(denominator, 1e-9, dst=denominator)
+        plane_transform(ray_to_texture[0], map_x)
+        plane_transform(ray_to_texture[1], map_y)
+        cv2.divide(map_x, denominator, dst=map_x)
+        cv2.divide(map_y, denominator, dst=map_y)
+
+        cv2.remap(self.texture, map_x, map_y, cv2.INTER_LINEAR, dst=self._gray,
+                  borderMode=cv2.BORDER_CONSTANT, borderValue=self.background)
+
+        # 深度（毫米）: 只保留落在棋盘格纹理内的像素
+        plane_transform(ray_to_board[2], self._inverse_depth)
+        cv2.max(self._inverse_depth, 1e-9, dst=self._inverse_depth)
+        cv2.divide(1000.0, self._inverse_depth, dst=self._depth_m)
+        cv2.min(self._depth_m, 65535.0, dst=self._depth_m)
+        np.copyto(self._depth_raw, self._depth_m, casting='unsafe')
+        texture_height, texture_width = self.texture.shape[:2]
+        cv2.inRange(map_x, 0, texture_width - 1, dst=self._inside)
+        cv2.inRange(map_y, 0, texture_height - 1, dst=self._check)
+        cv2.bitwise_and(self._inside, self._check, dst=self._inside)
+        self._depth.fill(0)
+        cv2.copyTo(self._depth_raw, self._inside, dst=self._depth)
+
+        if self.blur_sigma > 0:
+            cv2.GaussianBlur(self._gray, (0, 0), self.blur_sigma, dst=self._gray)
+        if self._noise_field is not None:
+            dy = int(self._rng.integers(0, self.height))
+            dx = int(self._rng.integers(0, self.width))
+            noise = self._noise_field[dy:dy + self.height, dx:dx + self.width]
+            cv2.add(self._gray, noise, dst=self._gray, dtype=cv2.CV_8U)
+        cv2.cvtColor(self._gray, cv2.COLOR_GRAY2BGR, dst=self._color)
+        return self._color, self._depth
+
+    def start(self):
+        """从第0帧开始（随机位姿和噪声按种子重新生成）"""
+        self.frame_index = 0
+        self._end_of_stream = False
+        self._rng = np.random.default_rng(self.seed)
+        self._truth.clear()
+        self._start_capture_thread()
+        return True
+
+    def _read_frames(self, copy=False):
+        """
+        渲染下一帧
+
+        Args:
+            copy: 是否复制图像数据（默认返回内部缓冲区）
+
+        Returns:
+            tuple: (color_image, depth_image)，帧数用完返回 (None, None)
+        """
+        if self.num_frames is not None and self.frame_index >= self.num_frames:
+            self._end_of_stream = True
+            return None, None
+
+        index = self.frame_index
+        if self.poses is not None:
+            rvec, tvec = self.poses[index % len(self.poses)]
+        else:
+            rvec, tvec = self.sample_pose()
+        color_image, depth_image = self.render(rvec, tvec)
+        self._truth[index] = {
+            'frame_index': index,
+            'rvec': rvec,
+            'tvec': tvec,
+            'image_points': self.project(self.object_points, rvec, tvec)
+        }
+        # 只保留最近的真值（后台渲染时消费者可能落后缓冲区容量帧）
+        self._truth.pop(index - 64, None)
+        self.frame_index += 1
+        self._device_timestamp = index / self.fps
+        self._frame_number = index
+
+        if copy:
+            color_image = color_image.copy()
+            depth_image = depth_image.copy()
+        return color_image, depth_image
+
+    def get_ground_truth(self, frame_index: Optional[int] = None) -> Optional[dict]:
+        """
+        获取某一帧的真值
+
+        Args:
+            frame_index: 帧序号（即 FrameRecord.frame_number），默认为最近渲染的一帧
+
+        Returns:
+            dict: rvec、tvec（棋盘格->相机）、image_points (N, 2) 真值角点像素坐标，已不在保留范围内返回None
+        """
+        if frame_index is None:
+            frame_index = self.frame_index - 1
+        return self._truth.get(frame_index)
+
+    def get_intrinsics(self, stream='color'):
+        """
+        获取真值内参（深度图与彩色图共用同一相机模型）
+
+        Returns:
+            dict: 包含内参矩阵、畸变系数和相机模型
+        """
+        return {
+            'camera_matrix': self.camera_matrix.copy(),
+            'distortion_coeffs': self.dist_coeffs.copy(),
+            'width': self.width,
+            'height': self.height,
+            'camera_model': 'fisheye' if self.use_fisheye else 'pinhole'
+        }
+
+    def get_extrinsics(self, from_stream='depth', to_stream='color'):
+        """深度图与彩色图在同一相机坐标系中渲染，外参为单位阵"""
+        return np.eye(4)
+
+    def get_depth_scale(self):
+        """深度图单位为毫米"""
+        return 0.001
@@ -0,0 +1,142 @@
+"""
+Incremental coverage state of scripts/analyze_calibration_coverage.py:
+results taken from the state file must match a fresh analysis without cache
+"""
+import importlib.util
+import io
+import os
+import shutil
+import sys
+from contextlib import redirect_stdout
+
+import cv2
+import matplotlib
+import numpy as np
+import pytest
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.append(ROOT)
+
+from src.camera import SyntheticBoardCamera
+
+
+@pytest.fixture(scope='module')
+def coverage_module():
+    """Load the script as a module (it selects the TkAgg backend on import, unavailable headless)"""
+    use = matplotlib.use
+    matplotlib.use = lambda *args, **kwargs: None
+    try:
+        spec = importlib.util.spec_from_file_location(
+            'analyze_calibration_coverage', os.path.join(ROOT, 'scripts', 'analyze_calibration_coverage.py'))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        matplotlib.use = use
+    return module
+
+
+@pytest.fixture(scope='module')
+def board_images():
+    """Synthetic 12x8 checkerboard views"""
+    camera_matrix = np.array([[576.0, 0, 320], [0, 576.0, 240], [0, 0, 1]])
+    camera = SyntheticBoardCamera(camera_matrix, np.zeros(5), distance_range=(0.35, 0.8),
+                                  max_tilt_deg=30, seed=3, num_frames=6)
+    camera.start()
+    images = []
+    while True:
+        color_image, _ = camera.get_frames()
+        if color_image is None:
+            break
+        images.append(color_image.copy())
+    camera.stop()
+    return images
+
+
+@pytest.fixture
+def image_folder(tmp_path, board_images):
+    """Folder with four board views, an image without a board and an unreadable file"""
+    for i, image in enumerate(board_images[:4]):
+        cv2.imwrite(str(tmp_path / f"calib_{i:03d}.png"), image)
+    cv2.imwrite(str(tmp_path / "blank.png"), np.full((480, 640, 3), 110, np.uint8))
+    (tmp_path / "broken.jpg").write_bytes(b"not an image")
+    return tmp_path
+
+
+def analyze(module, folder, **kwargs):
+    analyzer = module.CalibrationCoverageAnalyzer()
+    with redirect_stdout(io.StringIO()):
+        analyzer.analyze_folder(str(folder), **kwargs)
+    return analyzer
+
+
+def assert_matches_fresh(module, folder):
+    """Analysis using the state file equals an analysis that detects every image"""
+    cached = analyze(module, folder)
+    fresh = analyze(module, folder, use_cache=False)
+    assert cached.successful_images == fresh.successful_images
+    assert cached.failed_images == fresh.failed_images
+    assert cached.image_size == fresh.image_size
+    assert len(cached.all_corners) == len(fresh.all_corners)
+    for cached_corners, fresh_corners in zip(cached.all_corners, fresh.all_corners):
+        np.testing.assert_array_equal(cached_corners, fresh_corners)
+    np.testing.assert_array_equal(cached.compute_coverage_heatmap(), fresh.compute_coverage_heatmap())
+    return cached
+
+
+def count_detections(module, folder, monkeypatch):
+    """Number of images detected again (not taken from the state) in one analysis"""
+    calls = []
+    find_corners = module.CalibrationCoverageAnalyzer.find_corners
+
+    def counting_find_corners(self, image):
+        calls.append(1)
+        return find_corners(self, image)
+
+    monkeypatch.setattr(module.CalibrationCoverageAnalyzer, 'find_corners', counting_find_corners)
+    analyze(module, folder)
+    monkeypatch.setattr(module.CalibrationCoverageAnalyzer, 'find_corners', find_corners)
+    return len(calls)
+
+
+def test_state_matches_fresh_analysis(coverage_module, image_folder, monkeypatch):
+    analyzer = assert_matches_fresh(coverage_module, image_folder)
+    assert len(analyzer.successful_images) == 4
+    assert analyzer.failed_images == ['blank.png', 'broken.jpg']
+    assert (image_folder / coverage_module.STATE_FILE).exists()
+    assert count_detections(coverage_module, image_folder, monkeypatch) == 0
+
+
+def test_state_add_remove_modify(coverage_module, image_folder, board_images, monkeypatch):
+    analyze(coverage_module, image_folder)
+
+    # Add
+    cv2.imwrite(str(image_folder / "calib_004.png"), board_images[4])
+    assert count_detections(coverage_module, image_folder, monkeypatch) == 1
+    analyzer = assert_matches_fresh(coverage_module, image_folder)
+    assert "calib_004.png" in analyzer.successful_images
+
+    # Remove
+    os.remove(image_folder / "calib_001.png")
+    assert count_detections(coverage_module, image_folder, monkeypatch) == 0
+    analyzer = assert_matches_fresh(coverage_module, image_folder)
+    assert "calib_001.png" not in analyzer.successful_images + analyzer.failed_images
+
+    # Modify: replace content, a board view becomes an image without a board and vice versa
+    shutil.copy(image_folder / "blank.png", image_folder / "calib_002.png")
+    cv2.imwrite(str(image_folder / "blank.png"), board_images[5])
+    os.utime(image_folder / "calib_002.png", ns=(10 ** 9, 10 ** 9))
+    assert count_detections(coverage_module, image_folder, monkeypatch) == 2
+    analyzer = assert_matches_fresh(coverage_module, image_folder)
+    assert "calib_002.png" in analyzer.failed_images
+    assert "blank.png" in analyzer.successful_images
+
+
+def test_corrupt_state_file(coverage_module, image_folder, monkeypatch):
+    analyze(coverage_module, image_folder)
+    state_file = image_folder / coverage_module.STATE_FILE
+    state_file.write_bytes(b"corrupt")
+
+    assert count_detections(coverage_module, image_folder, monkeypatch) == 5
+    assert_matches_fresh(coverage_module, image_folder)
+    # The rewritten state is used again
+    assert count_detections(coverage_module, image_folder, monkeypatch) == 0
@@ -0,0 +1,43 @@
+"""
+BearingTable: 亚像素坐标的射线查表与直接去畸变结果一致
+"""
+import os
+import sys
+
+import cv2
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.calibration import BearingTable
+
+CAMERA_MATRIX = np.array([[300.0, 0, 320], [0, 300.0, 240], [0, 0, 1]])
+IMAGE_SIZE = (640, 480)
+
+
+@pytest.mark.parametrize('use_fisheye, dist_coeffs', [
+    (True, np.array([0.1, -0.05, 0.01, 0.0])),
+    (False, np.array([0.1, -0.05, 0.0, 0.0, 0.01])),
+])
+def test_subpixel_lookup_matches_undistortion(use_fisheye, dist_coeffs):
+    table = BearingTable(CAMERA_MATRIX, dist_coeffs, IMAGE_SIZE, use_fisheye=use_fisheye)
+    pixels = np.random.default_rng(0).uniform((0, 0), (IMAGE_SIZE[0] - 1, IMAGE_SIZE[1] - 1), (500, 2))
+    if use_fisheye:
+        normalized = cv2.fisheye.undistortPoints(pixels.reshape(-1, 1, 2), CAMERA_MATRIX,
+                                                 dist_coeffs.reshape(-1, 1))
+    else:
+        normalized = cv2.undistortPoints(pixels.reshape(-1, 1, 2), CAMERA_MATRIX, dist_coeffs)
+    expected = np.hstack([normalized.reshape(-1, 2), np.ones((len(pixels), 1))])
+
+    points = table.pixels_to_points(pixels[:, 0], pixels[:, 1], 2.0)
+    np.testing.assert_allclose(points, 2.0 * expected, atol=1e-4)
+
+    rays = table.pixels_to_rays(pixels[:, 0], pixels[:, 1])
+    np.testing.assert_allclose(rays, expected / np.linalg.norm(expected, axis=1, keepdims=True), atol=5e-5)
+    np.testing.assert_allclose(table.pixels_to_points(pixels[:, 0], pixels[:, 1], 2.0, depth_is_range=True),
+                               2.0 * rays, atol=1e-6)
+
+    # 整数像素与查找表一致, 超出图像的坐标截断到边界
+    np.testing.assert_allclose(table.pixels_to_rays(5, 7), table.rays[7, 5], atol=1e-7)
+    np.testing.assert_allclose(table.pixels_to_rays(-3.5, 1e4), table.rays[-1, 0], atol=1e-7)
@@ -0,0 +1,104 @@
+"""
+CameraSource 后台采集线程的失败处理: 读取失败或抛出异常时退避重试,
+连续失败过多后停止采集并关闭缓冲区
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.camera.base import CameraSource
+
+
+class FailingCamera(CameraSource):
+    """前 good_frames 帧正常，之后按 failure 失败"""
+
+    CAPTURE_RETRY_DELAY = 0.001
+    CAPTURE_MAX_RETRY_DELAY = 0.01
+    CAPTURE_MAX_ERRORS = 5
+
+    def __init__(self, failure, good_frames=3, frame_shape=(48, 64), **kwargs):
+        super().__init__(width=64, height=48, threaded=True, **kwargs)
+        self.failure = failure
+        self.good_frames = good_frames
+        self.frame_shape = frame_shape
+        self.reads = 0
+
+    def _read_frames(self, copy=False):
+        self.reads += 1
+        if self.reads > self.good_frames:
+            if self.failure == 'none':
+                return None, None
+            raise RuntimeError("device disconnected")
+        height, width = self.frame_shape
+        return np.zeros((height, width, 3), np.uint8), np.zeros((height, width), np.uint16)
+
+
+def drain(camera, timeout=5.0):
+    """读取直到数据流结束，返回帧数和耗时"""
+    count = 0
+    t_start = time.perf_counter()
+    while True:
+        frame = camera.get_frame('next', timeout=timeout)
+        if frame is None:
+            return count, time.perf_counter() - t_start
+        camera.release_frame(frame)
+        count += 1
+
+
+def check_stopped(camera, frames, expected_frames):
+    count, elapsed = frames
+    assert count == expected_frames
+    assert elapsed < 2.0, "消费者应读到数据流结束而不是等待超时"
+    stats = camera.get_capture_stats()
+    assert stats['capture_failed']
+    assert stats['capture_errors'] == FailingCamera.CAPTURE_MAX_ERRORS
+    assert camera.frame_buffer.closed
+
+
+def test_failed_reads_stop_capture():
+    camera = FailingCamera('none')
+    camera.start()
+    try:
+        check_stopped(camera, drain(camera), 3)
+    finally:
+        camera.stop()
+
+
+def test_read_exceptions_stop_capture():
+    camera = FailingCamera('raise')
+    camera.start()
+    try:
+        check_stopped(camera, drain(camera), 3)
+    finally:
+        camera.stop()
+
+
+def test_pool_size_mismatch_stops_capture():
+    # 帧尺寸与缓冲池不一致时 FramePool.fill 抛出 ValueError，缓冲区不泄漏
+    camera = FailingCamera('none', good_frames=10, frame_shape=(10, 10), use_pool=True)
+    camera.start()
+    try:
+        check_stopped(camera, drain(camera), 0)
+        assert camera.frame_pool.get_stats()['in_use'] == 0
+    finally:
+        camera.stop()
+
+
+def test_recovers_after_transient_failures():
+    camera = FailingCamera('none', good_frames=2)
+    camera.CAPTURE_MAX_ERRORS = 1000
+    camera.start()
+    try:
+        frame = camera.get_frame('next', timeout=1.0)
+        camera.release_frame(frame)
+        # 失败次数未达上限前恢复读取
+        camera.good_frames = 10 ** 6
+        frames = [camera.get_frame('next', timeout=1.0) for _ in range(5)]
+        assert all(frame is not None for frame in frames)
+        assert not camera.get_capture_stats()['capture_failed']
+    finally:
+        camera.stop()
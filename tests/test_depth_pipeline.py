@@ -0,0 +1,36 @@
+"""
+DepthToVehicleCloud: 整帧深度图到车辆坐标系点云
+"""
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.calibration import BearingTable, DepthToVehicleCloud, ExtrinsicCalibration
+from transforms3d.euler import euler2mat
+
+WIDTH, HEIGHT = 64, 48
+
+
+def test_vehicle_rays_follow_in_place_extrinsic_edits():
+    camera_matrix = np.array([[60.0, 0, 32], [0, 60.0, 24], [0, 0, 1]])
+    table = BearingTable(camera_matrix, np.array([0.05, -0.01, 0.0, 0.0, 0.0]), (WIDTH, HEIGHT),
+                         use_fisheye=False)
+    ex = ExtrinsicCalibration()
+    ex.transformation_matrix = np.eye(4)
+    ex.transformation_matrix[:3, :3] = euler2mat(0.1, -0.2, 0.3)
+    ex.transformation_matrix[:3, 3] = (1.5, -0.2, 0.8)
+    pipeline = DepthToVehicleCloud(table, ex)
+
+    depth_image = np.random.default_rng(0).integers(500, 5000, (HEIGHT, WIDTH), dtype=np.uint16)
+    pipeline.process(depth_image)
+
+    ex.transformation_matrix[:3, 3] += (0.5, 0.25, -0.1)
+    ex.transformation_matrix[:3, :3] = euler2mat(0.0, 0.1, -0.4)
+    points, valid = pipeline.process(depth_image)
+
+    expected = ex.transform_point_to_vehicle(table.depth_to_points(depth_image * 0.001))
+    assert valid.all()
+    np.testing.assert_allclose(points, expected, atol=1e-4)
@@ -0,0 +1,170 @@
+"""
+ExtrinsicCalibration: PnP 求解精度、车辆点投影、外参派生缓存的失效
+"""
+import os
+import sys
+
+import cv2
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.calibration import ExtrinsicCalibration
+from src.calibration.extrinsic_calibration import PNP_SOLVERS
+from transforms3d.euler import euler2mat
+
+CAMERA_MATRIX = np.array([[600.0, 0, 640], [0, 600.0, 360], [0, 0, 1]])
+FISHEYE_DIST = np.array([0.05, -0.01, 0.002, 0.0])
+PINHOLE_DIST = np.array([0.05, -0.02, 0.001, -0.001, 0.0])
+
+
+def make_extrinsic(rpy=(0.1, -0.2, 0.3), translation=(1.5, -0.2, 0.8)):
+    ex = ExtrinsicCalibration()
+    T = np.eye(4)
+    T[:3, :3] = euler2mat(*rpy)
+    T[:3, 3] = translation
+    ex.transformation_matrix = T
+    return ex
+
+
+def reference_transform(T, points):
+    return points @ T[:3, :3].T + T[:3, 3]
+
+
+def test_transform_cache_follows_in_place_edits():
+    ex = make_extrinsic()
+    points = np.random.default_rng(0).uniform(-5, 5, (100, 3))
+    for dtype in (np.float64, np.float32):
+        ex.transform_point_to_vehicle(points.astype(dtype))
+        ex.transform_point_to_camera(points.astype(dtype))
+
+    ex.transformation_matrix[:3, 3] += (0.5, 0.25, -0.1)
+    ex.transformation_matrix[:3, :3] = euler2mat(0.0, 0.1, -0.4)
+    T = ex.transformation_matrix
+    np.testing.assert_allclose(ex.transform_point_to_vehicle(points), reference_transform(T, points),
+                               atol=1e-9)
+    np.testing.assert_allclose(ex.transform_point_to_vehicle(points.astype(np.float32)),
+                               reference_transform(T, points), atol=1e-4)
+    np.testing.assert_allclose(ex.transform_point_to_camera(points),
+                               reference_transform(np.linalg.inv(T), points), atol=1e-9)
+
+
+def synthetic_board_view(use_fisheye, noise_px=0.1, num_outliers=0, seed=0):
+    """12x8 棋盘格角点及其在已知位姿下的投影（可加噪声和离群点）"""
+    rng = np.random.default_rng(seed)
+    object_points = ExtrinsicCalibration._board_object_points((12, 8), 0.05)
+    rvec = cv2.Rodrigues(euler2mat(0.3, -0.25, 0.1))[0]
+    tvec = np.array([[-0.2], [-0.1], [1.2]])
+    if use_fisheye:
+        image_points, _ = cv2.fisheye.projectPoints(object_points.reshape(-1, 1, 3), rvec, tvec,
+                                                    CAMERA_MATRIX, FISHEYE_DIST)
+    else:
+        image_points, _ = cv2.projectPoints(object_points, rvec, tvec, CAMERA_MATRIX, PINHOLE_DIST)
+    image_points = image_points.reshape(-1, 2) + rng.normal(0, noise_px, (len(object_points), 2))
+
+    outliers = rng.choice(len(object_points), num_outliers, replace=False)
+    offsets = rng.uniform(20, 60, (num_outliers, 2)) * rng.choice([-1, 1], (num_outliers, 2))
+    image_points[outliers] += offsets
+    return object_points, image_points, rvec, tvec, outliers
+
+
+def pose_errors(rvec, tvec, rvec_true, tvec_true):
+    """旋转误差（度）和平移误差（米）"""
+    R_error = cv2.Rodrigues(rvec)[0] @ cv2.Rodrigues(rvec_true)[0].T
+    angle = np.rad2deg(np.linalg.norm(cv2.Rodrigues(R_error)[0]))
+    return angle, np.linalg.norm(np.ravel(tvec) - np.ravel(tvec_true))
+
+
+@pytest.mark.parametrize('use_fisheye', [True, False])
+@pytest.mark.parametrize('solver', list(PNP_SOLVERS))
+def test_pnp_solvers_recover_pose(solver, use_fisheye):
+    object_points, image_points, rvec_true, tvec_true, _ = synthetic_board_view(use_fisheye)
+    dist_coeffs = FISHEYE_DIST if use_fisheye else PINHOLE_DIST
+    rvec, tvec, inliers = ExtrinsicCalibration._solve_board_pose(
+        object_points, image_points, CAMERA_MATRIX, dist_coeffs, use_fisheye, solver, refine=True)
+    angle, distance = pose_errors(rvec, tvec, rvec_true, tvec_true)
+    assert inliers.all()
+    assert angle < 0.05
+    assert distance < 1e-3
+
+
+@pytest.mark.parametrize('use_fisheye', [True, False])
+def test_ransac_rejects_outliers(use_fisheye):
+    object_points, image_points, rvec_true, tvec_true, outliers = synthetic_board_view(
+        use_fisheye, num_outliers=20, seed=1)
+    dist_coeffs = FISHEYE_DIST if use_fisheye else PINHOLE_DIST
+
+    rvec, tvec, inliers = ExtrinsicCalibration._solve_board_pose(
+        object_points, image_points, CAMERA_MATRIX, dist_coeffs, use_fisheye, 'ransac', refine=True)
+    expected = np.ones(len(object_points), dtype=bool)
+    expected[outliers] = False
+    np.testing.assert_array_equal(inliers, expected)
+    angle, distance = pose_errors(rvec, tvec, rvec_true, tvec_true)
+    assert angle < 0.05
+    assert distance < 1e-3
+
+    # 不剔除离群点时误差明显更大
+    rvec, tvec, _ = ExtrinsicCalibration._solve_board_pose(
+        object_points, image_points, CAMERA_MATRIX, dist_coeffs, use_fisheye, 'iterative')
+    angle, distance = pose_errors(rvec, tvec, rvec_true, tvec_true)
+    assert angle > 0.2 or distance > 5e-3
+
+
+def test_from_pnp_composes_board_to_vehicle():
+    object_points, image_points, rvec, tvec, _ = synthetic_board_view(True, num_outliers=10, seed=2)
+    T_board_to_vehicle = np.eye(4)
+    T_board_to_vehicle[:3, :3] = euler2mat(np.pi / 2, 0, -np.pi / 2)
+    T_board_to_vehicle[:3, 3] = (1.04, -0.575, 0.89)
+
+    ex = ExtrinsicCalibration()
+    ex.from_pnp(object_points, image_points, CAMERA_MATRIX, FISHEYE_DIST, T_board_to_vehicle,
+                use_fisheye=True, solver='ransac', refine=True)
+
+    # 标定板上的点经 板->相机 和 相机->车辆 两步后应与直接 板->车辆 一致
+    points_camera = object_points @ cv2.Rodrigues(rvec)[0].T + tvec.ravel()
+    np.testing.assert_allclose(ex.transform_point_to_vehicle(points_camera),
+                               reference_transform(T_board_to_vehicle, object_points), atol=2e-3)
+    np.testing.assert_array_equal(ex.board_to_vehicle_transform, T_board_to_vehicle)
+
+
+@pytest.mark.parametrize('use_fisheye', [True, False])
+def test_project_vehicle_points_matches_opencv(use_fisheye):
+    image_size = (1280, 720)
+    dist_coeffs = FISHEYE_DIST if use_fisheye else PINHOLE_DIST
+    # 相机位于车头上方, 光轴朝前: 车辆 X前 Y左 Z上 -> 相机 X右 Y下 Z前
+    ex = ExtrinsicCalibration()
+    T = np.eye(4)
+    T[:3, :3] = np.array([[0, 0, 1], [-1, 0, 0], [0, -1, 0]]) @ euler2mat(0.05, 0.1, 0.0)
+    T[:3, 3] = (2.0, 0.1, 1.4)
+    ex.transformation_matrix = T
+    # 覆盖相机前后、图像内外的点
+    points = np.random.default_rng(0).uniform((-5, -15, -2), (30, 15, 5), (5000, 3))
+
+    pixels, visible = ex.project_vehicle_points(points, CAMERA_MATRIX, dist_coeffs, image_size,
+                                                use_fisheye=use_fisheye)
+
+    T_vehicle_to_camera = np.linalg.inv(T)
+    rvec = cv2.Rodrigues(T_vehicle_to_camera[:3, :3])[0]
+    tvec = T_vehicle_to_camera[:3, 3]
+    if use_fisheye:
+        expected, _ = cv2.fisheye.projectPoints(points.reshape(-1, 1, 3), rvec, tvec,
+                                                CAMERA_MATRIX, dist_coeffs)
+    else:
+        expected, _ = cv2.projectPoints(points, rvec, tvec, CAMERA_MATRIX, dist_coeffs)
+    expected = expected.reshape(-1, 2)
+
+    # 参考可见性: 位于相机前方且投影在图像内；针孔模型还要求归一化半径小于径向畸变的折返半径
+    # （1 + 3 k1 r^2 + 5 k2 r^4 = 0，超出后畸变多项式会把视场外的点折返回图像内）
+    points_camera = reference_transform(T_vehicle_to_camera, points)
+    radius = np.hypot(points_camera[:, 0], points_camera[:, 1]) / points_camera[:, 2]
+    k1, k2 = dist_coeffs[:2]
+    fold_radius = np.inf if use_fisheye else np.sqrt((3 * k1 + np.sqrt(9 * k1 ** 2 - 20 * k2)) / (-10 * k2))
+    expected_visible = ((points_camera[:, 2] > 0.05) & (radius < fold_radius) &
+                        (expected[:, 0] >= 0) & (expected[:, 0] <= image_size[0] - 1) &
+                        (expected[:, 1] >= 0) & (expected[:, 1] <= image_size[1] - 1))
+    assert expected_visible.sum() > 1000
+    np.testing.assert_array_equal(visible, expected_visible)
+
+    np.testing.assert_allclose(pixels[visible], expected[visible], atol=1e-6)
+    assert np.isnan(pixels[~visible]).all()
@@ -0,0 +1,107 @@
+"""
+chunked 格式录制: ChunkedRecorder 写入、PlaybackCamera / ChunkedRecordingReader 回放
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.camera import ChunkedRecorder, PlaybackCamera
+from src.camera.playback import INDEX_DTYPE, INDEX_FILE, ChunkedRecordingReader, chunk_filename, \
+    load_recording_metadata
+
+WIDTH, HEIGHT = 64, 48
+
+
+def make_frames(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return [(rng.integers(0, 256, (HEIGHT, WIDTH, 3), dtype=np.uint8),
+             rng.integers(0, 5000, (HEIGHT, WIDTH), dtype=np.uint16)) for _ in range(count)]
+
+
+def record(path, frames, **kwargs):
+    with ChunkedRecorder(str(path), WIDTH, HEIGHT, fps=30, **kwargs) as recorder:
+        for i, (color_image, depth_image) in enumerate(frames):
+            recorder.write(color_image, depth_image, timestamp=i / 30.0, device_timestamp=i / 30.0,
+                           frame_number=i)
+    return path
+
+
+def play(path, **kwargs):
+    """按顺序回放全部帧，返回 (彩色, 深度, 设备时间戳, 帧号) 列表"""
+    camera = PlaybackCamera(str(path), speed=0, **kwargs)
+    camera.start()
+    frames = []
+    try:
+        while True:
+            frame = camera.get_frame('next')
+            if frame is None:
+                return frames
+            frames.append((frame.color.copy(), frame.depth.copy(), frame.device_timestamp, frame.frame_number))
+            camera.release_frame(frame)
+    finally:
+        camera.stop()
+
+
+def assert_frames_equal(played, frames):
+    assert len(played) == len(frames)
+    for i, ((color, depth, device_timestamp, frame_number), (color_image, depth_image)) in \
+            enumerate(zip(played, frames)):
+        np.testing.assert_array_equal(color, color_image)
+        np.testing.assert_array_equal(depth, depth_image)
+        assert device_timestamp == pytest.approx(i / 30.0)
+        assert frame_number == i
+
+
+@pytest.mark.parametrize('threaded', [False, True])
+def test_round_trip(tmp_path, threaded):
+    # 多个写入线程、小数据块: 索引记录乱序追加且跨多个数据块文件
+    frames = make_frames(20)
+    path = record(tmp_path / 'rec', frames, num_workers=3, chunk_size=20000)
+    assert os.path.exists(chunk_filename(str(path), 1))
+    assert load_recording_metadata(str(path))['num_frames'] == 20
+    # 后台读取时环形缓冲区满会丢弃最旧的帧，容量需容纳全部帧
+    assert_frames_equal(play(path, threaded=threaded, buffer_size=len(frames)), frames)
+
+
+def test_truncated_index(tmp_path):
+    # 录制中断: 索引末尾只写了半条记录，回放其余完整的帧
+    frames = make_frames(6)
+    path = record(tmp_path / 'rec', frames, num_workers=1)
+    index_file = os.path.join(str(path), INDEX_FILE)
+    with open(index_file, 'r+b') as f:
+        f.truncate(os.path.getsize(index_file) - INDEX_DTYPE.itemsize // 2)
+
+    assert_frames_equal(play(path), frames[:5])
+
+
+def test_stop_closes_chunk_files(tmp_path):
+    record(tmp_path / 'rec', make_frames(5))
+    camera = PlaybackCamera(str(tmp_path / 'rec'), speed=0)
+    camera.start()
+    while camera.get_frames()[0] is not None:
+        pass
+    assert camera._reader._files
+    camera.stop()
+    assert not camera._reader._files
+
+    # 再次回放时按需重新打开
+    camera.start()
+    assert camera.get_frames()[0] is not None
+    camera.stop()
+
+
+def test_truncated_chunk_raises(tmp_path):
+    path = record(tmp_path / 'rec', make_frames(3), num_workers=1)
+    chunk = chunk_filename(str(path), 0)
+    with open(chunk, 'r+b') as f:
+        f.truncate(os.path.getsize(chunk) - 10)
+
+    reader = ChunkedRecordingReader(str(path), load_recording_metadata(str(path)))
+    reader.read(0)
+    with pytest.raises(ValueError):
+        reader.read(2)
+    reader.close()
@@ -0,0 +1,95 @@
+"""
+DepthToColorRegistration: 与逐像素反投影 + cv2.projectPoints + z-buffer 的朴素实现对比
+"""
+import os
+import sys
+
+import cv2
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.camera import DepthToColorRegistration
+from transforms3d.euler import euler2mat
+
+DEPTH_SIZE = (80, 60)
+DEPTH_MATRIX = np.array([[70.0, 0, 40.5], [0, 70.0, 29.5], [0, 0, 1]])
+DEPTH_DIST = np.array([0.08, -0.03, 0.001, -0.002, 0.0])
+COLOR_DIST = np.array([0.1, -0.05, -0.001, 0.001, 0.01])
+DEPTH_SCALE = 0.001
+
+
+def make_depth_to_color():
+    T = np.eye(4)
+    T[:3, :3] = euler2mat(0.01, -0.02, 0.005)
+    T[:3, 3] = (-0.032, 0.002, 0.004)
+    return T
+
+
+def make_depth_image():
+    """背景平面前放一个近处方块（产生遮挡），并留一些无效深度"""
+    rng = np.random.default_rng(0)
+    v, u = np.mgrid[0:DEPTH_SIZE[1], 0:DEPTH_SIZE[0]]
+    depth = 2000 + 10 * u + 5 * v + rng.integers(0, 20, u.shape)
+    depth[20:40, 30:50] = 600 + rng.integers(0, 20, (20, 20))
+    depth[rng.random(u.shape) < 0.05] = 0
+    return depth.astype(np.uint16)
+
+
+def naive_register(depth_image, color_matrix, color_size, depth_to_color, splat):
+    """逐像素: 去畸变反投影 -> 外参变换 -> cv2.projectPoints -> 保留最近深度"""
+    height, width = depth_image.shape
+    v, u = np.mgrid[0:height, 0:width]
+    pixels = np.stack([u, v], axis=-1).reshape(-1, 1, 2).astype(np.float64)
+    normalized = cv2.undistortPoints(pixels, DEPTH_MATRIX, DEPTH_DIST).reshape(-1, 2)
+
+    color_width, color_height = color_size
+    out = np.zeros((color_height, color_width), dtype=np.uint16)
+    for (x, y), raw in zip(normalized, depth_image.reshape(-1)):
+        if raw == 0:
+            continue
+        z = raw * DEPTH_SCALE
+        point = depth_to_color[:3, :3] @ np.array([x * z, y * z, z]) + depth_to_color[:3, 3]
+        if point[2] <= 0:
+            continue
+        projected, _ = cv2.projectPoints(point.reshape(1, 1, 3), np.zeros(3), np.zeros(3),
+                                         color_matrix, COLOR_DIST)
+        pu, pv = projected.ravel()
+        value = min(int(point[2] / DEPTH_SCALE + 0.5), 65535)
+        if splat == 1:
+            targets = [(int(np.floor(pu + 0.5)), int(np.floor(pv + 0.5)))]
+        else:
+            left, top = int(np.floor(pu - 0.5)), int(np.floor(pv - 0.5))
+            targets = [(left + du, top + dv) for du in (0, 1) for dv in (0, 1)]
+        for cu, cv in targets:
+            if 0 <= cu < color_width and 0 <= cv < color_height:
+                if out[cv, cu] == 0 or value < out[cv, cu]:
+                    out[cv, cu] = value
+    return out
+
+
+@pytest.mark.parametrize('color_focal, color_size, splat', [
+    (70.0, (80, 60), 1),
+    (140.0, (160, 120), 2),
+])
+def test_register_matches_naive_reprojection(color_focal, color_size, splat):
+    color_matrix = np.array([[color_focal, 0, color_size[0] / 2 - 0.3], [0, color_focal, color_size[1] / 2 + 0.2],
+                             [0, 0, 1]])
+    depth_to_color = make_depth_to_color()
+    registration = DepthToColorRegistration(DEPTH_MATRIX, DEPTH_DIST, DEPTH_SIZE, color_matrix, COLOR_DIST,
+                                            color_size, depth_to_color, depth_scale=DEPTH_SCALE)
+    assert registration.splat == splat
+
+    depth_image = make_depth_image()
+    registered = registration.register(depth_image)
+    expected = naive_register(depth_image, color_matrix, color_size, depth_to_color, splat)
+
+    # float32 与 float64 计算仅在像素边界和 0.5 进位处可能不同
+    assert (registered > 0).mean() > 0.5
+    assert (registered != expected).mean() < 0.001
+
+    # 遮挡: 近处方块覆盖背景，方块区域的配准深度不会来自背景
+    near = expected[(expected > 0) & (expected < 1000)]
+    assert len(near) > 0
+    assert (registered[(expected > 0) & (expected < 1000)] < 1000).all()
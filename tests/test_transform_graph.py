@@ -0,0 +1,130 @@
+"""
+TransformGraph: 任意两坐标系间的组合变换、边更新后的缓存失效
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.calibration import ExtrinsicCalibration, TransformGraph, invert_transform
+from transforms3d.euler import euler2mat
+
+
+def random_transform(rng):
+    T = np.eye(4)
+    T[:3, :3] = euler2mat(*rng.uniform(-np.pi, np.pi, 3))
+    T[:3, 3] = rng.uniform(-2, 2, 3)
+    return T
+
+
+@pytest.fixture
+def graph_and_edges():
+    """vehicle 为根: front -> lidar, rear, board；另有不连通的 world -> map"""
+    rng = np.random.default_rng(0)
+    edges = {'front': 'vehicle', 'lidar': 'front', 'rear': 'vehicle', 'board': 'vehicle', 'map': 'world'}
+    transforms = {child: random_transform(rng) for child in edges}
+    graph = TransformGraph()
+    for child, parent in edges.items():
+        graph.set_transform(parent, child, transforms[child])
+    return graph, edges, transforms
+
+
+def to_root(frame, edges, transforms):
+    """逐条边相乘得到 frame 到根的变换"""
+    T = np.eye(4)
+    while frame in edges:
+        T = transforms[frame] @ T
+        frame = edges[frame]
+    return T
+
+
+def test_compose_matches_chained_edges(graph_and_edges):
+    graph, edges, transforms = graph_and_edges
+    frames = ['vehicle', 'front', 'lidar', 'rear', 'board']
+    points = np.random.default_rng(1).uniform(-5, 5, (50, 3))
+    for source in frames:
+        for target in frames:
+            expected = np.linalg.inv(to_root(target, edges, transforms)) @ to_root(source, edges, transforms)
+            T = graph.get_transform(source, target)
+            np.testing.assert_allclose(T, expected, atol=1e-12)
+            assert not T.flags.writeable
+            np.testing.assert_allclose(graph.transform_points(points, source, target),
+                                       points @ expected[:3, :3].T + expected[:3, 3], atol=1e-12)
+            np.testing.assert_allclose(graph.transform_points(points.astype(np.float32), source, target),
+                                       points @ expected[:3, :3].T + expected[:3, 3], atol=1e-4)
+
+    np.testing.assert_allclose(graph.get_transform('lidar', 'rear'),
+                               invert_transform(graph.get_transform('rear', 'lidar')), atol=1e-12)
+    with pytest.raises(ValueError):
+        graph.get_transform('lidar', 'map')
+    with pytest.raises(KeyError):
+        graph.get_transform('lidar', 'unknown')
+
+
+def test_update_invalidates_only_dependent_entries(graph_and_edges):
+    graph, edges, transforms = graph_and_edges
+    lidar_to_rear = graph.get_transform('lidar', 'rear')
+    board_to_rear = graph.get_transform('board', 'rear')
+    graph.transform_points(np.zeros((1, 3), np.float32), 'lidar', 'rear')
+
+    # 更新 front -> vehicle: 依赖它的 lidar <-> rear 重新计算，board <-> rear 保持缓存
+    transforms['front'] = random_transform(np.random.default_rng(2))
+    graph.set_transform('vehicle', 'front', transforms['front'])
+
+    expected = np.linalg.inv(to_root('rear', edges, transforms)) @ to_root('lidar', edges, transforms)
+    assert not np.allclose(graph.get_transform('lidar', 'rear'), lidar_to_rear)
+    np.testing.assert_allclose(graph.get_transform('lidar', 'rear'), expected, atol=1e-12)
+    np.testing.assert_allclose(graph.get_transform('rear', 'lidar'), np.linalg.inv(expected), atol=1e-12)
+    np.testing.assert_allclose(graph.transform_points(np.zeros((1, 3), np.float32), 'lidar', 'rear'),
+                               expected[None, :3, 3], atol=1e-5)
+    assert graph.get_transform('board', 'rear') is board_to_rear
+
+    # 传入的矩阵被复制，之后修改不影响变换树
+    transforms['front'][:3, 3] += 1.0
+    np.testing.assert_allclose(graph.get_transform('lidar', 'rear'), expected, atol=1e-12)
+
+    graph.clear_cache()
+    assert graph.get_transform('board', 'rear') is not board_to_rear
+    np.testing.assert_allclose(graph.get_transform('board', 'rear'), board_to_rear, atol=1e-12)
+
+
+def test_remove_and_reparent(graph_and_edges):
+    graph, edges, transforms = graph_and_edges
+    graph.get_transform('lidar', 'vehicle')
+    graph.remove_transform('front')
+    with pytest.raises(ValueError):
+        graph.get_transform('lidar', 'vehicle')
+
+    # 重新挂到 rear 下
+    graph.set_transform('rear', 'front', transforms['front'])
+    edges['front'] = 'rear'
+    np.testing.assert_allclose(graph.get_transform('lidar', 'vehicle'), to_root('lidar', edges, transforms),
+                               atol=1e-12)
+
+    # 已有父坐标系 / 形成环
+    with pytest.raises(ValueError):
+        graph.set_transform('board', 'front', np.eye(4))
+    with pytest.raises(ValueError):
+        graph.set_transform('lidar', 'vehicle', np.eye(4))
+
+
+def test_register_extrinsic():
+    rng = np.random.default_rng(3)
+    ex = ExtrinsicCalibration()
+    ex.transformation_matrix = random_transform(rng)
+    ex.board_to_vehicle_transform = random_transform(rng)
+
+    graph = TransformGraph()
+    ex.register(graph, camera_frame='front', board_frame='board')
+    np.testing.assert_allclose(graph.get_transform('front', 'vehicle'), ex.transformation_matrix, atol=1e-12)
+    np.testing.assert_allclose(graph.get_transform('board', 'front'),
+                               invert_transform(ex.transformation_matrix) @ ex.board_to_vehicle_transform,
+                               atol=1e-12)
+
+    # 没有单一标定板位姿时只能注册相机
+    ex.board_to_vehicle_transform = None
+    with pytest.raises(ValueError):
+        ex.register(TransformGraph(), board_frame='board')